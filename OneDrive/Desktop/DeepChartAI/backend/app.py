@@ -2,12 +2,20 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
 from fastapi.responses import JSONResponse
 from routes import generate_chart, analyze_trends
+from llm_integration import warm_up
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Chart Builder")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(warm_up)
+    yield
+
+app = FastAPI(title="AI Chart Builder", lifespan=lifespan)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
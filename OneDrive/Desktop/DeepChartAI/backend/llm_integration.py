@@ -4,11 +4,26 @@ import json
 import pandas as pd
 from config import Config
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 genai.configure(api_key=Config.LLM_API_KEY)
-model = genai.GenerativeModel('gemini-pro')
+
+MODEL_NAME = 'gemini-pro'
+
+@lru_cache(maxsize=None)
+def get_model(model_name: str = MODEL_NAME) -> genai.GenerativeModel:
+    """Returns one shared model instance per model name."""
+    return genai.GenerativeModel(model_name)
+
+def warm_up(model_name: str = MODEL_NAME) -> None:
+    """Builds the model and opens the Gemini transport before the first request."""
+    try:
+        get_model(model_name).count_tokens("ping")
+        logger.info(f"Warmed up Gemini model '{model_name}'")
+    except Exception as e:
+        logger.warning(f"Gemini warm-up failed: {str(e)}")
 
 CHART_PROMPT = """
 Given a user query '{query}' and available dataset columns {columns}, suggest a chart type (line, bar, pie, scatter, heatmap) and the X and Y axis labels based on common data visualization practices. Respond in JSON format with the keys: "chart_type", "x", and "y". Ensure "x" and "y" are chosen from the provided columns. For example:
@@ -26,7 +41,7 @@ Given a user query '{query}' and a dataset with columns {columns}, analyze the d
 def interpret_query(query: str, columns: list) -> dict:
     try:
         full_prompt = CHART_PROMPT.format(query=query, columns=columns)
-        response = model.generate_content(full_prompt)
+        response = get_model().generate_content(full_prompt)
         response_text = response.text.strip()
 
         chart_config = json.loads(response_text)
@@ -50,7 +65,7 @@ def interpret_query(query: str, columns: list) -> dict:
 def analyze_data(query: str, df: pd.DataFrame) -> str:
     try:
         full_prompt = TREND_PROMPT.format(query=query, columns=df.columns.tolist())
-        response = model.generate_content(full_prompt)
+        response = get_model().generate_content(full_prompt)
         return response.text.strip()
     except Exception as e:
         logger.error(f"Trend analysis error: {str(e)}")
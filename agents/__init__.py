@@ -8,6 +8,8 @@ from .refiner_agent import RefinerAgent
 from .validator_agent import ValidatorAgent
 from .generate_comment_agent import GenerateCommentAgent
 from .sentiment_analysis_agent import SentimentAnalysisAgent
+from .rag_answer_agent import RagAnswerAgent
+from .pipeline import run_pipeline
 
 class AgentManager:
     def __init__(self, max_retries=2, verbose=True):
@@ -22,6 +24,7 @@ class AgentManager:
             "validator": ValidatorAgent(max_retries=max_retries, verbose=verbose),
             "generate_comment": GenerateCommentAgent(max_retries=max_retries, verbose=verbose),
             "sentiment_analysis": SentimentAnalysisAgent(max_retries=max_retries, verbose=verbose),
+            "rag_answer": RagAnswerAgent(max_retries=max_retries, verbose=verbose),
         }
 
     def get_agent(self, agent_name):
@@ -29,3 +32,17 @@ class AgentManager:
         if not agent:
             raise ValueError(f"Agent '{agent_name}' not found.")
         return agent
+
+    async def run_pipeline(self, steps, inputs=None):
+        """Runs a declarative graph of agent steps; independent steps run concurrently.
+
+        Example:
+            await agent_manager.run_pipeline(
+                {
+                    "summary": {"agent": "summarize", "args": ["$text"]},
+                    "validation": {"agent": "summarize_validator", "args": ["$text", "$summary"]},
+                },
+                inputs={"text": post},
+            )
+        """
+        return await run_pipeline(self.get_agent, steps, inputs)
@@ -1,75 +1,307 @@
+import asyncio
 import google.generativeai as genai
 from abc import ABC, abstractmethod
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv  # ✅ Import dotenv
 
-# ✅ Load environment variables from .env file
+# ✅ Load environment variables from .env file (before the modules below read their settings)
 load_dotenv()
 
-# ✅ Fetch API key from environment vars
+from .llm_backend import llm_backend
+from .response_cache import response_cache, make_cache_key
+from .single_flight import single_flight
+from .rate_limiter import rate_limiter, estimate_tokens
+from .token_budget import count_tokens, truncate_to_budget, split_into_chunks, token_usage
+
+# ✅ Fetch API key from environment vars (not needed when LLM_BACKEND points at a local stand-in)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if not GEMINI_API_KEY:
+if not GEMINI_API_KEY and llm_backend.requires_api_key:
     raise ValueError("GEMINI_API_KEY is missing. Ensure you have a .env file with the API key.")
 
 # ✅ Configure Gemini AI
 genai.configure(api_key=GEMINI_API_KEY)
 
+CONDENSE_PROMPT = (
+    "Condense the following part of a longer text. Keep every key fact, name, number and claim, "
+    "and drop filler:\n\n{chunk}\n\nCondensed:"
+)
+
 class AgentBase(ABC):
+    max_input_tokens = None  # Per-agent budget for user input (None = no limit)
+    compaction = "truncate"  # How over-budget input is shrunk: "truncate" or "map_reduce"
+
     def __init__(self, name, max_retries=3, verbose=True):
         self.name = name
         self.max_retries = max_retries
         self.verbose = verbose
-        self.cache = {}  # In-memory cache
+        self.cache = response_cache  # Shared across agents and worker processes
+        self.in_flight = single_flight  # Coalesces identical concurrent prompts
+        self.rate_limiter = rate_limiter  # Shared RPM/TPM budget per model
+        self.token_usage = token_usage  # Per-agent token ledger
+        self.backend = llm_backend  # Gemini, or a local stand-in for benchmarks
 
     @abstractmethod
     def execute(self, *args, **kwargs):
         pass
 
-    def call_gemini(self, prompt):
-        """Calls Gemini AI with retries, backoff, and caching to avoid rate limits."""
-        if not GEMINI_API_KEY:
+    async def aexecute(self, *args, **kwargs):
+        """Async entry point. Agents override this with a native async call; the default runs execute() in a thread."""
+        return await asyncio.to_thread(self.execute, *args, **kwargs)
+
+    async def astream(self, *args, **kwargs):
+        """Streams the agent's reply chunk by chunk (agents with a build_prompt method)."""
+        async for chunk in self.astream_gemini(self.build_prompt(*args, **kwargs), model="1.5-flash"):
+            yield chunk
+
+    def _needs_compaction(self, text):
+        if not self.max_input_tokens or count_tokens(text) <= self.max_input_tokens:
+            return False
+        if self.verbose:
+            print(f"[{self.name}] Input is {count_tokens(text)} tokens (budget {self.max_input_tokens}). Compacting with {self.compaction}.")
+        self.token_usage.record_compaction(self.name)
+        return True
+
+    def _map_reduce_chunks(self, text):
+        """Chunk size and output budget so the condensed chunks fit the budget together."""
+        chunks = split_into_chunks(text, self.max_input_tokens)
+        return chunks, max(64, self.max_input_tokens // len(chunks))
+
+    def compact_input(self, text):
+        """Shrinks user input to max_input_tokens by truncation or parallel map-reduce condensing."""
+        if not self._needs_compaction(text):
+            return text
+        if self.compaction == "map_reduce":
+            chunks, output_tokens = self._map_reduce_chunks(text)
+            with ThreadPoolExecutor(max_workers=min(8, len(chunks))) as pool:
+                condensed = list(pool.map(
+                    lambda chunk: self.call_gemini(
+                        CONDENSE_PROMPT.format(chunk=chunk), model="1.5-flash", max_output_tokens=output_tokens
+                    ),
+                    chunks,
+                ))
+            text = "\n\n".join(condensed)
+        return truncate_to_budget(text, self.max_input_tokens)
+
+    async def acompact_input(self, text):
+        """Async version of compact_input."""
+        if not self._needs_compaction(text):
+            return text
+        if self.compaction == "map_reduce":
+            chunks, output_tokens = self._map_reduce_chunks(text)
+            condensed = await asyncio.gather(*(
+                self.acall_gemini(CONDENSE_PROMPT.format(chunk=chunk), model="1.5-flash", max_output_tokens=output_tokens)
+                for chunk in chunks
+            ))
+            text = "\n\n".join(condensed)
+        return truncate_to_budget(text, self.max_input_tokens)
+
+    def _check_api_key(self):
+        if not GEMINI_API_KEY and self.backend.requires_api_key:
             raise ValueError(f"[{self.name}] GEMINI_API_KEY is missing. Check environment variables.")
 
+    def _cached_reply(self, cache_key):
+        """Returns a cached reply for the key, or None."""
+        cached = self.cache.get(cache_key)
+        if cached is not None and self.verbose:
+            print(f"[{self.name}] Returning cached response.")
+        return cached
+
+    def _record_usage(self, model, prompt, reply, response=None):
+        """Records token usage, preferring the counts Gemini reports over local estimates."""
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or count_tokens(prompt)
+        output_tokens = getattr(usage, "candidates_token_count", None) or count_tokens(reply)
+        self.token_usage.record(self.name, model, prompt_tokens, output_tokens)
+
+    def _store_reply(self, cache_key, response, model, prompt):
+        """Extracts the text from a Gemini response, records its token usage and caches it."""
+        if response and hasattr(response, "text"):
+            reply = response.text.strip()
+        else:
+            reply = "No response generated."
+        self._record_usage(model, prompt, reply, response)
+
+        # Cache response
+        self.cache.set(cache_key, reply)
+
+        if self.verbose:
+            print(f"[{self.name}] Received response: {reply}")
+        return reply
+
+    @staticmethod
+    def _is_rate_limited(error):
+        return "429" in str(error) or "Resource has been exhausted" in str(error)
+
+    def call_gemini(self, prompt, model="1.5-flash", **generation_params):
+        """Calls Gemini AI with retries, backoff, and caching to avoid rate limits."""
+        self._check_api_key()
+
         # Check cache (avoid redundant API calls)
-        cache_key = hash(prompt)
-        if cache_key in self.cache:
-            if self.verbose:
-                print(f"[{self.name}] Returning cached response.")
-            return self.cache[cache_key]
+        cache_key = make_cache_key(model, prompt, generation_params, self.backend.cache_scope)
+        cached = self._cached_reply(cache_key)
+        if cached is not None:
+            return cached
+
+        # Concurrent callers with the same key share one upstream request
+        return self.in_flight.do(
+            cache_key, lambda: self._generate(prompt, model, generation_params, cache_key)
+        )
 
+    def _generate(self, prompt, model, generation_params, cache_key):
+        tokens = estimate_tokens(prompt, generation_params)
         retries = 0
         while retries < self.max_retries:
             try:
+                # Wait for budget instead of provoking a 429
+                self.rate_limiter.acquire(model, tokens)
+
                 if self.verbose:
-                    print(f"[{self.name}] Sending prompt to Gemini (1.5-flash): {prompt}")
+                    print(f"[{self.name}] Sending prompt to Gemini ({model}): {prompt}")
 
-                # Create a model instance
-                gemini_model = genai.GenerativeModel("1.5-flash")
-                response = gemini_model.generate_content(prompt)
+                # The backend reuses one model instance per model + config
+                response = self.backend.generate(model, prompt, generation_params)
+                return self._store_reply(cache_key, response, model, prompt)
 
-                if response and hasattr(response, "text"):
-                    reply = response.text.strip()
+            except Exception as e:
+                if self._is_rate_limited(e):
+                    self.rate_limiter.penalize(model)
+                    wait_time = 2 ** retries  # Exponential backoff: 2s, 4s, 8s...
+                    print(f"[{self.name}] Rate limit reached. Retrying in {wait_time} seconds...")
+                    time.sleep(wait_time)  # Wait before retrying
                 else:
-                    reply = "No response generated."
+                    print(f"[{self.name}] Unexpected error: {e}")
+                    break  # Stop retrying for non-rate-limit errors
 
-                # Cache response
-                self.cache[cache_key] = reply
+            retries += 1
+
+        raise Exception(f"[{self.name}] Failed to get response from Gemini after {self.max_retries} retries.")
+
+    async def acall_gemini(self, prompt, model="1.5-flash", **generation_params):
+        """Async version of call_gemini: uses the async Gemini client and never blocks the event loop."""
+        self._check_api_key()
+
+        cache_key = make_cache_key(model, prompt, generation_params, self.backend.cache_scope)
+        cached = self._cached_reply(cache_key)
+        if cached is not None:
+            return cached
+
+        return await self.in_flight.ado(
+            cache_key, lambda: self._agenerate(prompt, model, generation_params, cache_key)
+        )
+
+    async def _agenerate(self, prompt, model, generation_params, cache_key):
+        tokens = estimate_tokens(prompt, generation_params)
+        retries = 0
+        while retries < self.max_retries:
+            try:
+                await self.rate_limiter.aacquire(model, tokens)
 
                 if self.verbose:
-                    print(f"[{self.name}] Received response: {reply}")
-                return reply
+                    print(f"[{self.name}] Sending async prompt to Gemini ({model}): {prompt}")
+
+                response = await self.backend.agenerate(model, prompt, generation_params)
+                return self._store_reply(cache_key, response, model, prompt)
 
             except Exception as e:
-                if "429" in str(e) or "Resource has been exhausted" in str(e):
-                    wait_time = 2 ** retries  # Exponential backoff: 2s, 4s, 8s...
+                if self._is_rate_limited(e):
+                    self.rate_limiter.penalize(model)
+                    wait_time = 2 ** retries
                     print(f"[{self.name}] Rate limit reached. Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)  # Wait before retrying
+                    await asyncio.sleep(wait_time)
                 else:
                     print(f"[{self.name}] Unexpected error: {e}")
-                    break  # Stop retrying for non-rate-limit errors
+                    break
 
             retries += 1
 
         raise Exception(f"[{self.name}] Failed to get response from Gemini after {self.max_retries} retries.")
+
+    def stream_gemini(self, prompt, model="1.5-flash", **generation_params):
+        """Yields Gemini output chunks as they arrive; the full reply is cached once the stream completes."""
+        self._check_api_key()
+
+        cache_key = make_cache_key(model, prompt, generation_params, self.backend.cache_scope)
+        cached = self._cached_reply(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        tokens = estimate_tokens(prompt, generation_params)
+        retries = 0
+        while retries < self.max_retries:
+            parts = []
+            try:
+                self.rate_limiter.acquire(model, tokens)
+                if self.verbose:
+                    print(f"[{self.name}] Streaming prompt to Gemini ({model}): {prompt}")
+
+                for chunk in self.backend.stream(model, prompt, generation_params):
+                    text = getattr(chunk, "text", "")
+                    if text:
+                        parts.append(text)
+                        yield text
+
+                reply = "".join(parts).strip()
+                self._record_usage(model, prompt, reply)
+                self.cache.set(cache_key, reply)
+                return
+
+            except Exception as e:
+                # Only retry while nothing has been sent to the client yet
+                if parts or not self._is_rate_limited(e):
+                    print(f"[{self.name}] Streaming error: {e}")
+                    raise
+                self.rate_limiter.penalize(model)
+                wait_time = 2 ** retries
+                print(f"[{self.name}] Rate limit reached. Retrying in {wait_time} seconds...")
+                time.sleep(wait_time)
+
+            retries += 1
+
+        raise Exception(f"[{self.name}] Failed to stream response from Gemini after {self.max_retries} retries.")
+
+    async def astream_gemini(self, prompt, model="1.5-flash", **generation_params):
+        """Async version of stream_gemini."""
+        self._check_api_key()
+
+        cache_key = make_cache_key(model, prompt, generation_params, self.backend.cache_scope)
+        cached = self._cached_reply(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        tokens = estimate_tokens(prompt, generation_params)
+        retries = 0
+        while retries < self.max_retries:
+            parts = []
+            try:
+                await self.rate_limiter.aacquire(model, tokens)
+                if self.verbose:
+                    print(f"[{self.name}] Streaming async prompt to Gemini ({model}): {prompt}")
+
+                async for chunk in self.backend.astream(model, prompt, generation_params):
+                    text = getattr(chunk, "text", "")
+                    if text:
+                        parts.append(text)
+                        yield text
+
+                reply = "".join(parts).strip()
+                self._record_usage(model, prompt, reply)
+                self.cache.set(cache_key, reply)
+                return
+
+            except Exception as e:
+                if parts or not self._is_rate_limited(e):
+                    print(f"[{self.name}] Streaming error: {e}")
+                    raise
+                self.rate_limiter.penalize(model)
+                wait_time = 2 ** retries
+                print(f"[{self.name}] Rate limit reached. Retrying in {wait_time} seconds...")
+                await asyncio.sleep(wait_time)
+
+            retries += 1
+
+        raise Exception(f"[{self.name}] Failed to stream response from Gemini after {self.max_retries} retries.")
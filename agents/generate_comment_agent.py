@@ -1,15 +1,133 @@
+import asyncio
+import json
+import re
+
 from .agent_base import AgentBase
+from .rate_limiter import request_priority, PRIORITY_BATCH
+from .token_budget import count_tokens
+
+# Batch sizing: posts are packed into one prompt until either limit is reached
+MAX_BATCH_SIZE = 20
+MAX_BATCH_INPUT_TOKENS = 6000
+COMMENT_OUTPUT_TOKENS = 150  # Output budget reserved per post
 
 class GenerateCommentAgent(AgentBase):
+    max_input_tokens = 4000
+
     def __init__(self, max_retries=2, verbose=True):
         super().__init__(name="GenerateCommentAgent", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, post_content):
-        """Generates a relevant LinkedIn comment for the given post."""
-        prompt = (
+    def build_prompt(self, post_content):
+        return (
             "You are an expert at generating engaging LinkedIn comments. Based on the given post content, "
             "write a professional, insightful, and engaging comment:\n\n"
             f"Post: {post_content}\n\nGenerated Comment:"
         )
-        comment = self.call_gemini(prompt, model="1.5-flash")
+
+    def execute(self, post_content):
+        """Generates a relevant LinkedIn comment for the given post."""
+        post_content = self.compact_input(post_content)
+        comment = self.call_gemini(self.build_prompt(post_content), model="1.5-flash")
         return comment
+
+    async def aexecute(self, post_content):
+        """Async version of execute."""
+        post_content = await self.acompact_input(post_content)
+        return await self.acall_gemini(self.build_prompt(post_content), model="1.5-flash")
+
+    def build_batch_prompt(self, posts):
+        items = [{"id": i, "post": post} for i, post in enumerate(posts)]
+        return (
+            "You are an expert at generating engaging LinkedIn comments. For each post below, "
+            "write a professional, insightful, and engaging comment.\n\n"
+            "Respond with a JSON array only, one object per post, in the form "
+            '[{"id": <post id>, "comment": "<comment>"}].\n\n'
+            f"Posts:\n{json.dumps(items, ensure_ascii=False)}\n\nComments JSON:"
+        )
+
+    @staticmethod
+    def plan_batches(posts):
+        """Splits post indexes into batches that fit the input token and batch size limits."""
+        batches, current, current_tokens = [], [], 0
+        for i, post in enumerate(posts):
+            tokens = count_tokens(post) + 20  # Plus the JSON item overhead
+            if current and (len(current) >= MAX_BATCH_SIZE or current_tokens + tokens > MAX_BATCH_INPUT_TOKENS):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def parse_batch_reply(reply, count):
+        """Maps a batch reply back to {position: comment}; missing or malformed entries are left out."""
+        text = re.sub(r"^```(?:json)?\s*|\s*```$", "", reply.strip())
+        try:
+            items = json.loads(text)
+        except ValueError:
+            return {}
+        if not isinstance(items, list):
+            return {}
+
+        comments = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            position, comment = item.get("id"), item.get("comment")
+            if isinstance(position, int) and 0 <= position < count and isinstance(comment, str) and comment.strip():
+                comments[position] = comment.strip()
+        return comments
+
+    def _batch_params(self, size):
+        return {"response_mime_type": "application/json", "max_output_tokens": COMMENT_OUTPUT_TOKENS * size + 100}
+
+    def execute_batch(self, posts):
+        """Generates one comment per post with one Gemini call per batch, falling back to single calls."""
+        posts = [self.compact_input(post) for post in posts]
+        comments = [None] * len(posts)
+        with request_priority(PRIORITY_BATCH):
+            for batch in self.plan_batches(posts):
+                batch_posts = [posts[i] for i in batch]
+                try:
+                    reply = self.call_gemini(
+                        self.build_batch_prompt(batch_posts), model="1.5-flash", **self._batch_params(len(batch))
+                    )
+                    parsed = self.parse_batch_reply(reply, len(batch))
+                except Exception as e:
+                    print(f"[{self.name}] Batch call failed, falling back to single calls: {e}")
+                    parsed = {}
+                for position, i in enumerate(batch):
+                    comments[i] = parsed.get(position) or self.execute(posts[i])
+        return comments
+
+    async def aexecute_batch(self, posts):
+        """Async version of execute_batch; batches and per-post fallbacks run concurrently."""
+        posts = [await self.acompact_input(post) for post in posts]
+        comments = [None] * len(posts)
+
+        async def run_batch(batch):
+            batch_posts = [posts[i] for i in batch]
+            try:
+                reply = await self.acall_gemini(
+                    self.build_batch_prompt(batch_posts), model="1.5-flash", **self._batch_params(len(batch))
+                )
+                parsed = self.parse_batch_reply(reply, len(batch))
+            except Exception as e:
+                print(f"[{self.name}] Batch call failed, falling back to single calls: {e}")
+                parsed = {}
+
+            missing = [i for position, i in enumerate(batch) if position not in parsed]
+            if missing and self.verbose:
+                print(f"[{self.name}] {len(missing)} post(s) missing from batch reply. Retrying individually.")
+            fallbacks = await asyncio.gather(*(self.aexecute(posts[i]) for i in missing))
+            for position, i in enumerate(batch):
+                if position in parsed:
+                    comments[i] = parsed[position]
+            for i, comment in zip(missing, fallbacks):
+                comments[i] = comment
+
+        with request_priority(PRIORITY_BATCH):
+            await asyncio.gather(*(run_batch(batch) for batch in self.plan_batches(posts)))
+        return comments
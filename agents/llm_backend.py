@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import httpx
+
+from model_registry import model_registry
+
+# ✅ "gemini" (default) talks to Google; "http" talks to a Gemini stand-in such as benchmarks/fake_gemini_server.py
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+LLM_BACKEND_URL = os.getenv("LLM_BACKEND_URL", "http://127.0.0.1:8100")
+LLM_BACKEND_TIMEOUT = float(os.getenv("LLM_BACKEND_TIMEOUT", 60))
+
+
+class GeminiBackend:
+    """Sends prompts to Gemini through the shared model registry."""
+
+    name = "gemini"
+    requires_api_key = True
+    cache_scope = "gemini"  # part of every response cache key
+
+    def generate(self, model, prompt, params):
+        return model_registry.get(model, params).generate_content(prompt)
+
+    async def agenerate(self, model, prompt, params):
+        return await model_registry.get(model, params).generate_content_async(prompt)
+
+    def stream(self, model, prompt, params):
+        return model_registry.get(model, params).generate_content(prompt, stream=True)
+
+    async def astream(self, model, prompt, params):
+        response = await model_registry.get(model, params).generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield chunk
+
+    async def awarm_up(self, ping=True):
+        return await model_registry.awarm_up(ping=ping)
+
+
+class HttpBackend:
+    """Sends prompts to a local Gemini stand-in over HTTP, returning Gemini-shaped response objects.
+
+    The server answers POST /v1/generate with {"text", "usage"} and POST /v1/stream with
+    SSE `data: {"text": ...}` chunks. HTTP 429 is raised with Gemini's wording so the
+    agents' rate-limit handling treats it exactly like the real API.
+    """
+
+    name = "http"
+    requires_api_key = False
+
+    def __init__(self, base_url=LLM_BACKEND_URL, timeout=LLM_BACKEND_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # Stand-in replies must never be served as Gemini ones from a shared cache file
+        self.cache_scope = f"http:{self.base_url}"
+        self.client = httpx.Client(base_url=self.base_url, timeout=timeout)
+        self.async_clients = {}  # event loop -> httpx.AsyncClient
+
+    def _async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self.async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+            self.async_clients[loop] = client
+        return client
+
+    @staticmethod
+    def _payload(model, prompt, params):
+        return {"model": model, "prompt": prompt, "params": params or {}}
+
+    @staticmethod
+    def _check(response):
+        if response.status_code == 429:
+            raise Exception("429 Resource has been exhausted (fake backend)")
+        response.raise_for_status()
+
+    @staticmethod
+    def _to_response(data):
+        usage = data.get("usage", {})
+        return SimpleNamespace(
+            text=data.get("text", ""),
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=usage.get("prompt_tokens"),
+                candidates_token_count=usage.get("output_tokens"),
+            ),
+        )
+
+    @staticmethod
+    def _chunk(line):
+        if line.startswith("data:"):
+            return SimpleNamespace(text=json.loads(line[5:].strip()).get("text", ""))
+        return None
+
+    def generate(self, model, prompt, params):
+        response = self.client.post("/v1/generate", json=self._payload(model, prompt, params))
+        self._check(response)
+        return self._to_response(response.json())
+
+    async def agenerate(self, model, prompt, params):
+        response = await self._async_client().post("/v1/generate", json=self._payload(model, prompt, params))
+        self._check(response)
+        return self._to_response(response.json())
+
+    def stream(self, model, prompt, params):
+        with self.client.stream("POST", "/v1/stream", json=self._payload(model, prompt, params)) as response:
+            self._check(response)
+            for line in response.iter_lines():
+                chunk = self._chunk(line)
+                if chunk is not None:
+                    yield chunk
+
+    async def astream(self, model, prompt, params):
+        async with self._async_client().stream("POST", "/v1/stream", json=self._payload(model, prompt, params)) as response:
+            self._check(response)
+            async for line in response.aiter_lines():
+                chunk = self._chunk(line)
+                if chunk is not None:
+                    yield chunk
+
+    async def awarm_up(self, ping=True):
+        if ping:
+            try:
+                await self._async_client().get("/health")
+            except httpx.HTTPError as e:
+                print(f"[HttpBackend] Warm-up against {self.base_url} failed: {e}")
+        return {"http": self.base_url}
+
+
+def create_backend(name=LLM_BACKEND):
+    if name == "gemini":
+        return GeminiBackend()
+    if name == "http":
+        return HttpBackend()
+    raise ValueError(f"Unknown LLM_BACKEND '{name}'. Use 'gemini' or 'http'.")
+
+
+# ✅ Backend shared by every agent in this process
+llm_backend = create_backend()
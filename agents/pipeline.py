@@ -0,0 +1,91 @@
+import asyncio
+
+
+def _references(value):
+    """Returns the names referenced by a step argument ("$name" strings, also inside lists/dicts)."""
+    if isinstance(value, str) and value.startswith("$"):
+        return {value[1:]}
+    if isinstance(value, (list, tuple)):
+        return set().union(*(_references(v) for v in value)) if value else set()
+    if isinstance(value, dict):
+        return set().union(*(_references(v) for v in value.values())) if value else set()
+    return set()
+
+
+def _resolve(value, scope):
+    if isinstance(value, str) and value.startswith("$"):
+        return scope[value[1:]]
+    if isinstance(value, list):
+        return [_resolve(v, scope) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_resolve(v, scope) for v in value)
+    if isinstance(value, dict):
+        return {k: _resolve(v, scope) for k, v in value.items()}
+    return value
+
+
+def plan_pipeline(steps, inputs):
+    """Validates a pipeline and returns {step_name: set(step dependencies)}.
+
+    Each step is {"agent": agent_name, "args": [...], "kwargs": {...}, "after": [...]}.
+    Arguments written as "$name" are replaced by the pipeline input or the output of
+    the step with that name; referencing a step (or listing it in "after") makes it a dependency.
+    """
+    dependencies = {}
+    for name, step in steps.items():
+        if name in inputs:
+            raise ValueError(f"Pipeline step '{name}' shadows an input with the same name.")
+        if "agent" not in step:
+            raise ValueError(f"Pipeline step '{name}' has no agent.")
+        refs = _references(step.get("args", [])) | _references(step.get("kwargs", {}))
+        refs |= set(step.get("after", []))
+        unknown = refs - set(steps) - set(inputs)
+        if unknown:
+            raise ValueError(f"Pipeline step '{name}' references unknown names: {sorted(unknown)}")
+        dependencies[name] = refs & set(steps)
+
+    # Kahn's algorithm to reject cycles up front
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Pipeline has a dependency cycle between: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return dependencies
+
+
+async def run_pipeline(get_agent, steps, inputs=None):
+    """Runs a DAG of agent steps, starting every step as soon as its dependencies have finished.
+
+    Independent steps run concurrently through each agent's aexecute(). Returns {step_name: output}.
+    """
+    inputs = inputs or {}
+    dependencies = plan_pipeline(steps, inputs)
+    scope = dict(inputs)
+    results = {}
+    running = {}
+
+    async def run_step(name):
+        step = steps[name]
+        args = _resolve(step.get("args", []), scope)
+        kwargs = _resolve(step.get("kwargs", {}), scope)
+        return await get_agent(step["agent"]).aexecute(*args, **kwargs)
+
+    try:
+        while len(results) < len(steps):
+            for name, deps in dependencies.items():
+                if name not in results and name not in running.values() and deps <= set(results):
+                    running[asyncio.ensure_future(run_step(name))] = name
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                results[name] = scope[name] = task.result()  # Re-raises the step's error
+    finally:
+        for task in running:
+            task.cancel()
+
+    return results
@@ -0,0 +1,25 @@
+from .agent_base import AgentBase
+
+class RagAnswerAgent(AgentBase):
+    max_input_tokens = 1000  # The question; the context has its own budget (RAG_CONTEXT_MAX_TOKENS)
+
+    def __init__(self, max_retries=3, verbose=True):
+        super().__init__(name="RagAnswerAgent", max_retries=max_retries, verbose=verbose)
+
+    def build_prompt(self, query, context):
+        return (
+            "You are a LinkedIn assistant. Answer the question using the context below.\n"
+            "If the context does not contain the answer, say so briefly and give your best general advice.\n\n"
+            f"Context:\n{context or 'No relevant context found.'}\n\n"
+            f"Question:\n{query}\n\nAnswer:"
+        )
+
+    def execute(self, query, context):
+        """Answers `query` grounded on the retrieved `context`."""
+        query = self.compact_input(query)
+        return self.call_gemini(self.build_prompt(query, context), model="1.5-flash", temperature=0.3)
+
+    async def aexecute(self, query, context):
+        """Async version of execute."""
+        query = await self.acompact_input(query)
+        return await self.acall_gemini(self.build_prompt(query, context), model="1.5-flash", temperature=0.3)
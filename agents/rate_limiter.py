@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from filelock import FileLock
+
+from .token_budget import count_tokens
+
+# ✅ Priorities: lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# ✅ Per-model budgets (requests/minute, tokens/minute). GEMINI_RPM / GEMINI_TPM override the default entry.
+# The local stand-in (LLM_BACKEND=http) has no Gemini quota, so by default it is effectively unthrottled.
+if os.getenv("LLM_BACKEND", "gemini").lower() == "http":
+    DEFAULT_LIMITS = {
+        "default": (int(os.getenv("GEMINI_RPM", 1_000_000)), int(os.getenv("GEMINI_TPM", 1_000_000_000))),
+    }
+else:
+    DEFAULT_LIMITS = {
+        "default": (int(os.getenv("GEMINI_RPM", 15)), int(os.getenv("GEMINI_TPM", 1_000_000))),
+        "gemini-pro": (60, 32_000),
+    }
+
+# Set to a file path to share buckets between worker processes (guarded by a file lock)
+RATE_LIMIT_STATE_PATH = os.getenv("GEMINI_RATE_LIMIT_STATE")
+
+POLL_INTERVAL = 0.05
+DEFAULT_OUTPUT_TOKENS = 512
+
+_current_priority = contextvars.ContextVar("gemini_request_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority):
+    """Runs the enclosed Gemini calls at the given priority (e.g. PRIORITY_BATCH for bulk jobs)."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def estimate_tokens(prompt, generation_params=None):
+    """Prompt + completion token estimate used to charge the tokens/minute bucket."""
+    params = generation_params or {}
+    return count_tokens(prompt) + int(params.get("max_output_tokens", DEFAULT_OUTPUT_TOKENS))
+
+
+class RateLimiter:
+    """Proactive token-bucket limiter enforcing requests/minute and tokens/minute per model.
+
+    Waiting callers are queued per model and served in (priority, arrival) order, so
+    interactive requests overtake batch jobs while callers of equal priority stay FIFO.
+    """
+
+    def __init__(self, limits=None, state_path=RATE_LIMIT_STATE_PATH, clock=time.time):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.clock = clock  # wall clock for bucket refills (shared with other processes in file mode)
+        self.state_path = state_path
+        self.file_lock = FileLock(f"{state_path}.lock") if state_path else None
+        self.lock = threading.Lock()
+        self.buckets = {}  # model -> {"requests": float, "tokens": float, "updated": float}
+        self.queues = {}  # model -> heap of (priority, seq)
+        self.seq = itertools.count()
+        self.waited_seconds = 0.0
+        self.throttled = 0
+        self.granted = 0
+
+    def _limits_for(self, model):
+        return self.limits.get(model, self.limits["default"])
+
+    def _refill(self, model, bucket, now):
+        rpm, tpm = self._limits_for(model)
+        elapsed = max(0.0, now - bucket["updated"])
+        bucket["requests"] = min(rpm, bucket["requests"] + elapsed * rpm / 60.0)
+        bucket["tokens"] = min(tpm, bucket["tokens"] + elapsed * tpm / 60.0)
+        bucket["updated"] = now
+
+    def _take(self, model, tokens, buckets):
+        """Consumes from the model's buckets if possible; returns seconds to wait otherwise (0 = granted)."""
+        rpm, tpm = self._limits_for(model)
+        now = self.clock()
+        bucket = buckets.setdefault(model, {"requests": float(rpm), "tokens": float(tpm), "updated": now})
+        self._refill(model, bucket, now)
+        tokens = min(tokens, tpm)  # A single oversized call must not wait forever
+        request_wait = (1 - bucket["requests"]) * 60.0 / rpm if bucket["requests"] < 1 else 0.0
+        token_wait = (tokens - bucket["tokens"]) * 60.0 / tpm if bucket["tokens"] < tokens else 0.0
+        wait = max(request_wait, token_wait)
+        if wait <= 0:
+            bucket["requests"] -= 1
+            bucket["tokens"] -= tokens
+        return wait
+
+    def _take_shared(self, model, tokens):
+        """Same as _take, but reads and writes bucket state in the shared state file."""
+        with self.file_lock:
+            try:
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    buckets = json.load(f)
+            except (OSError, ValueError):
+                buckets = {}
+            wait = self._take(model, tokens, buckets)
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump(buckets, f)
+        return wait
+
+    def _enqueue(self, model, priority):
+        with self.lock:
+            ticket = (priority, next(self.seq))
+            heapq.heappush(self.queues.setdefault(model, []), ticket)
+            return ticket
+
+    def _dequeue(self, model, ticket):
+        with self.lock:
+            queue = self.queues.get(model, [])
+            if ticket in queue:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+
+    def _try_acquire(self, model, ticket, tokens):
+        """Returns 0 once the ticket is at the head of its queue and the budget allows the call."""
+        with self.lock:
+            if self.queues[model][0] != ticket:
+                return POLL_INTERVAL
+            if self.file_lock is not None:
+                wait = self._take_shared(model, tokens)
+            else:
+                wait = self._take(model, tokens, self.buckets)
+            if wait <= 0:
+                heapq.heappop(self.queues[model])
+                self.granted += 1
+            return wait
+
+    def acquire(self, model, tokens=1, priority=None):
+        """Blocks until a request of `tokens` tokens may be sent to `model`."""
+        priority = _current_priority.get() if priority is None else priority
+        ticket = self._enqueue(model, priority)
+        started = time.monotonic()
+        try:
+            while True:
+                wait = self._try_acquire(model, ticket, tokens)
+                if wait <= 0:
+                    break
+                time.sleep(min(wait, POLL_INTERVAL))
+        except BaseException:
+            self._dequeue(model, ticket)
+            raise
+        self._record_wait(time.monotonic() - started)
+
+    async def aacquire(self, model, tokens=1, priority=None):
+        """Async version of acquire."""
+        priority = _current_priority.get() if priority is None else priority
+        ticket = self._enqueue(model, priority)
+        started = time.monotonic()
+        try:
+            while True:
+                if self.file_lock is not None:
+                    # The shared state file is locked and read under self.lock: keep that off the event loop
+                    wait = await asyncio.to_thread(self._try_acquire, model, ticket, tokens)
+                else:
+                    wait = self._try_acquire(model, ticket, tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, POLL_INTERVAL))
+        except BaseException:
+            self._dequeue(model, ticket)
+            raise
+        self._record_wait(time.monotonic() - started)
+
+    def _record_wait(self, waited):
+        if waited > POLL_INTERVAL:
+            with self.lock:
+                self.throttled += 1
+                self.waited_seconds += waited
+
+    def penalize(self, model):
+        """Empties the model's request bucket after an upstream 429 so every caller backs off together."""
+        with self.lock:
+            if self.file_lock is not None:
+                with self.file_lock:
+                    try:
+                        with open(self.state_path, "r", encoding="utf-8") as f:
+                            buckets = json.load(f)
+                    except (OSError, ValueError):
+                        buckets = {}
+                    self._drain(model, buckets)
+                    with open(self.state_path, "w", encoding="utf-8") as f:
+                        json.dump(buckets, f)
+            else:
+                self._drain(model, self.buckets)
+
+    def _drain(self, model, buckets):
+        if model in buckets:
+            self._refill(model, buckets[model], self.clock())
+            buckets[model]["requests"] = min(buckets[model]["requests"], 0.0)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "waited_seconds": round(self.waited_seconds, 3),
+                "queued": {model: len(queue) for model, queue in self.queues.items() if queue},
+            }
+
+
+# ✅ One limiter per process; set GEMINI_RATE_LIMIT_STATE to share budgets across workers
+rate_limiter = RateLimiter()
@@ -1,17 +1,31 @@
 from .agent_base import AgentBase
 
 class RefinerAgent(AgentBase):
+    max_input_tokens = 4000
+
     def __init__(self, max_retries=2, verbose=True):
         super().__init__(name="RefinerAgent", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, draft):
-        """Refines a LinkedIn post for clarity, engagement, and professional impact."""
-        prompt = (
+    def build_prompt(self, draft):
+        return (
             "You are an expert social media editor who enhances LinkedIn posts for clarity, engagement, "
             "and professional impact.\n\n"
             "Please refine the following LinkedIn post draft to make it more engaging, concise, and impactful:\n\n"
             f"{draft}\n\nRefined LinkedIn Post:"
         )
-        
-        refined_post = self.call_gemini(prompt, model="1.5-flash")
+
+    def execute(self, draft):
+        """Refines a LinkedIn post for clarity, engagement, and professional impact."""
+        draft = self.compact_input(draft)
+        refined_post = self.call_gemini(self.build_prompt(draft), model="1.5-flash")
         return refined_post
+
+    async def aexecute(self, draft):
+        """Async version of execute."""
+        draft = await self.acompact_input(draft)
+        return await self.acall_gemini(self.build_prompt(draft), model="1.5-flash")
+
+    async def astream(self, draft):
+        draft = await self.acompact_input(draft)
+        async for chunk in self.astream_gemini(self.build_prompt(draft), model="1.5-flash"):
+            yield chunk
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ✅ Cache settings (override through environment variables)
+CACHE_DB_PATH = os.getenv("GEMINI_CACHE_PATH", ".gemini_cache.sqlite3")
+CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", 1024))
+CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CACHE_TTL", 7 * 24 * 3600))
+CACHE_MAX_DISK_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_DISK_ENTRIES", 50_000))
+CACHE_PRUNE_INTERVAL = 256  # disk writes between prunes of expired and surplus rows
+
+
+def make_cache_key(model, prompt, params=None, backend="gemini"):
+    """Builds a stable digest of backend + model + prompt + generation params (same value in every process).
+
+    `backend` is the LLM backend's cache_scope, so a benchmark against the local stand-in
+    never fills a shared cache file with replies that would later be served as Gemini's.
+    """
+    payload = json.dumps(
+        {"backend": backend, "model": model, "prompt": prompt, "params": params or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier Gemini response cache: in-memory LRU in front of a SQLite file shared by all workers."""
+
+    def __init__(self, path=CACHE_DB_PATH, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS,
+                 max_disk_entries=CACHE_MAX_DISK_ENTRIES, prune_interval=CACHE_PRUNE_INTERVAL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.prune_interval = prune_interval
+        self.writes = 0
+        self.memory = OrderedDict()  # key -> (reply, expires_at)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.path:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, reply TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses (expires_at)")
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"[ResponseCache] Disk tier disabled ({e}). Using memory only.")
+                self.path = None
+            else:
+                self.prune()
+
+    def _connect(self):
+        """Returns a SQLite connection owned by the current thread and process."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def _remember(self, key, reply, expires_at):
+        """Stores an entry in the memory tier, evicting the least recently used ones."""
+        with self.lock:
+            self.memory[key] = (reply, expires_at)
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_entries:
+                self.memory.popitem(last=False)
+
+    def get(self, key):
+        """Returns the cached reply for a key, or None on a miss."""
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self.memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return entry[0]
+                del self.memory[key]
+
+        if self.path:
+            try:
+                row = self._connect().execute(
+                    "SELECT reply, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"[ResponseCache] Disk read failed: {e}")
+                row = None
+            if row is not None:
+                self._remember(key, row[0], row[1])
+                with self.lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return row[0]
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, reply, ttl=None):
+        """Stores a reply in both tiers."""
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        self._remember(key, reply, expires_at)
+        if self.path:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, reply, expires_at) VALUES (?, ?, ?)",
+                    (key, reply, expires_at),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"[ResponseCache] Disk write failed: {e}")
+                return
+            with self.lock:
+                self.writes += 1
+                due = self.writes % self.prune_interval == 0
+            if due:
+                self.prune()
+
+    def purge_expired(self):
+        """Drops expired entries from both tiers and returns how many disk rows were removed."""
+        now = time.time()
+        with self.lock:
+            for key in [k for k, (_, expires_at) in self.memory.items() if expires_at <= now]:
+                del self.memory[key]
+        if not self.path:
+            return 0
+        conn = self._connect()
+        removed = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        conn.commit()
+        return removed
+
+    def prune(self):
+        """Purges expired rows, then drops the rows closest to expiry beyond max_disk_entries.
+        Runs on open and every prune_interval writes; returns how many disk rows were removed."""
+        if not self.path:
+            return 0
+        try:
+            removed = self.purge_expired()
+            conn = self._connect()
+            surplus = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_disk_entries
+            if surplus > 0:
+                removed += conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY expires_at LIMIT ?)",
+                    (surplus,),
+                ).rowcount
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"[ResponseCache] Disk prune failed: {e}")
+            return 0
+        return removed
+
+    def clear(self):
+        """Empties both tiers and resets the counters."""
+        with self.lock:
+            self.memory.clear()
+            self.hits = self.memory_hits = self.disk_hits = self.misses = 0
+        if self.path:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def disk_entries(self):
+        """Number of rows in the SQLite file, including ones written by earlier runs."""
+        if not self.path:
+            return 0
+        try:
+            return self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def stats(self):
+        """Returns hit/miss counters for this process."""
+        disk_entries = self.disk_entries()
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "disk_entries": disk_entries,
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "max_entries": self.max_entries,
+            }
+
+
+# ✅ One cache shared by every agent in this process (and by other workers through the SQLite file)
+response_cache = ResponseCache()
@@ -1,16 +1,41 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from .agent_base import AgentBase
+from .token_budget import split_into_chunks
 
 class SanitizeDataTool(AgentBase):
+    # Nothing may be dropped here, so over-budget data is sanitized chunk by chunk instead of compacted
+    max_input_tokens = 4000
+
     def __init__(self, max_retries=3, verbose=True):
         super().__init__(name="SanitizeDataTool", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, data):
-        """Sanitizes data by removing sensitive information."""
-        prompt = (
+    def build_prompt(self, data):
+        return (
             "You are an AI assistant that sanitizes data by removing sensitive information.\n\n"
             "Remove all sensitive information from the following data:\n\n"
             f"{data}\n\nSanitized Data:"
         )
 
-        sanitized_data = self.call_gemini(prompt, model="1.5-flash")
-        return sanitized_data
+    def execute(self, data):
+        """Sanitizes data by removing sensitive information."""
+        if self._needs_compaction(data):
+            chunks = split_into_chunks(data, self.max_input_tokens)
+            with ThreadPoolExecutor(max_workers=min(8, len(chunks))) as pool:
+                return "\n\n".join(pool.map(self._sanitize, chunks))
+        return self._sanitize(data)
+
+    async def aexecute(self, data):
+        """Async version of execute."""
+        if self._needs_compaction(data):
+            chunks = split_into_chunks(data, self.max_input_tokens)
+            return "\n\n".join(await asyncio.gather(*(self._asanitize(chunk) for chunk in chunks)))
+        return await self._asanitize(data)
+
+    def _sanitize(self, data):
+        # Chunks come from split_into_chunks and already fit the budget: no second compaction pass
+        return self.call_gemini(self.build_prompt(data), model="1.5-flash")
+
+    async def _asanitize(self, data):
+        return await self.acall_gemini(self.build_prompt(data), model="1.5-flash")
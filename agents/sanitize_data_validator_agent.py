@@ -1,12 +1,13 @@
 from .agent_base import AgentBase
 
 class SanitizeDataValidatorAgent(AgentBase):
+    max_input_tokens = 4000  # Per field
+
     def __init__(self, max_retries=2, verbose=True):
         super().__init__(name="SanitizeDataValidatorAgent", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, original_data, sanitized_data):
-        """Validates that sensitive information has been removed from data."""
-        prompt = (
+    def build_prompt(self, original_data, sanitized_data):
+        return (
             "You are an AI assistant that validates the sanitization of data by checking for the removal of sensitive information.\n\n"
             "Given the original data and the sanitized data, verify that all sensitive information has been removed.\n"
             "List any remaining sensitive information in the sanitized data and rate the sanitization process on a scale of 1 to 5, where 5 indicates complete sanitization.\n\n"
@@ -15,5 +16,13 @@ class SanitizeDataValidatorAgent(AgentBase):
             "Validation:"
         )
 
-        validation = self.call_gemini(prompt, model="1.5-flash")
+    def execute(self, original_data, sanitized_data):
+        """Validates that sensitive information has been removed from data."""
+        original_data, sanitized_data = self.compact_input(original_data), self.compact_input(sanitized_data)
+        validation = self.call_gemini(self.build_prompt(original_data, sanitized_data), model="1.5-flash")
         return validation
+
+    async def aexecute(self, original_data, sanitized_data):
+        """Async version of execute."""
+        original_data, sanitized_data = await self.acompact_input(original_data), await self.acompact_input(sanitized_data)
+        return await self.acall_gemini(self.build_prompt(original_data, sanitized_data), model="1.5-flash")
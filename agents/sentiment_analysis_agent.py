@@ -1,15 +1,25 @@
 from .agent_base import AgentBase
 
 class SentimentAnalysisAgent(AgentBase):
+    max_input_tokens = 4000
+
     def __init__(self, max_retries=2, verbose=True):
         super().__init__(name="SentimentAnalysisAgent", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, text):
-        """Analyzes sentiment of the given text."""
-        prompt = (
+    def build_prompt(self, text):
+        return (
             "You are an expert in sentiment analysis. Determine the sentiment of the following text "
             "and provide a concise summary:\n\n"
             f"Text: {text}\n\nSentiment:"
         )
-        sentiment = self.call_gemini(prompt, model="1.5-flash")
+
+    def execute(self, text):
+        """Analyzes sentiment of the given text."""
+        text = self.compact_input(text)
+        sentiment = self.call_gemini(self.build_prompt(text), model="1.5-flash")
         return sentiment
+
+    async def aexecute(self, text):
+        """Async version of execute."""
+        text = await self.acompact_input(text)
+        return await self.acall_gemini(self.build_prompt(text), model="1.5-flash")
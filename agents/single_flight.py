@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+# Result handed to followers when the leader was interrupted (cancelled, KeyboardInterrupt):
+# they claim the key again instead of failing with the leader's interruption.
+_ABANDONED = object()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key so only one of them reaches the upstream API.
+
+    The first caller for a key (the leader) runs the call; everyone arriving while it is still
+    in flight waits on the same future. Sync and async callers share one table, so a request
+    served through acall_gemini can be joined by a thread using call_gemini and vice versa.
+
+    Only ordinary exceptions are shared with followers. Async calls run in their own task,
+    so cancelling the caller that started one does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}  # key -> concurrent.futures.Future
+        self.leaders = 0
+        self.deduplicated = 0
+        self.tasks = set()  # upstream tasks of async leaders, referenced until done
+
+    def _claim(self, key):
+        """Returns (future, is_leader) for a key."""
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future, False
+            future = Future()
+            self.in_flight[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _release(self, key, future, result=None, error=None):
+        with self.lock:
+            self.in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """Runs fn() once per key among concurrent callers and returns its result to all of them."""
+        while True:
+            future, leader = self._claim(key)
+            if not leader:
+                result = future.result()
+                if result is _ABANDONED:
+                    continue
+                return result
+            try:
+                result = fn()
+            except Exception as e:
+                self._release(key, future, error=e)
+                raise
+            except BaseException:
+                self._release(key, future, result=_ABANDONED)
+                raise
+            self._release(key, future, result=result)
+            return result
+
+    async def _lead(self, key, future, coro_fn):
+        try:
+            result = await coro_fn()
+        except Exception as e:
+            self._release(key, future, error=e)
+            return
+        except BaseException:
+            self._release(key, future, result=_ABANDONED)
+            raise
+        self._release(key, future, result=result)
+
+    async def ado(self, key, coro_fn):
+        """Async version of do(): coro_fn is a zero-argument callable returning a coroutine."""
+        while True:
+            future, leader = self._claim(key)
+            if leader:
+                task = asyncio.ensure_future(self._lead(key, future, coro_fn))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+            # shield: a cancelled waiter must not cancel the shared future (or the upstream task)
+            result = await asyncio.shield(asyncio.wrap_future(future))
+            if result is _ABANDONED:
+                continue
+            return result
+
+    def stats(self):
+        with self.lock:
+            return {
+                "in_flight": len(self.in_flight),
+                "upstream_calls": self.leaders,
+                "deduplicated": self.deduplicated,
+            }
+
+
+# ✅ Shared by every agent so identical prompts coalesce across agents and routes
+single_flight = SingleFlight()
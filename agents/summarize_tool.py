@@ -1,16 +1,31 @@
 from .agent_base import AgentBase
 
 class SummarizeTool(AgentBase):
+    max_input_tokens = 8000
+    compaction = "map_reduce"  # Long posts are condensed chunk by chunk before summarizing
+
     def __init__(self, max_retries=3, verbose=True):
         super().__init__(name="SummarizeTool", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, text):
-        """Summarizes any LinkedIn post concisely for better insights."""
-        prompt = (
+    def build_prompt(self, text):
+        return (
             "You are an AI assistant specializing in summarizing LinkedIn posts for quick insights.\n\n"
             "Please generate a concise and insightful summary of the following LinkedIn post:\n\n"
             f"{text}\n\nSummary:"
         )
 
-        summary = self.call_gemini(prompt, model="1.5-flash")
-        return summary
\ No newline at end of file
+    def execute(self, text):
+        """Summarizes any LinkedIn post concisely for better insights."""
+        text = self.compact_input(text)
+        summary = self.call_gemini(self.build_prompt(text), model="1.5-flash")
+        return summary
+
+    async def aexecute(self, text):
+        """Async version of execute."""
+        text = await self.acompact_input(text)
+        return await self.acall_gemini(self.build_prompt(text), model="1.5-flash")
+
+    async def astream(self, text):
+        text = await self.acompact_input(text)
+        async for chunk in self.astream_gemini(self.build_prompt(text), model="1.5-flash"):
+            yield chunk
@@ -1,12 +1,13 @@
 from .agent_base import AgentBase
 
 class SummarizeValidatorAgent(AgentBase):
+    max_input_tokens = 8000  # Same budget as SummarizeTool, per field
+
     def __init__(self, max_retries=2, verbose=True):
         super().__init__(name="SummarizeValidatorAgent", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, original_text, summary):
-        """Validates the accuracy and quality of a LinkedIn post summary."""
-        prompt = (
+    def build_prompt(self, original_text, summary):
+        return (
             "You are an AI assistant that evaluates the quality of LinkedIn post summaries.\n\n"
             "Given the original LinkedIn post and its summary, determine whether the summary accurately and concisely captures the key insights.\n"
             "Provide a brief analysis and rate the summary on a scale of 1 to 5, where 5 indicates excellent quality.\n\n"
@@ -15,5 +16,13 @@ class SummarizeValidatorAgent(AgentBase):
             "Evaluation:"
         )
 
-        validation = self.call_gemini(prompt, model="1.5-flash")
-        return validation
\ No newline at end of file
+    def execute(self, original_text, summary):
+        """Validates the accuracy and quality of a LinkedIn post summary."""
+        original_text, summary = self.compact_input(original_text), self.compact_input(summary)
+        validation = self.call_gemini(self.build_prompt(original_text, summary), model="1.5-flash")
+        return validation
+
+    async def aexecute(self, original_text, summary):
+        """Async version of execute."""
+        original_text, summary = await self.acompact_input(original_text), await self.acompact_input(summary)
+        return await self.acall_gemini(self.build_prompt(original_text, summary), model="1.5-flash")
@@ -0,0 +1,152 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+TRUNCATION_MARKER = "\n\n[...]\n\n"
+COUNT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """Loads the tokenizer once per process (None when tiktoken is unavailable)."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"[TokenBudget] tiktoken unavailable ({e}). Falling back to a 4 characters/token estimate.")
+        return None
+
+
+# Token counts keyed by a digest of the text, so cached entries never keep large inputs alive
+_counts = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def _count_tokens_uncached(text):
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return len(text) // 4 + 1
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+
+def count_tokens(text):
+    """Counts tokens locally. cl100k_base tracks Gemini's tokenizer closely enough for budgeting."""
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _counts_lock:
+        tokens = _counts.get(key)
+        if tokens is not None:
+            _counts.move_to_end(key)
+            return tokens
+    tokens = _count_tokens_uncached(text)
+    with _counts_lock:
+        _counts[key] = tokens
+        while len(_counts) > COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return tokens
+
+
+def truncate_head(text, max_tokens):
+    """Keeps as much of the start of the text as fits in `max_tokens`."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return text[: max(0, (max_tokens - 1) * 4)]
+    return tokenizer.decode(tokenizer.encode(text, disallowed_special=())[:max_tokens])
+
+
+def truncate_to_budget(text, max_tokens):
+    """Keeps the head and tail of the text (2/3 and 1/3 of the budget) and drops the middle."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    tokenizer = get_tokenizer()
+    available = max_tokens - count_tokens(TRUNCATION_MARKER)
+    if available <= 0:
+        return truncate_head(text, max_tokens)  # no room for the marker
+    head_budget = available * 2 // 3
+    tail_budget = available - head_budget
+    if tokenizer is None:
+        tail = text[-tail_budget * 4 :] if tail_budget > 0 else ""  # text[-0:] would be all of it
+        return text[: head_budget * 4] + TRUNCATION_MARKER + tail
+    tokens = tokenizer.encode(text, disallowed_special=())
+    tail = tokenizer.decode(tokens[-tail_budget:]) if tail_budget > 0 else ""
+    return tokenizer.decode(tokens[:head_budget]) + TRUNCATION_MARKER + tail
+
+
+def split_into_chunks(text, chunk_tokens):
+    """Splits text into chunks of at most chunk_tokens tokens (as counted by count_tokens),
+    preferring paragraph boundaries."""
+    chunks, current = [], []
+    for paragraph in text.split("\n\n"):
+        if count_tokens(paragraph) > chunk_tokens:
+            # Oversized paragraph: cut it into fixed-size pieces
+            pieces = _split_long(paragraph, chunk_tokens)
+        else:
+            pieces = [paragraph]
+        for piece in pieces:
+            # Measure the joined chunk: separators and the estimate's rounding are not additive
+            if current and _count_tokens_uncached("\n\n".join(current + [piece])) > chunk_tokens:
+                chunks.append("\n\n".join(current))
+                current = []
+            current.append(piece)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _split_long(text, chunk_tokens):
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        size = max(1, (chunk_tokens - 1) * 4)  # count_tokens estimates len // 4 + 1
+        pieces = [text[i : i + size] for i in range(0, len(text), size)]
+    else:
+        tokens = tokenizer.encode(text, disallowed_special=())
+        pieces = [tokenizer.decode(tokens[i : i + chunk_tokens]) for i in range(0, len(tokens), chunk_tokens)]
+    fitted = []
+    for piece in pieces:
+        if len(piece) > 1 and count_tokens(piece) > chunk_tokens:
+            # A decoded slice can re-encode to more tokens at its edges: halve it until it fits
+            half = len(piece) // 2
+            fitted.extend(_split_long(piece[:half], chunk_tokens) + _split_long(piece[half:], chunk_tokens))
+        else:
+            fitted.append(piece)
+    return fitted
+
+
+class TokenUsage:
+    """Per-agent token counters, so expensive agents are easy to spot."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.agents = {}
+
+    def _usage(self, agent_name):
+        return self.agents.setdefault(
+            agent_name,
+            {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "compacted_inputs": 0, "models": {}},
+        )
+
+    def record(self, agent_name, model, prompt_tokens, output_tokens):
+        with self.lock:
+            usage = self._usage(agent_name)
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["output_tokens"] += output_tokens
+            usage["models"][model] = usage["models"].get(model, 0) + 1
+
+    def record_compaction(self, agent_name):
+        with self.lock:
+            self._usage(agent_name)["compacted_inputs"] += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                name: dict(usage, models=dict(usage["models"]),
+                           avg_prompt_tokens=round(usage["prompt_tokens"] / usage["calls"], 1) if usage["calls"] else 0)
+                for name, usage in sorted(self.agents.items(), key=lambda item: -item[1]["prompt_tokens"])
+            }
+
+
+# ✅ Shared usage ledger for all agents in this process
+token_usage = TokenUsage()
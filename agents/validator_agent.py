@@ -1,12 +1,13 @@
 from .agent_base import AgentBase
 
 class ValidatorAgent(AgentBase):
+    max_input_tokens = 4000  # Per field
+
     def __init__(self, max_retries=2, verbose=True):
         super().__init__(name="ValidatorAgent", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, topic, article):
-        """Validates the quality and relevance of a LinkedIn post."""
-        prompt = (
+    def build_prompt(self, topic, article):
+        return (
             "You are an AI assistant that evaluates LinkedIn posts for clarity, engagement, and relevance.\n\n"
             "Given the topic and the LinkedIn post below, assess whether the post effectively covers the topic, maintains engagement, and aligns with professional standards.\n"
             "Provide a brief analysis and rate the post on a scale of 1 to 5, where 5 indicates excellent quality.\n\n"
@@ -15,6 +16,14 @@ class ValidatorAgent(AgentBase):
             "Evaluation:"
         )
 
+    def execute(self, topic, article):
+        """Validates the quality and relevance of a LinkedIn post."""
+        topic, article = self.compact_input(topic), self.compact_input(article)
         # Call Gemini to validate the post
-        validation = self.call_gemini(prompt, model="1.5-flash")
-        return validation
\ No newline at end of file
+        validation = self.call_gemini(self.build_prompt(topic, article), model="1.5-flash")
+        return validation
+
+    async def aexecute(self, topic, article):
+        """Async version of execute."""
+        topic, article = await self.acompact_input(topic), await self.acompact_input(article)
+        return await self.acall_gemini(self.build_prompt(topic, article), model="1.5-flash")
@@ -1,18 +1,33 @@
 from .agent_base import AgentBase
 
 class WritePostTool(AgentBase):
+    max_input_tokens = 2000  # Per field: topic and outline
+
     def __init__(self, max_retries=3, verbose=True):
         super().__init__(name="WriteArticleTool", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, topic, outline=None):
-        """Generates an engaging LinkedIn post based on the given topic and outline."""
+    def build_prompt(self, topic, outline=None):
         prompt = f"You are an expert LinkedIn content writer.\n\nWrite a compelling and engaging LinkedIn post on the following topic:\nTopic: {topic}\n\n"
         
         if outline:
             prompt += f"Outline:\n{outline}\n\n"
         
         prompt += "Post:\n"
+        return prompt
 
+    def execute(self, topic, outline=None):
+        """Generates an engaging LinkedIn post based on the given topic and outline."""
+        topic, outline = self.compact_input(topic), self.compact_input(outline or "")
         # Call Gemini to generate the LinkedIn post
-        post = self.call_gemini(prompt, model="1.5-flash")
+        post = self.call_gemini(self.build_prompt(topic, outline), model="1.5-flash")
         return post
+
+    async def aexecute(self, topic, outline=None):
+        """Async version of execute."""
+        topic, outline = await self.acompact_input(topic), await self.acompact_input(outline or "")
+        return await self.acall_gemini(self.build_prompt(topic, outline), model="1.5-flash")
+
+    async def astream(self, topic, outline=None):
+        topic, outline = await self.acompact_input(topic), await self.acompact_input(outline or "")
+        async for chunk in self.astream_gemini(self.build_prompt(topic, outline), model="1.5-flash"):
+            yield chunk
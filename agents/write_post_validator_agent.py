@@ -1,12 +1,13 @@
 from .agent_base import AgentBase
 
 class WritePostValidatorAgent(AgentBase):
+    max_input_tokens = 4000  # Per field
+
     def __init__(self, max_retries=2, verbose=True):
         super().__init__(name="WritePostValidatorAgent", max_retries=max_retries, verbose=verbose)
 
-    def execute(self, topic, article):
-        """Validates a generated research article for its quality, structure, and relevance to the topic."""
-        prompt = (
+    def build_prompt(self, topic, article):
+        return (
             "You are an AI assistant that validates research articles.\n\n"
             "Given the topic and the article, assess whether the article comprehensively covers the topic, follows a logical structure, and maintains academic standards.\n"
             "Provide a brief analysis and rate the article on a scale of 1 to 5, where 5 indicates excellent quality.\n\n"
@@ -15,6 +16,14 @@ class WritePostValidatorAgent(AgentBase):
             "Validation:"
         )
 
+    def execute(self, topic, article):
+        """Validates a generated research article for its quality, structure, and relevance to the topic."""
+        topic, article = self.compact_input(topic), self.compact_input(article)
         # Call Gemini to validate the article
-        validation = self.call_gemini(prompt, model="1.5-flash")
+        validation = self.call_gemini(self.build_prompt(topic, article), model="1.5-flash")
         return validation
+
+    async def aexecute(self, topic, article):
+        """Async version of execute."""
+        topic, article = await self.acompact_input(topic), await self.acompact_input(article)
+        return await self.acall_gemini(self.build_prompt(topic, article), model="1.5-flash")
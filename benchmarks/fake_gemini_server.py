@@ -0,0 +1,167 @@
+"""Local Gemini stand-in for offline benchmarks.
+
+Run it, then start the API against it:
+
+    python benchmarks/fake_gemini_server.py --latency-dist lognormal --latency-ms 800 --rate-limit-rate 0.02
+    LLM_BACKEND=http LLM_BACKEND_URL=http://127.0.0.1:8100 python main.py
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import deque
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+WORDS = (
+    "insightful growth team leadership data product customers strategy learning network "
+    "engineering community impact journey results innovation hiring feedback culture"
+).split()
+
+
+class GenerateRequest(BaseModel):
+    model: str = "1.5-flash"
+    prompt: str
+    params: dict = {}
+
+
+class FakeGemini:
+    """Simulated model: configurable latency distribution, random errors, 429 injection and an RPM cap."""
+
+    def __init__(self, latency_dist="lognormal", latency_ms=800.0, latency_sigma=0.5,
+                 error_rate=0.0, rate_limit_rate=0.0, rpm=0, output_words=60, stream_chunks=8, seed=None):
+        self.latency_dist = latency_dist
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.output_words = output_words
+        self.stream_chunks = stream_chunks
+        self.random = random.Random(seed)
+        self.recent = deque()  # request timestamps inside the last minute
+        self.counters = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+    def latency(self):
+        """Seconds to wait for one response."""
+        mean = self.latency_ms / 1000.0
+        if self.latency_dist == "constant":
+            return mean
+        if self.latency_dist == "uniform":
+            return self.random.uniform(0, 2 * mean)
+        if self.latency_dist == "normal":
+            return max(0.0, self.random.gauss(mean, mean * self.latency_sigma))
+        # lognormal scaled to the requested mean: long tail like the real API
+        return self.random.lognormvariate(0, self.latency_sigma) * mean / math.exp(self.latency_sigma ** 2 / 2)
+
+    def admit(self):
+        """Returns an error response for this request, or None when it should succeed."""
+        self.counters["requests"] += 1
+        now = time.time()
+        while self.recent and now - self.recent[0] > 60:
+            self.recent.popleft()
+        self.recent.append(now)
+
+        if (self.rpm and len(self.recent) > self.rpm) or self.random.random() < self.rate_limit_rate:
+            self.counters["rate_limited"] += 1
+            return JSONResponse(status_code=429, content={"error": "Resource has been exhausted (e.g. check quota)."})
+        if self.random.random() < self.error_rate:
+            self.counters["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": "Injected internal error."})
+        return None
+
+    def reply(self, request):
+        """Deterministic text for a prompt, or a JSON array for JSON-mode batch prompts."""
+        seed = int(hashlib.sha256(request.prompt.encode("utf-8")).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        words = int(request.params.get("max_output_tokens", self.output_words * 2) // 2)
+        text = " ".join(rng.choice(WORDS) for _ in range(max(1, min(words, self.output_words)))).capitalize() + "."
+
+        if request.params.get("response_mime_type") == "application/json":
+            match = re.search(r"Posts:\n(\[.*\])", request.prompt, re.S)
+            items = json.loads(match.group(1)) if match else []
+            return json.dumps([{"id": item.get("id"), "comment": f"{text} ({item.get('id')})"} for item in items])
+        return text
+
+    @staticmethod
+    def usage(prompt, text):
+        return {"prompt_tokens": len(prompt) // 4 + 1, "output_tokens": len(text) // 4 + 1}
+
+
+def create_app(fake):
+    app = FastAPI(title="Fake Gemini")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def stats():
+        return fake.counters
+
+    @app.post("/v1/generate")
+    async def generate(request: GenerateRequest):
+        await asyncio.sleep(fake.latency())
+        error = fake.admit()
+        if error is not None:
+            return error
+        text = fake.reply(request)
+        fake.counters["ok"] += 1
+        return {"text": text, "usage": fake.usage(request.prompt, text)}
+
+    @app.post("/v1/stream")
+    async def stream(request: GenerateRequest):
+        error = fake.admit()
+        if error is not None:
+            return error
+        text = fake.reply(request)
+        words = text.split(" ")
+        size = max(1, len(words) // fake.stream_chunks)
+        pieces = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+        total_latency = fake.latency()
+
+        async def events():
+            for piece in pieces:
+                await asyncio.sleep(total_latency / len(pieces))
+                yield f"data: {json.dumps({'text': piece})}\n\n"
+            fake.counters["ok"] += 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("FAKE_GEMINI_PORT", 8100)))
+    parser.add_argument("--latency-dist", choices=["constant", "uniform", "normal", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Mean response latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Spread for normal/lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests failing with 429")
+    parser.add_argument("--rpm", type=int, default=0, help="Return 429 above this many requests/minute (0 = off)")
+    parser.add_argument("--output-words", type=int, default=60)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeGemini(
+        latency_dist=args.latency_dist, latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, rpm=args.rpm,
+        output_words=args.output_words, stream_chunks=args.stream_chunks, seed=args.seed,
+    )
+    print(f"🧪 Fake Gemini listening on http://{args.host}:{args.port} ({args.latency_dist}, mean {args.latency_ms} ms)")
+    uvicorn.run(create_app(fake), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Load test for the LinkedIn Automation API.
+
+Drives every route at a fixed concurrency and reports throughput, latency percentiles,
+errors and the API's cache hit rate. Pair it with the fake Gemini server for an offline baseline:
+
+    python benchmarks/fake_gemini_server.py &
+    LLM_BACKEND=http EMBEDDING_BACKEND=fastembed GEMINI_CACHE_PATH=$(mktemp -d)/cache.sqlite3 python main.py &
+    python benchmarks/load_test.py --concurrency 32 --requests 200 --unique 20
+
+LLM_BACKEND=http only replaces text generation: /rag_chat still embeds queries (and /rag_ingest
+documents) with the Gemini embedding API unless EMBEDDING_BACKEND=fastembed.
+With LLM_BACKEND=http the API's rate limiter is effectively off unless GEMINI_RPM / GEMINI_TPM
+are set. Stand-in replies are cached under their own keys, never as Gemini replies, but the
+response cache persists in GEMINI_CACHE_PATH, so point it at a fresh file per run: replies
+stored by an earlier run turn into hits and inflate the numbers. The report prints how
+many entries the cache held before the run.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+SAMPLE_POSTS = [
+    "Excited to share that our team just shipped a new data platform that cuts report times from hours to minutes.",
+    "Five lessons I learned from hiring our first 20 engineers: culture is what you tolerate, not what you write down.",
+    "We open-sourced our feature store today. Contributions and feedback from the community are very welcome!",
+    "After 10 years in marketing I moved into product management. Here is what surprised me most.",
+    "Our startup reached 1M users this week. Thank you to everyone who believed in us from day one.",
+]
+
+# Route -> function building a request body for payload variant `i`
+ROUTES = {
+    "/summarize": lambda i: {"text": f"{SAMPLE_POSTS[i % len(SAMPLE_POSTS)]} (variant {i})"},
+    "/write_post": lambda i: {"topic": f"Lessons from scaling engineering teams #{i}", "outline": ""},
+    "/sanitize_data": lambda i: {"data": f"Contact John Doe at john{i}@example.com or +1 555 0100."},
+    "/refine_post": lambda i: {"draft": f"{SAMPLE_POSTS[i % len(SAMPLE_POSTS)]} draft {i}"},
+    "/validate_post": lambda i: {"topic": "Hiring", "article": f"{SAMPLE_POSTS[1]} ({i})"},
+    "/generate_comments": lambda i: {"post_content": f"{SAMPLE_POSTS[i % len(SAMPLE_POSTS)]} [{i}]"},
+    "/generate_comments/batch": lambda i: {"posts": [f"{post} [{i}]" for post in SAMPLE_POSTS]},
+    "/sentiment_analysis": lambda i: {"text": f"{SAMPLE_POSTS[i % len(SAMPLE_POSTS)]} ({i})"},
+    "/analyze_post": lambda i: {"post_content": f"{SAMPLE_POSTS[i % len(SAMPLE_POSTS)]} <{i}>"},
+    "/rag_chat": lambda i: {"query": f"How do I write a good LinkedIn comment? ({i})"},
+    "/summarize/stream": lambda i: {"text": f"{SAMPLE_POSTS[i % len(SAMPLE_POSTS)]} (stream {i})"},
+    "/write_post/stream": lambda i: {"topic": f"Lessons from scaling engineering teams (stream {i})", "outline": ""},
+    "/refine_post/stream": lambda i: {"draft": f"{SAMPLE_POSTS[i % len(SAMPLE_POSTS)]} (stream draft {i})"},
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def describe_cache(stats):
+    """One line on the response cache the API starts from (a warm cache inflates hit rates)."""
+    if not stats:
+        return "⚠️ Response cache stats unavailable"
+    entries = stats.get("disk_entries", 0)
+    if entries:
+        return f"⚠️ Response cache {stats.get('path')} already holds {entries} entries; hit rates include earlier runs"
+    return f"🧊 Response cache {stats.get('path') or '(memory only)'} starts empty"
+
+
+async def fetch_cache_stats(client):
+    try:
+        response = await client.get("/cache_stats")
+        return response.json().get("cache", {})
+    except (httpx.HTTPError, ValueError):
+        return {}
+
+
+async def run_route(client, route, requests, concurrency, unique, seed):
+    """Sends `requests` requests to one route with at most `concurrency` in flight."""
+    rng = random.Random(seed)
+    variants = [rng.randrange(unique) for _ in range(requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, ttfb, errors = [], [], {}
+
+    async def one(variant):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if route.endswith("/stream"):
+                    async with client.stream("POST", route, json=ROUTES[route](variant)) as response:
+                        first = None
+                        async for _ in response.aiter_bytes():
+                            first = first or time.perf_counter()
+                        status = response.status_code
+                    ttfb.append((first or time.perf_counter()) - started)
+                else:
+                    response = await client.post(route, json=ROUTES[route](variant))
+                    status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    before = await fetch_cache_stats(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(v) for v in variants))
+    wall = time.perf_counter() - started
+    after = await fetch_cache_stats(client)
+
+    hits = after.get("hits", 0) - before.get("hits", 0)
+    lookups = hits + after.get("misses", 0) - before.get("misses", 0)
+    result = {
+        "route": route,
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "cache_hit_rate": round(hits / lookups, 3) if lookups else None,
+    }
+    if ttfb:
+        result["ttfb_p50_ms"] = round(percentile(ttfb, 50) * 1000, 1)
+    return result
+
+
+def print_table(results):
+    header = f"{'route':<26}{'ok':>6}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'hit rate':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        hit_rate = "-" if r["cache_hit_rate"] is None else f"{r['cache_hit_rate']:.1%}"
+        print(
+            f"{r['route']:<26}{r['ok']:>6}{sum(r['errors'].values()):>6}{r['throughput_rps']:>9}"
+            f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{hit_rate:>10}"
+        )
+
+
+async def main_async(args):
+    routes = list(ROUTES) if args.routes == "all" else [r.strip() for r in args.routes.split(",")]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        initial_cache = await fetch_cache_stats(client)
+        print(describe_cache(initial_cache))
+        results = []
+        for route in routes:
+            print(f"🚀 {route}: {args.requests} requests, concurrency {args.concurrency}, {args.unique} unique payloads")
+            results.append(await run_route(client, route, args.requests, args.concurrency, args.unique, args.seed))
+    print()
+    print_table(results)
+    print(describe_cache(initial_cache))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"response_cache": initial_cache, "results": results}, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test every API route.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--routes", default="all", help="Comma separated routes, or 'all'")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per route")
+    parser.add_argument("--unique", type=int, default=20, help="Distinct payloads per route (lower = more cache hits)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Recall@k vs latency vs memory for the retrieval index types in rag/engine.py.
+
+Builds each index type over synthetic clustered embeddings (same dimension as the
+Gemini embedding model) and compares its top-k against exact search:
+
+    python benchmarks/retrieval_benchmark.py --sizes 10000,100000 --index-types flat,ivf,hnsw
+    python benchmarks/retrieval_benchmark.py --sizes 1000000 --index-types flat,fp16,pq,ivfpq --mmap
+    python benchmarks/retrieval_benchmark.py --sizes 1000000 --dim 768 --queries 200 --output results.json
+
+`index MB` is the serialized index size; `rss MB` is how much resident memory loading
+the saved index added (with --mmap, pages are only counted once they are touched).
+
+1M x 768 float32 vectors take ~3 GB of RAM before any index is built.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag.engine import INDEX_TYPES, build_index  # noqa: E402
+
+
+def synthetic_embeddings(n, dim, clusters, seed):
+    """Unit vectors drawn around `clusters` random centres, roughly like topic-clustered text embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        end = min(n, start + 100_000)
+        labels = rng.integers(0, clusters, end - start)
+        vectors[start:end] = centres[labels] + 0.6 * rng.standard_normal((end - start, dim)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def rss_mb():
+    """Resident set size of this process (Linux), or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def reload_index(index, path, mmap):
+    """Saves `index` to `path` and reads it back (memory-mapped with `mmap`). Returns (index, rss MB added)."""
+    faiss.write_index(index, path)
+    before = rss_mb()
+    flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY if mmap else 0
+    loaded = faiss.read_index(path, flags)
+    return loaded, rss_mb() - before
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def run(n, index_type, vectors, queries, truth, k, params, mmap):
+    started = time.perf_counter()
+    built = build_index(vectors, index_type, **params)
+    build_seconds = time.perf_counter() - started
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.faiss")
+        index, rss_added = reload_index(built, path, mmap)
+        del built
+        index_mb = os.path.getsize(path) / 2**20
+        actual_index = type(index).__name__
+        result = measure(index, queries, truth, k)
+        del index
+    return {
+        "chunks": n,
+        "index_type": index_type,
+        "actual_index": actual_index,
+        **result,
+        "build_s": round(build_seconds, 2),
+        "index_mb": round(index_mb, 1),
+        "rss_mb": round(rss_added, 1),
+        "mmap": mmap,
+    }
+
+
+def measure(index, queries, truth, k):
+    latencies, hits = [], 0
+    for q, expected in zip(queries, truth):
+        started = time.perf_counter()
+        _, ids = index.search(q[None, :], k)
+        latencies.append(time.perf_counter() - started)
+        hits += len(set(ids[0].tolist()) & set(expected.tolist()))
+    return {
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def print_table(results, k):
+    header = (
+        f"{'chunks':>9}  {'index':<6}{'faiss class':<22}{'recall@' + str(k):>10}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'build s':>10}{'index MB':>10}{'rss MB':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['chunks']:>9}  {r['index_type']:<6}{r['actual_index']:<22}{r[f'recall@{k}']:>10.3f}{r['p50_ms']:>10}"
+            f"{r['p95_ms']:>10}{r['build_s']:>10}{r['index_mb']:>10}{r['rss_mb']:>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retrieval index types.")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma separated corpus sizes")
+    parser.add_argument("--index-types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--nprobe", type=int, default=16, help="IVF lists probed per query")
+    parser.add_argument("--ef-search", type=int, default=64, help="HNSW search breadth")
+    parser.add_argument("--pq-m", type=int, default=0, help="PQ bytes per vector (0 = dim / 8)")
+    parser.add_argument("--refine", choices=["fp16", "flat", "none"], default="fp16", help="ivfpq re-ranking store")
+    parser.add_argument("--refine-k-factor", type=float, default=4)
+    parser.add_argument("--mmap", action="store_true", help="Search memory-mapped copies of the saved indexes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    params = {
+        "nprobe": args.nprobe, "ef_search": args.ef_search, "pq_m": args.pq_m,
+        "refine": args.refine, "refine_k_factor": args.refine_k_factor,
+    }
+    results = []
+    for n in (int(s) for s in args.sizes.split(",")):
+        print(f"🧪 {n} chunks x {args.dim} dims...")
+        vectors = synthetic_embeddings(n, args.dim, args.clusters, args.seed)
+        rng = np.random.default_rng(args.seed + 1)
+        queries = vectors[rng.integers(0, n, args.queries)] + 0.05 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+        faiss.normalize_L2(queries)
+        exact = faiss.IndexFlatL2(args.dim)
+        exact.add(vectors)
+        _, truth = exact.search(queries, args.k)
+        del exact
+        for index_type in args.index_types.split(","):
+            results.append(run(n, index_type.strip(), vectors, queries, truth, args.k, params, args.mmap))
+            print(f"   {index_type}: recall {results[-1][f'recall@{args.k}']}, p50 {results[-1]['p50_ms']} ms")
+        del vectors
+
+    print()
+    print_table(results, args.k)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
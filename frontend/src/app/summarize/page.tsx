@@ -1,7 +1,7 @@
 "use client";
 
 import { useState } from "react";
-import axios from "axios";
+import { postSSE } from "@/lib/sse";
 import { Button } from "../../components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Textarea } from "@/components/ui/textarea";
@@ -28,14 +28,12 @@ export default function Summarize() {
     setValidation("");
 
     try {
-      const response = await axios.post(`${API_BASE_URL}/summarize`, { text });
-
-      if (response.data.error) {
-        setError(response.data.error);
-      } else {
-        setSummary(response.data.summary);
-        setValidation(response.data.validation || "Validation not provided.");
-      }
+      // Stream the summary so it renders as soon as the first tokens arrive
+      await postSSE(`${API_BASE_URL}/summarize/stream`, { text }, {
+        chunk: (data) => setSummary((prev) => prev + data.text),
+        validation: (data) => setValidation(data.text || "Validation not provided."),
+        error: (data) => setError(data.detail),
+      });
     } catch (err) {
       console.error("API Error:", err);
       setError("Failed to summarize. Please check if the backend is running.");
@@ -1,7 +1,7 @@
 "use client"
 
 import { useState } from "react"
-import axios from "axios"
+import { postSSE } from "@/lib/sse"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Input } from "@/components/ui/input"
@@ -31,16 +31,15 @@ export default function GeneratePost() {
     setPost("");
 
     try {
-      const response = await axios.post(`${API_BASE_URL}/write_post`, {
+      // Stream the post so it renders as soon as the first tokens arrive
+      await postSSE(`${API_BASE_URL}/write_post/stream`, {
         topic: trimmedTopic,
         keywords: trimmedKeywords
+      }, {
+        chunk: (data) => setPost((prev) => prev + data.text),
+        done: (data) => setPost(data.post || "No post generated."),
+        error: (data) => setError(data.detail),
       });
-
-      if (response.data.error) {
-        setError(response.data.error);
-      } else {
-        setPost(response.data.post || "No post generated.");
-      }
     } catch (error) {
       console.error("API Error:", error);
       setError("Failed to generate the LinkedIn post. Please check if the backend is running.");
@@ -1,16 +1,38 @@
 import os
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.chains.question_answering import load_qa_chain
 from langchain.prompts import PromptTemplate
+from langchain_core.prompts import format_document
 import google.generativeai as genai
+from model_registry import model_registry
+from rag.retriever import VECTOR_STORE_PATH, get_retriever
+from rag.ingestion import get_ingestion_pipeline
+from rag.engine import get_engine
 
 # Load API key
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
-# FAISS Storage Path
-VECTOR_STORE_PATH = "faiss_index"
+# Seconds spent in each vector store start-up phase, filled in by the background warm-up
+STARTUP_TIMINGS = {}
+
+_init_lock = threading.Lock()
+_init_thread = None
+_init_error = None
+_vector_store_ready = threading.Event()
+
+@contextmanager
+def _timed(phase):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[phase] = round(time.perf_counter() - started, 3)
+        print(f"⏱️ {phase}: {STARTUP_TIMINGS[phase]:.2f}s")
 
 def initialize_vector_store():
     """Ensures FAISS index is initialized with useful context data."""
@@ -22,15 +44,67 @@ def initialize_vector_store():
             "Networking on LinkedIn involves thoughtful engagement with posts.",
             "Good comments on LinkedIn add value without being too generic."
         ]
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        text_chunks = text_splitter.split_text("\n".join(sample_text))
-
-        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-        vector_store = FAISS.from_texts(text_chunks, embedding=embeddings)
-        vector_store.save_local(VECTOR_STORE_PATH)
-
+        pipeline = get_ingestion_pipeline()
+        pipeline.ingest(["\n".join(sample_text)], source="seed")
+        pipeline.flush()
+
+def _prepare_vector_store():
+    """Builds the index if it is missing, then loads it into the shared retriever."""
+    global _init_error
+    try:
+        with _timed("vector_store_total"):
+            with _timed("seed_index"):
+                initialize_vector_store()
+            with _timed("load_index"):
+                get_retriever().get_store()
+    except Exception as e:
+        _init_error = e
+        print(f"❌ Vector store initialization failed: {e}")
+    finally:
+        _vector_store_ready.set()
+
+def warm_up(background=True):
+    """Starts loading (or building) the FAISS index in a background thread; safe to call repeatedly.
+
+    With background=False it also waits for the index to be ready.
+    """
+    global _init_thread
+    with _init_lock:
+        if _init_thread is None:
+            _init_thread = threading.Thread(target=_prepare_vector_store, name="vector-store-init", daemon=True)
+            _init_thread.start()
+    if not background:
+        _vector_store_ready.wait()
+
+def ensure_vector_store():
+    """Blocks until the index is ready, starting initialization on first use."""
+    global _init_thread, _init_error
+    warm_up(background=False)
+    if _init_error is not None:
+        error = _init_error
+        with _init_lock:
+            # Let the next call retry instead of failing forever
+            _init_thread, _init_error = None, None
+            _vector_store_ready.clear()
+        raise RuntimeError(f"Vector store is not available: {error}") from error
+
+# Candidates requested per generate_comment call (Gemini returns up to 8 per request)
+COMMENT_CANDIDATES = int(os.getenv("COMMENT_CANDIDATES", 4))
+# Comments that fit any post; candidates matching one (ignoring case, punctuation and emoji) are rejected
+GENERIC_COMMENTS = {
+    "", "great post", "nice post", "nice", "great", "awesome", "love this", "well said", "so true",
+    "thanks for sharing", "great share", "great insights", "very insightful", "interesting", "congrats",
+    "congratulations", "amazing", "good one", "agreed", "100",
+}
+STOPWORDS = set(
+    "a an and are as at be but by for from has have i in is it its of on or our so that the their this to "
+    "was we were what when which who will with you your my me us they them just more very can not".split()
+)
+FALLBACK_COMMENT = "Nice post! 👍"
+
+@lru_cache(maxsize=1)
 def get_conversational_chain():
-    """Creates an AI model to generate relevant comments."""
+    """Creates an AI model to generate relevant comments (built once, reused by every call)."""
     prompt_template = """
     You are a LinkedIn comment generator. Your response should be:
 
@@ -43,44 +117,67 @@ def get_conversational_chain():
 
     Comment:
     """
-    model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.3)  # ✅ Fixed model name
+    # Several candidates per request; a slightly higher temperature keeps them distinct
+    model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.7, n=COMMENT_CANDIDATES)
     prompt = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
     return load_qa_chain(model, chain_type="stuff", prompt=prompt)
 
+def _words(text):
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+def score_comment(comment, post_content):
+    """Higher is better; None for empty or generic comments.
+
+    Combines relevance (share of the post's content words the comment picks up, which
+    rewards specific comments) with a length preference of 8-40 words.
+    """
+    words = _words(comment)
+    if " ".join(words) in GENERIC_COMMENTS or len(words) < 3:
+        return None
+    post_terms = {w for w in _words(post_content) if w not in STOPWORDS and len(w) > 2}
+    comment_terms = {w for w in words if w not in STOPWORDS and len(w) > 2}
+    relevance = len(post_terms & comment_terms) / min(len(post_terms), 10) if post_terms else 0.0
+    if 8 <= len(words) <= 40:
+        length_score = 1.0
+    elif len(words) < 8:
+        length_score = len(words) / 8
+    else:
+        length_score = max(0.0, 1 - (len(words) - 40) / 40)
+    return 2 * min(relevance, 1.0) + length_score
+
+def pick_best_comment(candidates, post_content):
+    """Returns the highest scoring candidate, or None when all are empty or generic."""
+    scored = [(score_comment(c, post_content), c) for c in candidates]
+    scored = [(score, c) for score, c in scored if score is not None]
+    return max(scored, key=lambda item: item[0])[1] if scored else None
+
 def generate_comment(post_content):
     """Generates a comment for LinkedIn post content."""
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    
-    # Load FAISS index
-    new_db = FAISS.load_local(VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True)
-    docs = new_db.similarity_search(post_content)
+    # Hybrid (BM25 + vector) search over the shared in-memory index, so names and hashtags still match
+    ensure_vector_store()
+    docs = [doc for doc, _ in get_engine().search(post_content, mmr=False)]
 
     print(f"🔍 Retrieved {len(docs)} relevant docs for context.")
 
-    # Generate response
+    # One request returns COMMENT_CANDIDATES completions; pick the best one locally
     chain = get_conversational_chain()
-    
-    for attempt in range(3):  # Retry up to 3 times
-        print(f"⏳ Attempt {attempt + 1}: Generating comment...")
-        response = chain.invoke({"input_documents": docs, "question": post_content})
-        
-        comment_text = response["output_text"].strip()
-        print(f"📝 AI Generated Comment: {comment_text}")
-
-        if comment_text and comment_text not in ["👍", "Great post!", "Nice!", ""]:
-            return comment_text  # Return valid comment
-
-        print("⚠️ AI generated an empty or generic response. Retrying...")
+    context = chain.document_separator.join(format_document(doc, chain.document_prompt) for doc in docs)
+    print(f"⏳ Generating {COMMENT_CANDIDATES} candidate comments...")
+    result = chain.llm_chain.generate([{chain.document_variable_name: context, "question": post_content}])
+    candidates = [generation.text.strip() for generation in result.generations[0]]
 
-    return "Nice post! 👍"  # Default fallback comment
+    comment_text = pick_best_comment(candidates, post_content)
+    if comment_text is None:
+        print("⚠️ AI generated only empty or generic responses.")
+        return FALLBACK_COMMENT  # Default fallback comment
 
-# Initialize FAISS index if missing
-initialize_vector_store()
+    print(f"📝 AI Generated Comment: {comment_text} (best of {len(candidates)})")
+    return comment_text
 
 
 def get_llm_response(prompt):
     """Generates a response using Gemini API"""
-    model = genai.GenerativeModel("gemini-pro")
+    model = model_registry.get("gemini-pro")
     response = model.generate_content(prompt)
     
     return response.text
\ No newline at end of file
@@ -1,21 +1,43 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import os
+import asyncio
+import json
 from dotenv import load_dotenv
 import uvicorn
-from typing import List
+from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
 
-from rag.query_handler import answer_query
+from rag.query_handler import aanswer_query_cached
+from rag.semantic_cache import semantic_cache
+from rag.ingestion import get_ingestion_pipeline, stop_ingestion_pipeline
+from rag.retriever import warm_up_retriever
 
 
 # Assuming agents.py exists in your project
 from agents import AgentManager
+from agents.response_cache import response_cache
+from agents.single_flight import single_flight
+from agents.rate_limiter import rate_limiter
+from agents.token_budget import token_usage
+from agents.llm_backend import llm_backend
 
 # Load environment variables from .env
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Pre-build Gemini models (or connect to the stand-in backend) before the first request
+    await llm_backend.awarm_up(ping=os.getenv("GEMINI_WARMUP_PING", "true").lower() == "true")
+    # Build the retriever and load an existing FAISS index in the background; never embeds or blocks start-up
+    warm_up_retriever()
+    yield
+    # Write documents ingested since the last periodic save (if anything was ingested at all)
+    await asyncio.to_thread(stop_ingestion_pipeline)
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS (adjust allow_origins for production security)
 app.add_middleware(
@@ -50,89 +72,215 @@ class ValidatePostRequest(BaseModel):
 class GenerateCommentRequest(BaseModel):
     post_content: str
 
+class GenerateCommentsBatchRequest(BaseModel):
+    posts: List[str]
+
 class SentimentAnalysisRequest(BaseModel):
     text: str
 
+class AnalyzePostRequest(BaseModel):
+    post_content: str
+
 class ChatQueryRequest(BaseModel):
     query: str
+    k: int = 4
+    filters: Optional[Dict[str, Any]] = None  # metadata filters, e.g. {"source": ["style_guide", "past_comment"]}
+
+class IngestRequest(BaseModel):
+    texts: List[str]
+    source: str = "api"
 
 # Health Check Route
 @app.get("/")
 def home():
     return {"message": "LinkedIn Automation API is running!"}
 
+# Gemini response cache, request coalescing and rate limiter counters (per worker process)
+@app.get("/cache_stats")
+def cache_stats():
+    return {
+        "cache": response_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "semantic_cache": semantic_cache.stats(),
+    }
+
+# Token usage per agent (per worker process), most expensive first
+@app.get("/token_usage")
+def get_token_usage():
+    return token_usage.stats()
+
 # API Routes for LinkedIn Automation Features
 @app.post("/summarize")
-def summarize(request: SummarizeRequest):
+async def summarize(request: SummarizeRequest):
     try:
-        summary = agent_manager.get_agent("summarize").execute(request.text)
+        summary = await agent_manager.get_agent("summarize").aexecute(request.text)
         validation_agent = agent_manager.get_agent("summarize_validator")
-        validation = validation_agent.execute(request.text, summary) if validation_agent else "Validation agent not found"
+        validation = await validation_agent.aexecute(request.text, summary) if validation_agent else "Validation agent not found"
         return {"summary": summary, "validation": validation}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/write_post")
-def write_post(request: WritePostRequest):
+async def write_post(request: WritePostRequest):
     try:
-        post = agent_manager.get_agent("write_post").execute(request.topic, request.outline)
-        validation = agent_manager.get_agent("write_post_validator").execute(request.topic, post)
+        post = await agent_manager.get_agent("write_post").aexecute(request.topic, request.outline)
+        validation = await agent_manager.get_agent("write_post_validator").aexecute(request.topic, post)
         return {"post": post, "validation": validation}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/sanitize_data")
-def sanitize_data(request: SanitizeDataRequest):
+async def sanitize_data(request: SanitizeDataRequest):
     try:
-        sanitized_data = agent_manager.get_agent("sanitize_data").execute(request.data)
-        validation = agent_manager.get_agent("sanitize_data_validator").execute(request.data, sanitized_data)
+        sanitized_data = await agent_manager.get_agent("sanitize_data").aexecute(request.data)
+        validation = await agent_manager.get_agent("sanitize_data_validator").aexecute(request.data, sanitized_data)
         return {"sanitized_data": sanitized_data, "validation": validation}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/refine_post")
-def refine_post(request: RefinePostRequest):
+async def refine_post(request: RefinePostRequest):
     try:
-        refined_post = agent_manager.get_agent("refiner").execute(request.draft)
+        refined_post = await agent_manager.get_agent("refiner").aexecute(request.draft)
         return {"refined_post": refined_post}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/validate_post")
-def validate_post(request: ValidatePostRequest):
+async def validate_post(request: ValidatePostRequest):
     try:
-        validation = agent_manager.get_agent("validator").execute(request.topic, request.article)
+        validation = await agent_manager.get_agent("validator").aexecute(request.topic, request.article)
         return {"validation": validation}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/generate_comments")
-def generate_comments(request: GenerateCommentRequest):
+async def generate_comments(request: GenerateCommentRequest):
     try:
-        comments = agent_manager.get_agent("generate_comment").execute(request.post_content)
+        comments = await agent_manager.get_agent("generate_comment").aexecute(request.post_content)
         if not isinstance(comments, list):
             comments = [comments]
         return {"comments": comments}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating comments: {str(e)}")
 
+@app.post("/generate_comments/batch")
+async def generate_comments_batch(request: GenerateCommentsBatchRequest):
+    try:
+        comments = await agent_manager.get_agent("generate_comment").aexecute_batch(request.posts)
+        return {"comments": comments}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating comments: {str(e)}")
+
 @app.post("/sentiment_analysis")
-def sentiment_analysis(request: SentimentAnalysisRequest):
+async def sentiment_analysis(request: SentimentAnalysisRequest):
     try:
-        sentiment = agent_manager.get_agent("sentiment_analysis").execute(request.text)
+        sentiment = await agent_manager.get_agent("sentiment_analysis").aexecute(request.text)
         return {"sentiment": sentiment}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Summary, sentiment and a suggested comment for one post, generated in parallel
+ANALYZE_POST_PIPELINE = {
+    "summary": {"agent": "summarize", "args": ["$post_content"]},
+    "sentiment": {"agent": "sentiment_analysis", "args": ["$post_content"]},
+    "comment": {"agent": "generate_comment", "args": ["$post_content"]},
+}
+
+@app.post("/analyze_post")
+async def analyze_post(request: AnalyzePostRequest):
+    try:
+        results = await agent_manager.run_pipeline(
+            ANALYZE_POST_PIPELINE, inputs={"post_content": request.post_content}
+        )
+        return {"summary": results["summary"], "sentiment": results["sentiment"], "comments": [results["comment"]]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Streaming (Server-Sent Events) variants for long-form generation
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def stream_agent(agent_name, parts, *args):
+    """Yields a `chunk` event per piece of the agent's reply, collecting the pieces in `parts`."""
+    async for chunk in agent_manager.get_agent(agent_name).astream(*args):
+        parts.append(chunk)
+        yield sse_event("chunk", {"text": chunk})
+
+@app.post("/summarize/stream")
+async def summarize_stream(request: SummarizeRequest):
+    async def events():
+        try:
+            parts = []
+            async for event in stream_agent("summarize", parts, request.text):
+                yield event
+            summary = "".join(parts).strip()
+            validation = await agent_manager.get_agent("summarize_validator").aexecute(request.text, summary)
+            yield sse_event("validation", {"text": validation})
+            yield sse_event("done", {"summary": summary, "validation": validation})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+    return sse_response(events())
+
+@app.post("/write_post/stream")
+async def write_post_stream(request: WritePostRequest):
+    async def events():
+        try:
+            parts = []
+            async for event in stream_agent("write_post", parts, request.topic, request.outline):
+                yield event
+            post = "".join(parts).strip()
+            validation = await agent_manager.get_agent("write_post_validator").aexecute(request.topic, post)
+            yield sse_event("validation", {"text": validation})
+            yield sse_event("done", {"post": post, "validation": validation})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+    return sse_response(events())
+
+@app.post("/refine_post/stream")
+async def refine_post_stream(request: RefinePostRequest):
+    async def events():
+        try:
+            parts = []
+            async for event in stream_agent("refiner", parts, request.draft):
+                yield event
+            refined_post = "".join(parts).strip()
+            yield sse_event("done", {"refined_post": refined_post})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+    return sse_response(events())
+
 # RAG Chatbot Route
 @app.post("/rag_chat")
-def rag_chat(request: ChatQueryRequest):
+async def rag_chat(request: ChatQueryRequest):
     try:
-        response = answer_query(request.query)
-        return {"response": response}
+        response, similarity = await aanswer_query_cached(request.query, k=request.k, filters=request.filters)
+        return {"response": response, "cached": similarity is not None, "similarity": similarity}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Append documents (past comments, style guides, scraped posts) to the live RAG index
+@app.post("/rag_ingest")
+async def rag_ingest(request: IngestRequest):
+    try:
+        pipeline = get_ingestion_pipeline()
+        result = await asyncio.to_thread(pipeline.ingest, request.texts, source=request.source)
+        return {**result, "index": pipeline.stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/rag_ingest/stats")
+def rag_ingest_stats():
+    return get_ingestion_pipeline().stats()
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     print(f"🚀 Server starting on http://0.0.0.0:{port} ...")
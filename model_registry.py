@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+import time
+
+import google.generativeai as genai
+
+# Models created (and optionally pinged) when the API starts, comma separated
+WARMUP_MODELS = [m.strip() for m in os.getenv("GEMINI_WARMUP_MODELS", "1.5-flash").split(",") if m.strip()]
+
+
+class ModelRegistry:
+    """Creates one GenerativeModel per (model name, generation config) and reuses it for every call.
+
+    All models share the process-wide Gemini transport that google.generativeai keeps
+    per process, so reusing them avoids rebuilding model objects and re-negotiating TLS.
+    """
+
+    def __init__(self):
+        self.models = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(model_name, generation_config):
+        return model_name, json.dumps(generation_config or {}, sort_keys=True, default=str)
+
+    def get(self, model_name, generation_config=None):
+        """Returns the shared model object for this name and config, creating it on first use."""
+        key = self._key(model_name, generation_config)
+        model = self.models.get(key)
+        if model is None:
+            with self.lock:
+                model = self.models.get(key)
+                if model is None:
+                    model = genai.GenerativeModel(model_name, generation_config=generation_config or None)
+                    self.models[key] = model
+        return model
+
+    def warm_up(self, model_names=None, ping=True):
+        """Builds the given models and opens the transport with a cheap count_tokens call."""
+        timings = {}
+        for model_name in model_names or WARMUP_MODELS:
+            started = time.perf_counter()
+            model = self.get(model_name)
+            if ping:
+                try:
+                    model.count_tokens("ping")
+                except Exception as e:
+                    print(f"[ModelRegistry] Warm-up ping for {model_name} failed: {e}")
+            timings[model_name] = round(time.perf_counter() - started, 3)
+        print(f"[ModelRegistry] Warmed up models: {timings}")
+        return timings
+
+    async def awarm_up(self, model_names=None, ping=True):
+        """Async warm-up: also opens the async client used by acall_gemini."""
+        timings = {}
+        for model_name in model_names or WARMUP_MODELS:
+            started = time.perf_counter()
+            model = self.get(model_name)
+            if ping:
+                try:
+                    await model.count_tokens_async("ping")
+                except Exception as e:
+                    print(f"[ModelRegistry] Async warm-up ping for {model_name} failed: {e}")
+            timings[model_name] = round(time.perf_counter() - started, 3)
+        print(f"[ModelRegistry] Warmed up async models: {timings}")
+        return timings
+
+
+# ✅ Shared by the agents, llm.py and the API
+model_registry = ModelRegistry()
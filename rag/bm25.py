@@ -0,0 +1,190 @@
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+
+import numpy as np
+
+# ✅ Keep a BM25 index next to the FAISS index and fuse it into searches
+HYBRID_SEARCH = os.getenv("RAG_HYBRID", "true").lower() == "true"
+BM25_FILE = "bm25.npz"
+BM25_K1 = float(os.getenv("BM25_K1", 1.5))
+BM25_B = float(os.getenv("BM25_B", 0.75))
+
+TOKEN_PATTERN = re.compile(r"[#@]?\w+(?:[.'+-]\w+)*")
+
+
+def tokenize(text):
+    """Lowercased word tokens. Hashtags, mentions and compounds are kept whole and also split,
+    so "#GenAI" matches "#genai" and "genai", and "@Acme-Corp" matches "acme"."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        tokens.append(token)
+        bare = token.lstrip("#@")
+        parts = [part for part in re.split(r"[.'+-]", bare) if part]
+        if bare != token:
+            tokens.append(bare)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """Compact inverted index scored with Okapi BM25, aligned with FAISS index positions.
+
+    Document ids are the positions of the chunks in the FAISS store, so lexical and
+    vector results can be fused directly. Postings live in CSR arrays (term offsets,
+    int32 doc ids, uint16 term frequencies) plus a small append buffer for chunks
+    ingested since the last save; `save` merges the buffer and writes one .npz file.
+    """
+
+    def __init__(self, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}  # term -> term id
+        self.offsets = np.zeros(1, dtype=np.int64)  # postings of term t: docs[offsets[t]:offsets[t + 1]]
+        self.docs = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.uint16)
+        self.pending = {}  # term id -> (array("i") doc ids, array("H") tfs) not merged yet
+        self.doc_lengths = array("I")
+        self.total_length = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, texts, start):
+        """Indexes `texts` as documents start, start + 1, ... (their FAISS positions)."""
+        with self.lock:
+            if start != len(self.doc_lengths):
+                raise ValueError(f"BM25 index has {len(self.doc_lengths)} documents, cannot add at position {start}.")
+            for position, text in enumerate(texts, start):
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+                self.doc_lengths.append(length)
+                self.total_length += length
+                for term, tf in counts.items():
+                    term_id = self.vocab.setdefault(term, len(self.vocab))
+                    docs, tfs = self.pending.setdefault(term_id, (array("i"), array("H")))
+                    docs.append(position)
+                    tfs.append(min(tf, 65535))
+
+    def _postings(self, term_id):
+        docs, tfs = self.docs[0:0], self.tfs[0:0]
+        if term_id < len(self.offsets) - 1:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs, tfs = self.docs[start:end], self.tfs[start:end]
+        if term_id in self.pending:
+            extra_docs, extra_tfs = self.pending[term_id]
+            docs = np.concatenate([docs, np.array(extra_docs, dtype=np.int32)])
+            tfs = np.concatenate([tfs, np.array(extra_tfs, dtype=np.uint16)])
+        return docs, tfs
+
+    def search(self, query, top_n=100, limit=None):
+        """Returns [(position, score)] for the best `top_n` documents, best first.
+
+        `limit` ignores documents at or beyond that position (e.g. not in the vector index yet).
+        """
+        with self.lock:
+            n = len(self.doc_lengths)
+            if not n:
+                return []
+            lengths = np.frombuffer(self.doc_lengths, dtype=np.uint32).astype(np.float32)
+            average = self.total_length / n or 1.0
+            ids, scores = [], []
+            for term in set(tokenize(query)):
+                term_id = self.vocab.get(term)
+                if term_id is None:
+                    continue
+                docs, tfs = self._postings(term_id)
+                if not len(docs):
+                    continue
+                idf = np.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                tf = tfs.astype(np.float32)
+                norm = self.k1 * (1 - self.b + self.b * lengths[docs] / average)
+                ids.append(docs)
+                scores.append(idf * tf * (self.k1 + 1) / (tf + norm))
+        if not ids:
+            return []
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        if limit is not None:
+            keep = ids < limit
+            ids, scores = ids[keep], scores[keep]
+        unique, inverse = np.unique(ids, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores)
+        best = np.argsort(-totals, kind="stable")[:top_n]
+        return [(int(unique[i]), float(totals[i])) for i in best]
+
+    def _compact(self):
+        """Merges pending postings into the CSR arrays (doc ids stay sorted per term)."""
+        if not self.pending:
+            return
+        term_count = len(self.vocab)
+        base_terms = np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int64), np.diff(self.offsets))
+        extra_terms, extra_docs, extra_tfs = [], [], []
+        for term_id, (docs, tfs) in self.pending.items():
+            extra_terms.append(np.full(len(docs), term_id, dtype=np.int64))
+            extra_docs.append(np.array(docs, dtype=np.int32))
+            extra_tfs.append(np.array(tfs, dtype=np.uint16))
+        terms = np.concatenate([base_terms] + extra_terms)
+        order = np.argsort(terms, kind="stable")  # base postings precede newer (higher) positions
+        self.docs = np.concatenate([self.docs] + extra_docs)[order]
+        self.tfs = np.concatenate([self.tfs] + extra_tfs)[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(terms, minlength=term_count))]).astype(np.int64)
+        self.pending = {}
+
+    def save(self, directory):
+        with self.lock:
+            self._compact()
+            terms = sorted(self.vocab, key=self.vocab.get)
+            np.savez(
+                os.path.join(directory, BM25_FILE),
+                vocab=np.frombuffer("\n".join(terms).encode("utf-8"), dtype=np.uint8),
+                offsets=self.offsets,
+                docs=self.docs,
+                tfs=self.tfs,
+                doc_lengths=np.frombuffer(self.doc_lengths, dtype=np.uint32),
+                params=np.array([self.k1, self.b]),
+            )
+
+    @classmethod
+    def load(cls, directory):
+        with np.load(os.path.join(directory, BM25_FILE)) as data:
+            k1, b = data["params"].tolist()
+            index = cls(k1=k1, b=b)
+            terms = data["vocab"].tobytes().decode("utf-8")
+            index.vocab = {term: i for i, term in enumerate(terms.split("\n"))} if terms else {}
+            index.offsets, index.docs, index.tfs = data["offsets"], data["docs"], data["tfs"]
+            index.doc_lengths.frombytes(data["doc_lengths"].astype(np.uint32).tobytes())
+        index.total_length = sum(index.doc_lengths)
+        return index
+
+    @classmethod
+    def from_store(cls, store):
+        """Builds the index from a LangChain FAISS store's documents, in index order."""
+        index = cls()
+        n = min(store.index.ntotal, len(store.index_to_docstore_id))
+        index.add((store.docstore.search(store.index_to_docstore_id[i]).page_content for i in range(n)), 0)
+        return index
+
+    @classmethod
+    def load_or_build(cls, directory, store):
+        """The index saved next to `store`, rebuilt when it is missing or out of step with the store."""
+        try:
+            index = cls.load(directory)
+            if len(index) == store.index.ntotal:
+                return index
+        except (OSError, KeyError, ValueError):
+            pass
+        return cls.from_store(store)
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuses ranked id lists: score(id) = sum over lists of 1 / (k + rank). Returns [(id, score)], best first."""
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda entry: entry[1], reverse=True)
@@ -0,0 +1,74 @@
+"""Rebuilds the persisted FAISS store with a compressed index type.
+
+    python -m rag.compress_index --index-type ivfpq            # in place, atomic swap
+    python -m rag.compress_index --index-type fp16 --output faiss_index_fp16
+
+Documents, ids and the BM25 index are kept; only index.faiss changes. Serve the result with
+RAG_INDEX_TYPE=native, the default (search the compressed index itself), and optionally
+RETRIEVER_MMAP=true (memory-map it instead of reading it into RAM). Ingestion keeps
+appending to the compressed index; trained types reuse their existing codebooks.
+"""
+import argparse
+import os
+import time
+
+from langchain_community.vectorstores import FAISS
+
+from .bm25 import BM25Index
+from .engine import INDEX_TYPES, IVF_NLIST, IVF_NPROBE, PQ_M, PQ_NBITS, REFINE, REFINE_K_FACTOR, build_index
+from .ingestion import save_store_atomically
+from .retriever import VECTOR_STORE_PATH, get_embeddings
+
+
+def _size_mb(index_path):
+    return os.path.getsize(os.path.join(index_path, "index.faiss")) / 2**20
+
+
+def store_vectors(store, embeddings):
+    """All vectors in index order: reconstructed when the index allows it, re-embedded (cached) otherwise."""
+    n = store.index.ntotal
+    try:
+        return store.index.reconstruct_n(0, n)
+    except RuntimeError:
+        texts = [store.docstore.search(store.index_to_docstore_id[i]).page_content for i in range(n)]
+        return embeddings.embed_documents(texts)
+
+
+def compress_store(index_path, index_type, output=None, **index_params):
+    """Writes a copy of the store at `index_path` whose index is `index_type`. Returns the new store."""
+    embeddings = get_embeddings()
+    store = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+    started = time.perf_counter()
+    index = build_index(store_vectors(store, embeddings), index_type, **index_params)
+    compressed = FAISS(embeddings, index, store.docstore, store.index_to_docstore_id)
+    save_store_atomically(compressed, output or index_path, BM25Index.load_or_build(index_path, store))
+    print(
+        f"🗜️ {type(store.index).__name__} -> {type(index).__name__} over {index.ntotal} vectors "
+        f"in {time.perf_counter() - started:.1f}s, written to {output or index_path}"
+    )
+    return compressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the FAISS store with a compressed index.")
+    parser.add_argument("--index-path", default=VECTOR_STORE_PATH)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="ivfpq")
+    parser.add_argument("--output", help="Directory for the result (default: replace --index-path atomically)")
+    parser.add_argument("--nlist", type=int, default=IVF_NLIST)
+    parser.add_argument("--nprobe", type=int, default=IVF_NPROBE)
+    parser.add_argument("--pq-m", type=int, default=PQ_M)
+    parser.add_argument("--pq-nbits", type=int, default=PQ_NBITS)
+    parser.add_argument("--refine", choices=["fp16", "flat", "none"], default=REFINE)
+    parser.add_argument("--refine-k-factor", type=float, default=REFINE_K_FACTOR)
+    args = parser.parse_args()
+
+    before = _size_mb(args.index_path)
+    compress_store(
+        args.index_path, args.index_type, args.output, nlist=args.nlist, nprobe=args.nprobe,
+        pq_m=args.pq_m, pq_nbits=args.pq_nbits, refine=args.refine, refine_k_factor=args.refine_k_factor,
+    )
+    print(f"📦 index.faiss: {before:.1f} MB -> {_size_mb(args.output or args.index_path):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+
+import numpy as np
+from filelock import FileLock
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys: NFKC, collapsed whitespace, trimmed."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def embedding_key(model, kind, text):
+    """Digest of embedding model + kind ("document"/"query") + normalized text."""
+    return hashlib.sha256(f"{model}\0{kind}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store for one embedding model.
+
+    Vectors are appended to a raw float32 file that readers memory-map; a SQLite table
+    maps key -> row. Appends are guarded by a file lock, so scraper and API processes
+    can share the same directory.
+    """
+
+    def __init__(self, model, cache_dir=EMBEDDING_CACHE_DIR):
+        self.model = model
+        self.dir = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model))
+        os.makedirs(self.dir, exist_ok=True)
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.file_lock = FileLock(os.path.join(self.dir, "write.lock"))
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.matrix = None  # np.memmap of shape (rows, dim)
+        self.dim = None
+        self.hits = 0
+        self.misses = 0
+
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(os.path.join(self.dir, "keys.sqlite3"), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    def _dimension(self):
+        if self.dim is None:
+            row = self._connect().execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+            self.dim = int(row[0]) if row else None
+        return self.dim
+
+    def _rows_on_disk(self):
+        dim = self._dimension()
+        if not dim or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (dim * 4)
+
+    def _matrix_covering(self, row):
+        """Returns a memory map that includes `row`, remapping when another writer grew the file."""
+        with self.lock:
+            if self.matrix is None or row >= self.matrix.shape[0]:
+                rows = self._rows_on_disk()
+                if row >= rows:
+                    return None
+                self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            return self.matrix
+
+    def get_many(self, keys):
+        """Returns {key: vector} for the keys that are cached."""
+        if not keys or self._dimension() is None:
+            with self.lock:
+                self.misses += len(keys)
+            return {}
+        found = {}
+        conn = self._connect()
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), 500):
+            batch = unique[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for key, row in conn.execute(f"SELECT key, row FROM keys WHERE key IN ({placeholders})", batch):
+                matrix = self._matrix_covering(row)
+                if matrix is not None:
+                    found[key] = np.array(matrix[row])
+        with self.lock:
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items):
+        """Appends {key: vector} entries that are not cached yet."""
+        if not items:
+            return
+        vectors = np.asarray(list(items.values()), dtype=np.float32)
+        with self.file_lock:
+            conn = self._connect()
+            dim = self._dimension()
+            if dim is None:
+                self.dim = dim = vectors.shape[1]
+                conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('dim', ?)", (str(dim),))
+            elif vectors.shape[1] != dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match cached dimension {dim}.")
+
+            keys = list(items)
+            existing = set()
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                existing.update(k for (k,) in conn.execute(f"SELECT key FROM keys WHERE key IN ({placeholders})", batch))
+            new = [i for i, key in enumerate(keys) if key not in existing]
+            if new:
+                first_row = self._rows_on_disk()
+                with open(self.vectors_path, "ab") as f:
+                    f.write(vectors[new].tobytes())
+                conn.executemany(
+                    "INSERT INTO keys (key, row) VALUES (?, ?)",
+                    [(keys[i], first_row + offset) for offset, i in enumerate(new)],
+                )
+            conn.commit()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "rows": self._rows_on_disk(),
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain embeddings wrapper that only sends uncached texts to the underlying model."""
+
+    def __init__(self, embeddings, model, cache=None):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache or EmbeddingCache(model)
+
+    def _embed(self, texts, kind, compute):
+        keys = [embedding_key(self.model, kind, text) for text in texts]
+        found = self.cache.get_many(keys)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = compute(list(missing.values()))
+            computed = dict(zip(missing, vectors))
+            self.cache.put_many(computed)
+            found.update({key: np.asarray(vector, dtype=np.float32) for key, vector in computed.items()})
+        return [found[key].tolist() for key in keys]
+
+    def embed_documents(self, texts):
+        return self._embed(list(texts), "document", self.embeddings.embed_documents)
+
+    def embed_query(self, text):
+        return self._embed([text], "query", lambda texts: [self.embeddings.embed_query(texts[0])])[0]
@@ -0,0 +1,87 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+
+# ✅ "google" (Gemini embedding API) or "fastembed" (local ONNX model on CPU, works offline)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "google").lower()
+GOOGLE_EMBEDDING_MODEL = "models/embedding-001"
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", min(4, os.cpu_count() or 1)))
+FASTEMBED_CACHE_DIR = os.getenv("FASTEMBED_CACHE_DIR")  # where model files are downloaded once
+
+
+class FastEmbedEmbeddings(Embeddings):
+    """Local CPU embeddings through fastembed's ONNX models.
+
+    Documents are split into batches that run on a small thread pool; ONNX Runtime
+    releases the GIL during inference, so batches use several cores at once. The model
+    is loaded on first use. Once its files are in FASTEMBED_CACHE_DIR no network
+    access is needed.
+    """
+
+    def __init__(self, model_name=LOCAL_EMBEDDING_MODEL, batch_size=EMBEDDING_BATCH_SIZE,
+                 workers=EMBEDDING_WORKERS, cache_dir=FASTEMBED_CACHE_DIR):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.cache_dir = cache_dir
+        self.model = None
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embed")
+
+    def _model(self):
+        if self.model is None:
+            with self.lock:
+                if self.model is None:
+                    try:
+                        from fastembed import TextEmbedding
+                    except ImportError as e:
+                        raise ImportError(
+                            "EMBEDDING_BACKEND=fastembed needs the fastembed package: pip install fastembed"
+                        ) from e
+                    # Split the CPU between the pool's workers instead of oversubscribing it
+                    threads = max(1, (os.cpu_count() or 1) // self.workers)
+                    self.model = TextEmbedding(self.model_name, cache_dir=self.cache_dir, threads=threads)
+        return self.model
+
+    def _embed_batch(self, texts):
+        return [vector.tolist() for vector in self._model().passage_embed(texts, batch_size=self.batch_size)]
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        if not texts:
+            return []
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+        self._model()  # load once before the workers start
+        return [vector for batch in self.executor.map(self._embed_batch, batches) for vector in batch]
+
+    def embed_query(self, text):
+        return next(iter(self._model().query_embed(text))).tolist()
+
+
+def create_embeddings(backend=EMBEDDING_BACKEND):
+    """Returns (embeddings, model id) for the configured backend.
+
+    The model id names the embedding space. It keys the embedding cache and the default
+    index directory, so vectors from different models are never mixed.
+    """
+    if backend == "google":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+        return GoogleGenerativeAIEmbeddings(model=GOOGLE_EMBEDDING_MODEL), GOOGLE_EMBEDDING_MODEL
+    if backend == "fastembed":
+        return FastEmbedEmbeddings(), f"fastembed/{LOCAL_EMBEDDING_MODEL}"
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'. Use 'google' or 'fastembed'.")
+
+
+def default_index_path(backend=EMBEDDING_BACKEND):
+    """The Gemini index keeps its original location; local models get one directory each."""
+    if backend == "google":
+        return "faiss_index"
+    return "faiss_index_" + re.sub(r"[^A-Za-z0-9_.-]+", "_", LOCAL_EMBEDDING_MODEL.lower())
@@ -0,0 +1,349 @@
+import math
+import os
+import threading
+import time
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
+
+from agents.token_budget import count_tokens, truncate_head
+
+from .bm25 import HYBRID_SEARCH, reciprocal_rank_fusion
+from .retriever import ReadWriteLock, get_retriever
+
+# ✅ "native" (default) searches the retriever's own index without a copy: exact for a regular store,
+# compressed or memory-mapped after rag.compress_index. The other types keep a second index next to
+# it: "flat" (exact), "ivf" (clustered, for ~100k+ chunks), "hnsw" (graph, lowest latency at scale),
+# compressed "fp16" (half the memory), "pq" (~16-32x smaller) and "ivfpq" (IVF + PQ, re-ranked)
+INDEX_TYPE = os.getenv("RAG_INDEX_TYPE", "native").lower()
+IVF_NLIST = int(os.getenv("RAG_IVF_NLIST", 0))  # 0 = about 4 * sqrt(number of vectors)
+IVF_NPROBE = int(os.getenv("RAG_IVF_NPROBE", 16))
+HNSW_M = int(os.getenv("RAG_HNSW_M", 32))
+HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", 80))
+HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", 64))
+PQ_M = int(os.getenv("RAG_PQ_M", 0))  # sub-quantizers (bytes per vector); 0 = about dim / 8
+PQ_NBITS = int(os.getenv("RAG_PQ_NBITS", 8))
+REFINE = os.getenv("RAG_REFINE", "fp16").lower()  # ivfpq re-ranking store: "fp16", "flat" or "none"
+REFINE_K_FACTOR = float(os.getenv("RAG_REFINE_K_FACTOR", 4))  # candidates re-ranked per result
+
+TOP_K = int(os.getenv("RAG_TOP_K", 4))
+FETCH_K = int(os.getenv("RAG_FETCH_K", 20))
+MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", 0.5))
+CONTEXT_MAX_TOKENS = int(os.getenv("RAG_CONTEXT_MAX_TOKENS", 1500))
+LEXICAL_CANDIDATES = int(os.getenv("RAG_LEXICAL_CANDIDATES", 200))
+PREFILTER_MIN_DOCS = int(os.getenv("RAG_PREFILTER_MIN_DOCS", 100_000))  # vector search over BM25 hits only
+RRF_K = 60
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "fp16", "pq", "ivfpq")
+REFINE_STORES = {"fp16": "SQfp16", "flat": "Flat", "none": None}
+
+
+def _pq_m(dim, pq_m):
+    """Largest sub-quantizer count <= pq_m (default dim / 8) that divides dim."""
+    m = min(pq_m or max(1, dim // 8), dim)
+    while dim % m:
+        m -= 1
+    return m
+
+
+def build_index(vectors, index_type=INDEX_TYPE, nlist=IVF_NLIST, nprobe=IVF_NPROBE,
+                hnsw_m=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, ef_search=HNSW_EF_SEARCH,
+                pq_m=PQ_M, pq_nbits=PQ_NBITS, refine=REFINE, refine_k_factor=REFINE_K_FACTOR):
+    """Builds an L2 FAISS index of `index_type` over a float32 (n, dim) matrix.
+
+    Trained types need enough vectors: IVF falls back to flat below 39 vectors per
+    list, and PQ types fall back to fp16 below 39 vectors per PQ centroid (ivfpq also
+    below 39 vectors per list). A tiny corpus is exact and fast on a flat index anyway.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Use one of {', '.join(INDEX_TYPES)}.")
+    if refine not in REFINE_STORES:
+        raise ValueError(f"Unknown refine store '{refine}'. Use one of {', '.join(REFINE_STORES)}.")
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    nlist = nlist or max(1, int(4 * math.sqrt(n)))
+    pq_m = _pq_m(dim, pq_m)
+
+    if index_type in ("pq", "ivfpq") and n < 39 * 2 ** pq_nbits:
+        index_type = "fp16"
+    if index_type == "ivfpq" and n < nlist * 39:
+        # Not bare PQ: without the inverted lists and refine store it loses most of the recall,
+        # and PQ plus a refine store takes more memory than fp16 alone
+        index_type = "fp16"
+    if index_type == "ivf" and n < nlist * 39:
+        index_type = "flat"
+
+    if index_type == "ivf":
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, nlist)
+        index.train(vectors)
+        index.nprobe = min(nprobe, nlist)
+        index.make_direct_map()  # lets MMR reconstruct candidate vectors
+    elif index_type == "ivfpq":
+        refine_store = REFINE_STORES[refine]
+        description = f"IVF{nlist},PQ{pq_m}x{pq_nbits}" + (f",Refine({refine_store})" if refine_store else "")
+        index = faiss.index_factory(dim, description)
+        index.train(vectors)
+        ivf = faiss.extract_index_ivf(index)
+        ivf.nprobe = min(nprobe, nlist)
+        if refine_store:
+            # PQ distances pick refine_k_factor * k candidates, exact-ish distances re-rank them
+            index.k_factor = refine_k_factor
+        else:
+            ivf.make_direct_map()
+    elif index_type == "pq":
+        index = faiss.IndexPQ(dim, pq_m, pq_nbits)
+        index.train(vectors)
+    elif index_type == "fp16":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+    else:
+        index = faiss.IndexFlatL2(dim)
+    index.add(vectors)
+    return index
+
+
+def matches_filter(metadata, filter):
+    """Metadata filter: {field: value} for equality, {field: [values]} for membership, or a callable."""
+    if filter is None:
+        return True
+    if callable(filter):
+        return filter(metadata)
+    for field, expected in filter.items():
+        value = metadata.get(field)
+        if isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def fused_mmr(relevance, vectors, lambda_mult=MMR_LAMBDA, k=TOP_K):
+    """Maximal marginal relevance with given relevance scores (e.g. RRF) instead of query similarity.
+
+    Returns the indices of the chosen candidates, in selection order.
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    relevance = relevance / relevance.max() if relevance.max() > 0 else relevance
+    unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = unit @ unit.T
+    chosen = [int(np.argmax(relevance))]
+    while len(chosen) < min(k, len(relevance)):
+        redundancy = similarity[:, chosen].max(axis=1)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[chosen] = -np.inf
+        chosen.append(int(np.argmax(scores)))
+    return chosen
+
+
+def assemble_context(docs, max_tokens=CONTEXT_MAX_TOKENS, separator="\n\n"):
+    """Joins retrieved chunks in relevance order until `max_tokens` is reached.
+
+    Duplicate chunks are dropped; a chunk that does not fit whole is cut to the
+    remaining budget only when it is the first one, so the context is never empty.
+    """
+    parts, used, seen = [], 0, set()
+    for doc in docs:
+        text = doc.page_content.strip()
+        key = doc.metadata.get("content_hash") or text
+        if not text or key in seen:
+            continue
+        seen.add(key)
+        cost = count_tokens(text) + (count_tokens(separator) if parts else 0)
+        if used + cost > max_tokens:
+            if not parts:
+                parts.append(truncate_head(text, max_tokens))
+            break
+        parts.append(text)
+        used += cost
+    return separator.join(parts)
+
+
+class _StoreDocs:
+    """Position -> Document view over a LangChain FAISS store, for searching its own index.
+
+    Its length is the docstore mapping's, which LangChain grows after the index: positions
+    at or past it are not searchable yet.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store.index_to_docstore_id)
+
+    def __getitem__(self, i):
+        return self.store.docstore.search(self.store.index_to_docstore_id[i])
+
+
+class RetrievalEngine:
+    """Top-k search with MMR and metadata filters over the shared retriever's documents.
+
+    With index type "native" (the default) it searches the store's own index, so no
+    vectors are held twice. Any other type keeps a separate FAISS index of that type,
+    built from the vectors and docstore of the retriever's current store. When ingestion
+    appends to that store the new vectors are added incrementally; when the retriever
+    swaps in a new store (hot reload) the index is rebuilt in the background while
+    searches keep using the previous one.
+    """
+
+    def __init__(self, retriever, index_type=INDEX_TYPE, **index_params):
+        self.retriever = retriever
+        self.index_type = index_type
+        self.index_params = index_params
+        self.state = None  # (source store, faiss index, position -> Document)
+        self.lock = threading.Lock()
+        self.rw = ReadWriteLock()  # searches vs. incremental adds to the separate index
+        self.rebuilding = False
+        self.build_seconds = None
+
+    def _build(self, store):
+        started = time.perf_counter()
+        with self.retriever.rw.reading():
+            n = min(store.index.ntotal, len(store.index_to_docstore_id))
+            vectors = store.index.reconstruct_n(0, n) if n else np.zeros((0, store.index.d), dtype=np.float32)
+            docs = [store.docstore.search(store.index_to_docstore_id[i]) for i in range(n)]
+        index = build_index(vectors, self.index_type, **self.index_params) if n else faiss.IndexFlatL2(store.index.d)
+        self.build_seconds = round(time.perf_counter() - started, 3)
+        print(f"🧭 Built {self.index_type} retrieval index over {n} chunks in {self.build_seconds:.2f}s")
+        return store, index, docs
+
+    def _rebuild_in_background(self, store):
+        try:
+            state = self._build(store)
+            with self.lock:
+                self.state = state
+        except Exception as e:
+            print(f"⚠️ Retrieval index rebuild failed, keeping the previous one: {e}")
+        finally:
+            self.rebuilding = False
+
+    def _current(self):
+        """Returns (index, docs, lexical index or None) in sync with the retriever's store."""
+        store, lexical = self.retriever.get_snapshot()
+        if self.index_type == "native":
+            return store.index, _StoreDocs(store), lexical
+        with self.lock:
+            if self.state is None:
+                self.state = self._build(store)
+            source, index, docs = self.state
+            if source is not store:
+                if not self.rebuilding:
+                    self.rebuilding = True
+                    threading.Thread(target=self._rebuild_in_background, args=(store,), daemon=True).start()
+            elif min(store.index.ntotal, len(store.index_to_docstore_id)) > index.ntotal:
+                # Ingestion appended to the live store: add just the new vectors
+                # (bounded by the docstore mapping, which the store updates after its index)
+                with self.retriever.rw.reading(), self.rw.writing():
+                    start, end = index.ntotal, min(store.index.ntotal, len(store.index_to_docstore_id))
+                    index.add(store.index.reconstruct_n(start, end - start))
+                    docs.extend(store.docstore.search(store.index_to_docstore_id[i]) for i in range(start, end))
+            # Lexical positions refer to the current store; skip them while an old index is still served
+            return index, docs, lexical if source is store else None
+
+    def _vector_candidates(self, index, docs, query_vector, fetch_k, filter, restrict=None):
+        """[(position, L2 distance)] for up to fetch_k chunks matching `filter`, nearest first.
+
+        `restrict` limits the search to those positions (lexical pre-filter); when the
+        index cannot search a subset, the full index is searched instead.
+        """
+        params = None
+        if restrict is not None:
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(np.asarray(restrict, dtype=np.int64)))
+        pool = fetch_k
+        while True:
+            try:
+                distances, ids = index.search(query_vector, min(pool, index.ntotal), params=params)
+            except (RuntimeError, TypeError):
+                if params is None:
+                    raise
+                params, restrict = None, None
+                continue
+            candidates = [
+                (int(i), float(d)) for i, d in zip(ids[0], distances[0])
+                if 0 <= i < len(docs) and matches_filter(docs[i].metadata, filter)
+            ]
+            if len(candidates) >= fetch_k or pool >= index.ntotal or filter is None:
+                return candidates[:fetch_k]
+            pool *= 4
+
+    def search(self, query, k=TOP_K, fetch_k=FETCH_K, mmr=True, lambda_mult=MMR_LAMBDA, filter=None,
+               hybrid=HYBRID_SEARCH):
+        """Returns up to `k` (Document, score) pairs for `query`.
+
+        With a filter, the candidate pool is widened until `fetch_k` matching chunks are
+        found or the index is exhausted. With `hybrid`, BM25 hits are fused with the
+        vector hits by reciprocal rank fusion, so exact names, hashtags and products are
+        not lost. On corpora of PREFILTER_MIN_DOCS or more, the vector search then only
+        scores the lexical candidates. With `mmr`, the final `k` are picked from the
+        candidates by maximal marginal relevance to avoid near-duplicate context.
+        Scores are L2 distances (lower is better), or fused RRF scores (higher is better) when hybrid.
+        """
+        if not self.retriever.has_index():
+            return []  # nothing seeded or ingested yet
+        index, docs, lexical = self._current()
+        if min(index.ntotal, len(docs)) == 0:
+            return []
+        query_vector = np.asarray([self.retriever.embeddings.embed_query(query)], dtype=np.float32)
+        # The native index is the live store, appended to by ingestion; a separate one is ours
+        with (self.retriever.rw if self.index_type == "native" else self.rw).reading():
+            return self._search(index, docs, lexical, query, query_vector, k, fetch_k, mmr, lambda_mult, filter, hybrid)
+
+    def _search(self, index, docs, lexical, query, query_vector, k, fetch_k, mmr, lambda_mult, filter, hybrid):
+        fetch_k = max(k, fetch_k if mmr or filter is not None or hybrid else k)
+
+        lexical_hits = []
+        if hybrid and lexical is not None:
+            lexical_hits = [
+                position for position, _ in lexical.search(query, LEXICAL_CANDIDATES, limit=min(index.ntotal, len(docs)))
+                if matches_filter(docs[position].metadata, filter)
+            ]
+        restrict = lexical_hits if index.ntotal >= PREFILTER_MIN_DOCS and len(lexical_hits) >= fetch_k else None
+        candidates = self._vector_candidates(index, docs, query_vector, fetch_k, filter, restrict)
+        if lexical_hits:
+            ranking = [position for position, _ in candidates]
+            candidates = reciprocal_rank_fusion([ranking, lexical_hits[:fetch_k]], k=RRF_K)[:fetch_k]
+
+        if mmr and len(candidates) > k:
+            try:
+                vectors = np.asarray([index.reconstruct(i) for i, _ in candidates], dtype=np.float32)
+            except RuntimeError:
+                vectors = None  # index cannot reconstruct vectors: keep the plain top-k
+            if vectors is not None and lexical_hits:
+                # Relevance is the fused rank score; the query vector alone would undo the fusion
+                chosen = fused_mmr([score for _, score in candidates], vectors, lambda_mult=lambda_mult, k=k)
+                candidates = [candidates[j] for j in chosen]
+            elif vectors is not None:
+                chosen = maximal_marginal_relevance(query_vector[0], vectors, lambda_mult=lambda_mult, k=k)
+                candidates = [candidates[j] for j in chosen]
+        return [(docs[i], score) for i, score in candidates[:k]]
+
+    def stats(self):
+        state = self.state
+        store = self.retriever.store
+        if self.index_type == "native" and store is not None:
+            state = (None, store.index)
+        return {
+            "index_type": self.index_type,
+            "entries": state[1].ntotal if state else 0,
+            "build_seconds": self.build_seconds,
+            "rebuilding": self.rebuilding,
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Process-wide retrieval engine over the shared retriever (index type from RAG_INDEX_TYPE)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RetrievalEngine(get_retriever())
+    return _engine
@@ -0,0 +1,198 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+
+from .embedding_cache import normalize_text
+from .retriever import get_embeddings, get_retriever
+
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", 100))
+SAVE_INTERVAL = float(os.getenv("INGEST_SAVE_INTERVAL", 30))
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+
+def content_hash(text):
+    """Dedupe key for a chunk: whitespace/Unicode differences do not create a second entry."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def save_store_atomically(store, index_path, lexical=None):
+    """Writes `store` (and its BM25 index) next to `index_path` and swaps the directories with renames."""
+    index_path = os.path.abspath(index_path)
+    tmp_path, old_path = f"{index_path}.tmp", f"{index_path}.old"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    store.save_local(tmp_path)
+    if lexical is not None:
+        lexical.save(tmp_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(index_path):
+        os.rename(index_path, old_path)
+    os.rename(tmp_path, index_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+class IngestionPipeline:
+    """Appends documents to the live FAISS index without rebuilding it.
+
+    Texts are split, deduplicated by content hash, embedded in batches and added to the
+    retriever's in-memory store, so new entries are searchable immediately. A background
+    thread saves the store every SAVE_INTERVAL seconds when it changed: it writes a
+    complete copy next to the index and swaps the directories with renames, so readers
+    (including other processes hot-reloading the index) never see a half-written index.
+    """
+
+    def __init__(self, retriever=None, embeddings=None, batch_size=EMBED_BATCH_SIZE, save_interval=SAVE_INTERVAL):
+        self.retriever = retriever or get_retriever()
+        self.embeddings = embeddings or get_embeddings()
+        self.batch_size = batch_size
+        self.save_interval = save_interval
+        self.splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        self.write_lock = threading.Lock()  # serializes adds and saves; searches take retriever.rw instead
+        self.hashes = None  # content hashes already in the index, built lazily from the docstore
+        self.dirty = False
+        self.saver = None
+        self.stop_event = threading.Event()
+        self.counters = {"added": 0, "duplicates": 0, "saves": 0, "last_save_seconds": None}
+
+    def _snapshot(self):
+        """The retriever's live (store, lexical index), or (None, None) while no index exists yet."""
+        if not self.retriever.has_index():
+            return None, None
+        return self.retriever.get_snapshot()
+
+    def _load_hashes(self, store):
+        hashes = set()
+        if store is not None:
+            for doc in store.docstore._dict.values():
+                hashes.add(doc.metadata.get("content_hash") or content_hash(doc.page_content))
+        return hashes
+
+    def _chunks(self, texts, metadatas):
+        for i, text in enumerate(texts):
+            metadata = metadatas[i] if metadatas else {}
+            for chunk in self.splitter.split_text(text):
+                yield chunk, {**metadata, "content_hash": content_hash(chunk)}
+
+    def ingest(self, texts, metadatas=None, source=None):
+        """Adds `texts` to the index. Returns {"added", "duplicates"} for this call."""
+        if source is not None:
+            metadatas = [{**(metadatas[i] if metadatas else {}), "source": source} for i in range(len(texts))]
+        added = duplicates = 0
+        with self.write_lock:
+            store, lexical = self._snapshot()
+            if self.hashes is None:
+                self.hashes = self._load_hashes(store)
+
+            pending, seen = [], set()
+            for chunk, metadata in self._chunks(texts, metadatas):
+                if metadata["content_hash"] in self.hashes or metadata["content_hash"] in seen:
+                    duplicates += 1
+                    continue
+                seen.add(metadata["content_hash"])
+                pending.append((chunk, metadata))
+
+            try:
+                for start in range(0, len(pending), self.batch_size):
+                    batch = pending[start:start + self.batch_size]
+                    chunks = [chunk for chunk, _ in batch]
+                    vectors = self.embeddings.embed_documents(chunks)
+                    if store is None:
+                        store = FAISS.from_embeddings(
+                            list(zip(chunks, vectors)), self.embeddings, metadatas=[m for _, m in batch]
+                        )
+                        store, lexical = self.retriever.install(store)
+                    else:
+                        # Exclusive against searches: FAISS add is not safe next to a search, and
+                        # LangChain grows the index before its position -> docstore id mapping
+                        with self.retriever.rw.writing():
+                            self.retriever.materialize()
+                            position = store.index.ntotal
+                            store.add_embeddings(list(zip(chunks, vectors)), metadatas=[m for _, m in batch])
+                            if lexical is not None:
+                                lexical.add(chunks, position)
+                    # Only chunks that made it into the index count as present (a failed embed can be retried)
+                    self.hashes.update(m["content_hash"] for _, m in batch)
+                    added += len(batch)
+            finally:
+                # Batches added before a failure are in the index and must still be saved
+                if added:
+                    self.dirty = True
+                self.counters["added"] += added
+                self.counters["duplicates"] += duplicates
+        return {"added": added, "duplicates": duplicates}
+
+    def ingest_documents(self, documents, source=None):
+        """Adds LangChain Documents, keeping their metadata."""
+        return self.ingest(
+            [doc.page_content for doc in documents], [dict(doc.metadata) for doc in documents], source=source
+        )
+
+    def flush(self):
+        """Saves the index now if it changed since the last save. Returns True when it saved."""
+        with self.write_lock:
+            store, lexical = self.retriever.snapshot
+            if not self.dirty or store is None:
+                return False
+            started = time.perf_counter()
+            save_store_atomically(store, self.retriever.index_path, lexical)
+            self.dirty = False
+            self.retriever.mark_synced()
+            self.counters["saves"] += 1
+            self.counters["last_save_seconds"] = round(time.perf_counter() - started, 3)
+        return True
+
+    def _save_loop(self):
+        while not self.stop_event.wait(self.save_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Saving FAISS index failed, will retry: {e}")
+
+    def start(self):
+        """Starts the periodic background save (idempotent)."""
+        if self.saver is None or not self.saver.is_alive():
+            self.stop_event.clear()
+            self.saver = threading.Thread(target=self._save_loop, name="faiss-index-saver", daemon=True)
+            self.saver.start()
+        return self
+
+    def stop(self):
+        """Stops the background save and writes any pending changes."""
+        self.stop_event.set()
+        if self.saver is not None:
+            self.saver.join()
+            self.saver = None
+        self.flush()
+
+    def stats(self):
+        store = self.retriever.store
+        return {
+            **self.counters,
+            "entries": store.index.ntotal if store is not None else 0,
+            "unsaved_changes": self.dirty,
+        }
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_ingestion_pipeline():
+    """Process-wide ingestion pipeline over the shared retriever, with background saving started."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = IngestionPipeline().start()
+    return _pipeline
+
+
+def stop_ingestion_pipeline():
+    """Stops the process-wide pipeline if one was created, writing its pending changes."""
+    if _pipeline is not None:
+        _pipeline.stop()
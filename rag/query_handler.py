@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from agents.rag_answer_agent import RagAnswerAgent
+
+from .engine import CONTEXT_MAX_TOKENS, TOP_K, assemble_context, get_engine
+from .retriever import get_retriever
+from .semantic_cache import semantic_cache
+
+# Shares the response cache, single flight, rate limiter and retries with the other agents
+rag_answer_agent = RagAnswerAgent()
+
+
+def retrieve(query, k=TOP_K, filters=None, mmr=True):
+    """Returns the top `k` Documents for `query` (none while no index exists yet)."""
+    return [doc for doc, _ in get_engine().search(query, k=k, filter=filters, mmr=mmr)]
+
+
+def build_context(query, k=TOP_K, filters=None, max_context_tokens=CONTEXT_MAX_TOKENS):
+    """Retrieved chunks for `query` that fit the context budget, as one string."""
+    return assemble_context(retrieve(query, k=k, filters=filters), max_tokens=max_context_tokens)
+
+
+def answer_query(query, k=TOP_K, filters=None, max_context_tokens=CONTEXT_MAX_TOKENS):
+    """Answers `query` with Gemini, grounded on retrieved chunks that fit the context budget."""
+    return rag_answer_agent.execute(query, build_context(query, k, filters, max_context_tokens))
+
+
+async def aanswer_query(query, k=TOP_K, filters=None, max_context_tokens=CONTEXT_MAX_TOKENS):
+    """Async version of answer_query: retrieval runs in a thread, the Gemini call on the event loop."""
+    context = await asyncio.to_thread(build_context, query, k, filters, max_context_tokens)
+    return await rag_answer_agent.aexecute(query, context)
+
+
+def kb_version():
+    """Changes whenever the knowledge base does: index reloads/rebuilds and ingested chunks."""
+    retriever = get_retriever()
+    if not retriever.has_index():
+        return retriever.version, 0
+    return retriever.version, retriever.get_store().index.ntotal
+
+
+def _cache_lookup(query, k, filters, max_context_tokens):
+    """(query vector, scope, kb version, cached (answer, similarity) or None) for the semantic cache."""
+    vector = get_retriever().embeddings.embed_query(query)
+    scope = json.dumps({"k": k, "filters": filters, "max_context_tokens": max_context_tokens}, sort_keys=True, default=str)
+    version = kb_version()
+    return vector, scope, version, semantic_cache.get(vector, scope, version)
+
+
+def answer_query_cached(query, k=TOP_K, filters=None, max_context_tokens=CONTEXT_MAX_TOKENS):
+    """answer_query behind the semantic cache. Returns (answer, similarity); similarity is None on a miss."""
+    vector, scope, version, cached = _cache_lookup(query, k, filters, max_context_tokens)
+    if cached is not None:
+        return cached
+    answer = answer_query(query, k=k, filters=filters, max_context_tokens=max_context_tokens)
+    semantic_cache.set(vector, query, scope, answer, version)
+    return answer, None
+
+
+async def aanswer_query_cached(query, k=TOP_K, filters=None, max_context_tokens=CONTEXT_MAX_TOKENS):
+    """Async version of answer_query_cached."""
+    vector, scope, version, cached = await asyncio.to_thread(_cache_lookup, query, k, filters, max_context_tokens)
+    if cached is not None:
+        return cached
+    answer = await aanswer_query(query, k=k, filters=filters, max_context_tokens=max_context_tokens)
+    semantic_cache.set(vector, query, scope, answer, version)
+    return answer, None
@@ -0,0 +1,260 @@
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+from .bm25 import HYBRID_SEARCH, BM25Index
+from .embedding_cache import CachedEmbeddings
+from .embeddings import create_embeddings, default_index_path
+
+# FAISS Storage Path (one index per embedding backend unless set explicitly)
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", default_index_path())
+
+INDEX_FILES = ("index.faiss", "index.pkl")
+RELOAD_CHECK_INTERVAL = float(os.getenv("RETRIEVER_RELOAD_INTERVAL", 5))
+# Memory-map index.faiss instead of reading it into RAM; processes then share one copy in the page cache
+RETRIEVER_MMAP = os.getenv("RETRIEVER_MMAP", "false").lower() == "true"
+
+
+class ReadWriteLock:
+    """Any number of readers or one writer. A waiting writer holds off new readers, so a
+    steady stream of searches cannot starve ingestion. Not reentrant."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextmanager
+    def reading(self):
+        with self.cond:
+            while self.writer or self.waiting_writers:
+                self.cond.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.readers -= 1
+                if not self.readers:
+                    self.cond.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self.cond:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.cond.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.writer = False
+                self.cond.notify_all()
+
+
+class RetrieverService:
+    """Loads a FAISS index once and serves similarity searches from memory.
+
+    FAISS indexes are not safe to search while vectors are being added, so searches of
+    the live store hold `rw.reading()` and in-place changes (ingestion) hold `rw.writing()`.
+    Every RELOAD_CHECK_INTERVAL seconds a search also checks the index files on disk; when
+    they changed, a background thread loads the new index and swaps it in with a single
+    reference assignment, so in-flight searches finish on the old index. The store and its
+    BM25 index are swapped together as one (store, lexical) snapshot, so a reader never
+    pairs a new store with the previous lexical positions.
+    """
+
+    def __init__(self, index_path=VECTOR_STORE_PATH, embeddings=None, reload_interval=RELOAD_CHECK_INTERVAL,
+                 mmap=RETRIEVER_MMAP, lexical=HYBRID_SEARCH):
+        self.index_path = index_path
+        self.embeddings = embeddings
+        self.reload_interval = reload_interval
+        self.mmap = mmap
+        self.mapped = False  # current store's index is a read-only view of the file
+        self.use_lexical = lexical
+        self.snapshot = (None, None)  # (store, BM25Index over the same positions or None)
+        self.signature = None
+        self.version = 0
+        self.load_lock = threading.Lock()
+        self.rw = ReadWriteLock()  # searches vs. in-place appends to the live store
+        self.last_check = 0.0
+        self.reloading = False
+        self.load_seconds = None
+
+    @property
+    def store(self):
+        return self.snapshot[0]
+
+    @property
+    def lexical(self):
+        return self.snapshot[1]
+
+    def _signature(self):
+        """(name, mtime, size) of the index files, or None while they are missing."""
+        try:
+            stats = [(name, os.stat(os.path.join(self.index_path, name))) for name in INDEX_FILES]
+        except FileNotFoundError:
+            return None
+        return tuple((name, st.st_mtime_ns, st.st_size) for name, st in stats)
+
+    def _read_store(self):
+        if self.mmap:
+            try:
+                return self._read_store_mapped()
+            except RuntimeError as e:
+                print(f"⚠️ Cannot memory-map {self.index_path}, reading it into memory: {e}")
+        self.mapped = False
+        return FAISS.load_local(self.index_path, self.embeddings, allow_dangerous_deserialization=True)
+
+    def _read_store_mapped(self):
+        """FAISS.load_local, but with the index codes memory-mapped from index.faiss."""
+        index = faiss.read_index(
+            os.path.join(self.index_path, "index.faiss"), faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+        )
+        with open(os.path.join(self.index_path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        self.mapped = True
+        return FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+
+    def load(self):
+        """Loads the index from disk and swaps it in. Returns the new store."""
+        with self.load_lock:
+            return self._load_locked()
+
+    def _load_locked(self):
+        signature = self._signature()
+        started = time.perf_counter()
+        store = self._read_store()
+        lexical = BM25Index.load_or_build(self.index_path, store) if self.use_lexical else None
+        self.snapshot, self.signature = (store, lexical), signature
+        self.version += 1
+        self.load_seconds = round(time.perf_counter() - started, 3)
+        print(f"📚 Loaded FAISS index v{self.version} from {self.index_path} in {self.load_seconds:.2f}s")
+        return store
+
+    def _reload_in_background(self):
+        try:
+            self.load()
+        except Exception as e:
+            # Files may be mid-write; keep serving the current index and retry on the next check
+            print(f"⚠️ FAISS index reload failed, keeping v{self.version}: {e}")
+        finally:
+            self.reloading = False
+
+    def _check_for_update(self):
+        now = time.monotonic()
+        if self.reloading or now - self.last_check < self.reload_interval:
+            return
+        self.last_check = now
+        signature = self._signature()
+        if signature is not None and signature != self.signature:
+            self.reloading = True
+            threading.Thread(target=self._reload_in_background, daemon=True).start()
+
+    def _warm_up_quietly(self):
+        try:
+            self.get_store()
+        except Exception as e:
+            print(f"⚠️ FAISS index warm-up failed, it will load on first search: {e}")
+
+    def warm_up(self, background=True):
+        """Loads the index ahead of the first search, in a daemon thread unless background=False."""
+        if self.store is not None or self._signature() is None:
+            return
+        if background:
+            threading.Thread(target=self._warm_up_quietly, name="faiss-index-warm-up", daemon=True).start()
+        else:
+            self.get_store()
+
+    def install(self, store):
+        """Serves `store` (built in this process, e.g. the first ingestion batch) as the current index.
+        Returns the new (store, lexical) snapshot."""
+        with self.load_lock:
+            self.snapshot = (store, BM25Index.from_store(store) if self.use_lexical else None)
+            self.mapped = False
+            self.version += 1
+            return self.snapshot
+
+    def materialize(self):
+        """Copies a memory-mapped index into RAM so it can be appended to (mapped indexes are read-only)."""
+        with self.load_lock:
+            if self.mapped and self.store is not None:
+                self.store.index = faiss.deserialize_index(faiss.serialize_index(self.store.index))
+                self.mapped = False
+
+    def mark_synced(self):
+        """Records the files on disk as matching the in-memory store (after this process saved it)."""
+        self.signature = self._signature()
+
+    def has_index(self):
+        """True once a store is loaded or an index exists on disk (get_store would not fail)."""
+        return self.store is not None or self._signature() is not None
+
+    def get_snapshot(self):
+        """Returns the current (store, lexical index or None), loading the store on first use."""
+        snapshot = self.snapshot
+        if snapshot[0] is None:
+            with self.load_lock:
+                if self.snapshot[0] is None:
+                    self._load_locked()
+                snapshot = self.snapshot
+        else:
+            self._check_for_update()
+        return snapshot
+
+    def get_store(self):
+        """Returns the in-memory store, loading it on first use."""
+        return self.get_snapshot()[0]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        store = self.get_store()
+        with self.rw.reading():
+            return store.similarity_search(query, k=k, **kwargs)
+
+
+_embeddings = None
+_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def get_embeddings():
+    """Process-wide embedding model (EMBEDDING_BACKEND) behind the content-addressed embedding cache."""
+    global _embeddings
+    if _embeddings is None:
+        with _retriever_lock:
+            if _embeddings is None:
+                embeddings, model = create_embeddings()
+                _embeddings = CachedEmbeddings(embeddings, model)
+    return _embeddings
+
+
+def get_retriever():
+    """Process-wide retriever over VECTOR_STORE_PATH, shared by llm.py (scraper) and the API."""
+    global _retriever
+    if _retriever is None:
+        embeddings = get_embeddings()
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = RetrieverService(VECTOR_STORE_PATH, embeddings)
+    return _retriever
+
+
+def _warm_up_retriever():
+    try:
+        get_retriever().warm_up(background=False)
+    except Exception as e:
+        print(f"⚠️ FAISS index warm-up failed, it will load on first search: {e}")
+
+
+def warm_up_retriever():
+    """Builds the shared retriever (and its embedding client) and loads an existing index in a
+    daemon thread, so a missing index or missing credentials never block or fail start-up."""
+    threading.Thread(target=_warm_up_retriever, name="faiss-index-warm-up", daemon=True).start()
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 512))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", 3600))
+SEMANTIC_CACHE_CANDIDATES = 4  # nearest cached queries checked per lookup
+
+
+class SemanticCache:
+    """Answers keyed by query meaning rather than exact text.
+
+    Query embeddings are L2-normalized into an inner-product FAISS index, so a search
+    returns cosine similarity. A lookup returns the closest cached answer whose
+    similarity is at least `threshold` and whose scope (retrieval settings such as
+    k and filters) matches. Entries expire after `ttl` seconds, the least recently used
+    entry is evicted beyond `max_entries`, and the whole cache is dropped when the
+    knowledge base version changes.
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+                 ttl=SEMANTIC_CACHE_TTL_SECONDS, clock=time.time):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.index = None  # IndexIDMap2(IndexFlatIP), created with the first entry's dimension
+        self.entries = OrderedDict()  # id -> (query, scope, answer, created), least recently used first
+        self.next_id = 0
+        self.kb_version = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray([vector], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _remove(self, ids):
+        for entry_id in ids:
+            self.entries.pop(entry_id, None)
+        if ids and self.index is not None:
+            self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+
+    def _check_version(self, kb_version):
+        if kb_version != self.kb_version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.index = None
+            self.kb_version = kb_version
+
+    def get(self, vector, scope, kb_version):
+        """Returns (answer, similarity) for the closest fresh match, or None."""
+        query = self._normalize(vector)
+        with self.lock:
+            self._check_version(kb_version)
+            if self.index is None or self.index.ntotal == 0:
+                self.misses += 1
+                return None
+            similarities, ids = self.index.search(query, min(SEMANTIC_CACHE_CANDIDATES, self.index.ntotal))
+            now, expired = self.clock(), []
+            for similarity, entry_id in zip(similarities[0], ids[0]):
+                entry = self.entries.get(int(entry_id))
+                if entry is None or similarity < self.threshold:
+                    continue
+                if now - entry[3] > self.ttl:
+                    expired.append(int(entry_id))
+                    continue
+                if entry[1] == scope:
+                    self.entries.move_to_end(int(entry_id))
+                    self._remove(expired)
+                    self.hits += 1
+                    return entry[2], float(similarity)
+            self._remove(expired)
+            self.misses += 1
+            return None
+
+    def set(self, vector, query, scope, answer, kb_version):
+        vector = self._normalize(vector)
+        with self.lock:
+            self._check_version(kb_version)
+            if self.index is None:
+                self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+            entry_id = self.next_id
+            self.next_id += 1
+            self.index.add_with_ids(vector, np.asarray([entry_id], dtype=np.int64))
+            self.entries[entry_id] = (query, scope, answer, self.clock())
+            if len(self.entries) > self.max_entries:
+                self._remove(list(self.entries)[:len(self.entries) - self.max_entries])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.index = None
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "threshold": self.threshold,
+            }
+
+
+# ✅ Shared by /rag_chat requests in this process
+semantic_cache = SemanticCache()
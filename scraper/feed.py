@@ -0,0 +1,87 @@
+import uuid
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from .waits import wait_until
+
+POST_CLASS = "feed-shared-update-v2"
+
+# One round trip: every feed post this snapshot has not extracted yet, as plain data plus its element.
+# Extracted nodes are stamped with the snapshot's token so later calls only walk the posts added by scrolling.
+EXTRACT_SCRIPT = """
+const postClass = arguments[0], token = arguments[1];
+const posts = [];
+for (const el of document.getElementsByClassName(postClass)) {
+  if (el.dataset.lacSnapshot === token) continue;
+  el.dataset.lacSnapshot = token;
+  const urnHost = el.closest("[data-urn]") || el.querySelector("[data-urn]");
+  const urn = urnHost ? urnHost.getAttribute("data-urn") : null;
+  const actor = el.querySelector(".update-components-actor__title span[aria-hidden='true'], .update-components-actor__name");
+  const body = el.querySelector(".feed-shared-update-v2__description, .update-components-text");
+  posts.push({
+    urn: urn,
+    author: actor ? actor.innerText.trim() : "",
+    text: (body ? body.innerText : el.innerText).trim(),
+    has_comment_button: !!el.querySelector('button[aria-label*="Comment"]'),
+    element: el,
+  });
+}
+return posts;
+"""
+
+
+class FeedSnapshot:
+    """Feed posts extracted so far, in feed order, keyed by URN.
+
+    `refresh` pulls all posts rendered since the last call with a single execute_script,
+    so walking n posts costs one round trip per scroll instead of one per post and
+    attribute. Elements that went stale are re-resolved by URN.
+    """
+
+    def __init__(self, post_class=POST_CLASS):
+        self.post_class = post_class
+        self.token = uuid.uuid4().hex
+        self.posts = []  # [{"urn", "author", "text", "has_comment_button", "element"}]
+        self.urns = set()
+
+    def __len__(self):
+        return len(self.posts)
+
+    def refresh(self, driver):
+        """Extracts the newly rendered posts. Returns them."""
+        new_posts = []
+        for post in driver.execute_script(EXTRACT_SCRIPT, self.post_class, self.token) or []:
+            if post["urn"] is not None:
+                if post["urn"] in self.urns:
+                    continue  # re-rendered node of a post we already have
+                self.urns.add(post["urn"])
+            new_posts.append(post)
+        self.posts.extend(new_posts)
+        return new_posts
+
+    def wait_for(self, driver, count):
+        """Refreshes until at least `count` posts are known, scrolling to the end of the feed
+        to lazy-load more while there are too few (raises TimeoutException otherwise)."""
+        def loaded(d):
+            if len(self) >= count or (self.refresh(d) and len(self) >= count):
+                return True
+            d.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            return False
+
+        return wait_until(driver, loaded, message=f"{count} feed posts")
+
+    def element(self, driver, index):
+        """The live element of post `index`, looked up again by URN when the cached one is stale."""
+        post = self.posts[index]
+        try:
+            post["element"].is_enabled()
+            return post["element"]
+        except StaleElementReferenceException:
+            if post["urn"] is None:
+                raise
+            post["element"] = driver.find_element(
+                By.XPATH,
+                f'//*[@data-urn="{post["urn"]}"]/descendant-or-self::*[contains(@class, "{self.post_class}")]',
+            )
+            return post["element"]
@@ -0,0 +1,294 @@
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import random
+import sqlite3
+import time
+import uuid
+
+# ✅ Worker pool settings
+SCRAPER_WORKERS = int(os.getenv("SCRAPER_WORKERS", 2))
+SESSIONS_PER_ACCOUNT = int(os.getenv("SCRAPER_SESSIONS_PER_ACCOUNT", 1))
+ACCOUNT_MIN_INTERVAL = float(os.getenv("SCRAPER_ACCOUNT_MIN_INTERVAL", 60))  # seconds between comments per account
+ACCOUNT_JITTER = float(os.getenv("SCRAPER_ACCOUNT_JITTER", 30))  # extra random spacing on top of the interval
+ACCOUNT_MAX_PER_HOUR = int(os.getenv("SCRAPER_ACCOUNT_MAX_PER_HOUR", 20))
+RESULTS_DB_PATH = os.getenv("SCRAPER_RESULTS_PATH", "scraper_results.sqlite3")
+ACCOUNTS_FILE = os.getenv("LINKEDIN_ACCOUNTS_FILE")
+
+POLL_INTERVAL = 1.0
+FEED_URL = "https://www.linkedin.com/feed/"
+
+
+class ResultsStore:
+    """SQLite table every worker process appends its per-post results to (WAL, one connection per process)."""
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                account TEXT NOT NULL,
+                worker INTEGER NOT NULL,
+                post_index INTEGER,
+                post_urn TEXT,
+                post_preview TEXT,
+                comment TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL
+            )"""
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(results)")}
+        if "post_urn" not in columns:  # stores written before URNs were recorded
+            self.conn.execute("ALTER TABLE results ADD COLUMN post_urn TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_run ON results (run_id, status)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_post ON results (account, post_urn)")
+        self.conn.commit()
+
+    def record(self, run_id, account, worker, result):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO results (run_id, account, worker, post_index, post_urn, post_preview, comment, status, error, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id, account, worker, result.get("post_index"), result.get("post_urn"), result.get("post_preview"),
+                    result.get("comment"), result["status"], result.get("error"), time.time(),
+                ),
+            )
+
+    def has_commented(self, account, post_urn):
+        """True when `account` already posted a comment on `post_urn`, in any run."""
+        row = self.conn.execute(
+            "SELECT 1 FROM results WHERE account = ? AND post_urn = ? AND status = 'posted' LIMIT 1", (account, post_urn)
+        ).fetchone()
+        return row is not None
+
+    def summary(self, run_id):
+        """{account: {status: count}} for one run."""
+        summary = {}
+        rows = self.conn.execute(
+            "SELECT account, status, COUNT(*) FROM results WHERE run_id = ? GROUP BY account, status", (run_id,)
+        )
+        for account, status, count in rows:
+            summary.setdefault(account, {})[status] = count
+        return summary
+
+    def posted_comments(self, run_id):
+        return [row[0] for row in self.conn.execute(
+            "SELECT comment FROM results WHERE run_id = ? AND status = 'posted' ORDER BY id", (run_id,)
+        )]
+
+    def close(self):
+        self.conn.close()
+
+
+class AccountPacer:
+    """Per-account comment pacing shared by all worker processes.
+
+    Each account gets at least `min_interval` (+ random jitter) seconds between comments and
+    at most `max_per_hour` comments per rolling hour, however many sessions post for it.
+    State lives in a multiprocessing Manager; callers sleep outside the lock.
+    """
+
+    def __init__(self, manager, min_interval=ACCOUNT_MIN_INTERVAL, jitter=ACCOUNT_JITTER,
+                 max_per_hour=ACCOUNT_MAX_PER_HOUR, sessions_per_account=SESSIONS_PER_ACCOUNT):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.max_per_hour = max_per_hour
+        self.sessions_per_account = sessions_per_account
+        self.lock = manager.Lock()
+        self.next_allowed = manager.dict()  # account -> earliest time of its next comment
+        self.history = manager.dict()  # account -> comment times within the last hour
+        self.leases = manager.dict()  # account -> open browser sessions
+
+    def wait(self, account):
+        """Blocks until `account` may comment again and books the slot."""
+        while True:
+            with self.lock:
+                now = time.time()
+                recent = [t for t in self.history.get(account, []) if now - t < 3600]
+                ready_at = self.next_allowed.get(account, 0.0)
+                if len(recent) >= self.max_per_hour:
+                    ready_at = max(ready_at, recent[0] + 3600)
+                if ready_at <= now:
+                    self.history[account] = recent + [now]
+                    self.next_allowed[account] = now + self.min_interval + random.uniform(0, self.jitter)
+                    return
+            delay = ready_at - now
+            print(f"⏳ Pacing {account}: next comment in {delay:.0f}s")
+            time.sleep(min(delay, 60))
+
+    def acquire(self, account):
+        """Claims one of the account's session slots. Returns False when all are in use."""
+        with self.lock:
+            if self.leases.get(account, 0) >= self.sessions_per_account:
+                return False
+            self.leases[account] = self.leases.get(account, 0) + 1
+            return True
+
+    def release(self, account):
+        with self.lock:
+            self.leases[account] = max(0, self.leases.get(account, 0) - 1)
+
+
+def load_accounts(path=ACCOUNTS_FILE):
+    """Accounts from a JSON file ([{"email": ..., "password": ..., "feeds": [url, ...]}], "feeds" optional),
+    else the EMAIL/PASSWORD env vars."""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [
+                {"email": a["email"], "password": a["password"], "feeds": a.get("feeds") or [FEED_URL]}
+                for a in json.load(f)
+            ]
+    return [{"email": os.getenv("EMAIL"), "password": os.getenv("PASSWORD"), "feeds": [FEED_URL]}]
+
+
+def plan_jobs(accounts, posts_per_account=5):
+    """One job per (account, feed URL): a feed is walked by a single session from its top.
+
+    Splitting one feed by post index does not work, since every page load orders it differently.
+    """
+    return [
+        {"email": account["email"], "password": account["password"], "feed_url": url, "count": posts_per_account}
+        for account in accounts
+        for url in account.get("feeds") or [FEED_URL]
+    ]
+
+
+def worker_main(worker_id, run_id, jobs, remaining, pacer, results_path, process_job=None):
+    """Worker process: one browser session at a time, signing in again only when the account changes."""
+    from scraper.feed import FeedSnapshot
+    from scraper.session import create_driver, ensure_logged_in, open_feed, process_posts
+    from scraper.waits import step_timer
+
+    store = ResultsStore(results_path)
+    page = {"url": None, "feed": None, "next": 0}  # feed URL the driver shows, its snapshot, next post index
+
+    def default_process_job(driver, job, before_comment, on_result):
+        if page["url"] != job["feed_url"]:
+            open_feed(driver, job["feed_url"])
+            page.update(url=job["feed_url"], feed=FeedSnapshot(), next=0)
+        page["next"] = process_posts(
+            driver, page["next"], job["count"], before_comment=before_comment, on_result=on_result,
+            ingest=False, feed=page["feed"],
+            already_commented=lambda urn: store.has_commented(job["email"], urn),
+        )
+
+    if process_job is None:
+        from llm import warm_up
+
+        warm_up()  # load the FAISS index while the first browser starts
+        process_job = default_process_job
+    driver = account = None
+    try:
+        while remaining.value > 0:
+            try:
+                job = jobs.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            if job["email"] != account:
+                if not pacer.acquire(job["email"]):
+                    # Every session slot for this account is busy: hand the job to its holder
+                    jobs.put(job)
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                if driver is not None:
+                    driver.quit()
+                    driver = None
+                if account is not None:
+                    pacer.release(account)
+                account = job["email"]
+
+            email = job["email"]
+            try:
+                if driver is None:
+                    driver = create_driver(email)
+                    ensure_logged_in(driver, email, job["password"])
+                    page.update(url=FEED_URL, feed=FeedSnapshot(), next=0)  # ensure_logged_in leaves us on the home feed
+                print(f"👷 Worker {worker_id}: {email} {job['count']} posts of {job['feed_url']}")
+                process_job(
+                    driver, job,
+                    lambda: pacer.wait(email),
+                    lambda result: store.record(run_id, email, worker_id, result),
+                )
+            except Exception as e:
+                print(f"❌ Worker {worker_id} job failed: {e}")
+                store.record(run_id, email, worker_id, {"status": "error", "error": str(e)})
+                if driver is not None:
+                    driver.quit()
+                    driver = None
+                page.update(url=None, feed=None, next=0)
+            finally:
+                with remaining.get_lock():
+                    remaining.value -= 1
+    finally:
+        if driver is not None:
+            driver.quit()
+        if account is not None:
+            pacer.release(account)
+        store.close()
+        print(f"👷 Worker {worker_id} done.")
+        step_timer.report()
+
+
+def run_pool(accounts, workers=SCRAPER_WORKERS, posts_per_account=5, results_path=RESULTS_DB_PATH, process_job=None):
+    """Runs the jobs for `accounts` on `workers` browser processes. Returns (run_id, summary).
+
+    Workers leave the FAISS index alone (one writer per index); comments they posted are
+    ingested here once the pool has finished. If a worker process dies, the others stop after
+    their current job and the rest of the queue is left unprocessed.
+    """
+    context = multiprocessing.get_context("spawn")  # fresh interpreter per browser, no forked driver state
+    run_id = uuid.uuid4().hex[:12]
+    jobs = plan_jobs(accounts, posts_per_account)
+    store = ResultsStore(results_path)  # creates the table before workers race for it
+
+    with context.Manager() as manager:
+        job_queue = manager.Queue()
+        for job in jobs:
+            job_queue.put(job)
+        remaining = context.Value("i", len(jobs))
+        pacer = AccountPacer(manager)
+
+        started = time.perf_counter()
+        processes = [
+            context.Process(
+                target=worker_main, name=f"scraper-worker-{i}",
+                args=(i, run_id, job_queue, remaining, pacer, results_path, process_job),
+            )
+            for i in range(min(workers, len(jobs)))
+        ]
+        for process in processes:
+            process.start()
+        running = list(processes)
+        while running:
+            multiprocessing.connection.wait([process.sentinel for process in running])
+            for process in [p for p in running if not p.is_alive()]:
+                running.remove(process)
+                process.join()
+                if process.exitcode != 0 and remaining.value > 0:
+                    # A dead worker never counts its job down, so the others would poll forever
+                    with remaining.get_lock():
+                        unfinished, remaining.value = remaining.value, 0
+                    print(f"❌ {process.name} exited with code {process.exitcode}; stopping the other workers "
+                          f"after their current job ({unfinished} jobs unfinished or not started).")
+
+    summary = store.summary(run_id)
+    comments = store.posted_comments(run_id)
+    store.close()
+    if comments:
+        from rag.ingestion import get_ingestion_pipeline
+
+        pipeline = get_ingestion_pipeline()
+        pipeline.ingest(comments, source="past_comment")
+        pipeline.stop()
+    print(f"🏁 Run {run_id}: {len(jobs)} jobs on {len(processes)} workers in {time.perf_counter() - started:.0f}s")
+    for account, counts in summary.items():
+        print(f"   {account}: {counts}")
+    return run_id, summary
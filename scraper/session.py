@@ -0,0 +1,353 @@
+import hashlib
+import json
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+import undetected_chromedriver as uc
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.action_chains import ActionChains
+from llm import generate_comment  # Import AI comment generator
+from rag.ingestion import get_ingestion_pipeline
+from .feed import POST_CLASS, FeedSnapshot
+from .waits import in_viewport, mutated, observe_mutations, pacing, step_timer, wait_until
+
+GENERIC_COMMENTS = ["👍", "Nice!", "Great post!"]
+# Posts whose comments are generated ahead of the one being posted
+COMMENT_PREFETCH = int(os.getenv("SCRAPER_COMMENT_PREFETCH", 2))
+# Time allowed to finish a login verification challenge by hand
+CHALLENGE_TIMEOUT = float(os.getenv("SCRAPER_CHALLENGE_TIMEOUT", 120))
+
+# ✅ Session persistence: a Chrome profile per account plus saved cookies/localStorage
+PERSIST_PROFILE = os.getenv("SCRAPER_PERSIST_PROFILE", "true").lower() == "true"
+PROFILE_DIR = os.getenv("SCRAPER_PROFILE_DIR", ".browser_profiles")
+SESSION_DIR = os.getenv("SCRAPER_SESSION_DIR", ".browser_sessions")
+
+LOGIN_URL = "https://www.linkedin.com/login"
+FEED_URL = "https://www.linkedin.com/feed/"
+LOGGED_OUT_MARKERS = ("/login", "/authwall", "/checkpoint", "/uas/", "/signup")
+COMMENT_BOX = (By.XPATH, './/div[contains(@role, "textbox")]')
+SUBMIT_BUTTON = (By.XPATH, './/button[contains(@class, "comments-comment-box__submit-button--cr")]')
+
+
+def _account_slug(email):
+    return hashlib.sha256((email or "default").lower().encode("utf-8")).hexdigest()[:16]
+
+
+def profile_path(email):
+    return os.path.abspath(os.path.join(PROFILE_DIR, _account_slug(email)))
+
+
+def session_path(email):
+    return os.path.join(SESSION_DIR, f"{_account_slug(email)}.json")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def profile_in_use(path):
+    """True if a running Chrome holds the profile. A SingletonLock left behind by a crashed
+    session on this host (its target is "<host>-<pid>" and the pid is gone) is removed."""
+    lock = os.path.join(path, "SingletonLock")
+    if not os.path.lexists(lock):
+        return False
+    try:
+        host, _, pid = os.readlink(lock).rpartition("-")
+        pid = int(pid)
+    except (OSError, ValueError):
+        return True  # not a lock we can read: leave it alone
+    if host != socket.gethostname() or _pid_alive(pid):
+        return True
+    for name in ("SingletonLock", "SingletonCookie", "SingletonSocket"):
+        try:
+            os.unlink(os.path.join(path, name))
+        except FileNotFoundError:
+            pass
+    print("🧹 Removed a stale browser profile lock.")
+    return False
+
+
+def create_driver(email=None):
+    """Starts one isolated Chrome session, on the account's persistent profile when it is free."""
+    options = Options()
+    options.add_argument("--start-maximized")
+    if PERSIST_PROFILE and email:
+        path = profile_path(email)
+        if profile_in_use(path):
+            # Another session holds the profile: start clean and rely on saved cookies
+            print("⚠️ Browser profile in use, starting a temporary one.")
+        else:
+            os.makedirs(path, exist_ok=True)
+            return uc.Chrome(options=options, user_data_dir=path)
+    return uc.Chrome(options=options)
+
+
+def login(driver, email, password):
+    with step_timer.step("login"):
+        driver.get(LOGIN_URL)
+        wait_until(driver, EC.presence_of_element_located((By.ID, "username")), message="login form")
+        driver.find_element(By.ID, "username").send_keys(email)
+        driver.find_element(By.ID, "password").send_keys(password)
+        driver.find_element(By.XPATH, '//button[@type="submit"]').click()
+        wait_until(driver, EC.any_of(EC.url_contains("/feed"), EC.url_contains("/checkpoint")), message="login redirect")
+        if "/checkpoint" in driver.current_url:
+            print("⚠️ LinkedIn asked for verification, complete it in the browser...")
+            wait_until(driver, EC.url_contains("/feed"), timeout=CHALLENGE_TIMEOUT, message="verification")
+
+
+def wait_for_posts(driver, count):
+    """Waits until the feed has rendered at least `count` posts and returns them."""
+    def enough_posts(d):
+        posts = d.find_elements(By.CLASS_NAME, POST_CLASS)
+        return posts if len(posts) >= count else False
+
+    return wait_until(driver, enough_posts, message=f"{count} feed posts")
+
+
+def open_feed(driver, url=FEED_URL):
+    with step_timer.step("open_feed"):
+        driver.get(url)
+        wait_for_posts(driver, 1)
+
+
+def session_valid(driver):
+    """Opens the feed and reports whether we landed on it logged in (instead of a login/authwall page)."""
+    driver.get(FEED_URL)
+    try:
+        wait_until(
+            driver,
+            EC.any_of(
+                EC.presence_of_element_located((By.CLASS_NAME, POST_CLASS)),
+                *(EC.url_contains(marker) for marker in LOGGED_OUT_MARKERS),
+            ),
+            message="feed or login page",
+        )
+    except TimeoutException:
+        return False
+    return "/feed" in driver.current_url and bool(driver.find_elements(By.CLASS_NAME, POST_CLASS))
+
+
+def save_session(driver, email):
+    """Writes the account's cookies and localStorage to SESSION_DIR (owner-only permissions)."""
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    state = {
+        "cookies": driver.get_cookies(),
+        "local_storage": driver.execute_script(
+            "return Object.fromEntries(Object.keys(localStorage).map(k => [k, localStorage.getItem(k)]));"
+        ),
+        "saved_at": time.time(),
+    }
+    path = session_path(email)
+    tmp_path = f"{path}.tmp"
+    with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def restore_session(driver, email):
+    """Loads the saved cookies and localStorage into the browser. Returns False when none are saved."""
+    try:
+        with open(session_path(email), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return False
+    driver.get("https://www.linkedin.com/robots.txt")  # any cheap page on the domain, cookies need it
+    for cookie in state.get("cookies", []):
+        if "expiry" in cookie:
+            cookie["expiry"] = int(cookie["expiry"])
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException:
+            pass
+    driver.execute_script(
+        "for (const [k, v] of Object.entries(arguments[0])) localStorage.setItem(k, v);",
+        state.get("local_storage") or {},
+    )
+    return True
+
+
+def ensure_logged_in(driver, email, password):
+    """Leaves the driver on the feed, logged in as `email`.
+
+    Reuses the persistent profile's session, then saved cookies, and only logs in
+    when both have expired; a fresh login is saved for the next run.
+    """
+    with step_timer.step("restore_session"):
+        if session_valid(driver):
+            print("🔁 Reusing browser session.")
+            return
+        if restore_session(driver, email) and session_valid(driver):
+            print("🔁 Restored saved session cookies.")
+            return
+    login(driver, email, password)
+    save_session(driver, email)
+    open_feed(driver)
+
+
+def post_comment(driver, post, comment_text, ingest=True):
+    """Opens the post's comment box, types `comment_text` and submits it. Returns a status string.
+
+    With `ingest`, a posted comment is added to the FAISS index right away; failing to index
+    it is logged and still returns "posted".
+    """
+    # **🔹 Open Comment Section**
+    try:
+        with step_timer.step("open_comment_box"):
+            comment_button = post.find_element(By.XPATH, './/button[contains(@aria-label, "Comment")]')
+            driver.execute_script("arguments[0].click();", comment_button)
+            comment_box = wait_until(post, EC.visibility_of_element_located(COMMENT_BOX), message="comment box")
+    except Exception:
+        print("⚠️ No comment button found. Skipping...")
+        return "skipped"
+
+    # **🔹 Enter Comment**
+    with step_timer.step("type_comment"):
+        driver.execute_script("arguments[0].innerText = arguments[1];", comment_box, comment_text)
+        driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", comment_box)
+        post_button = wait_until(post, EC.element_to_be_clickable(SUBMIT_BUTTON), message="submit button")
+    pacing.pause("before_submit")
+
+    def submitted(d):
+        # The post's comment list changed and the box was cleared (or re-rendered)
+        if not mutated(post)(d):
+            return False
+        try:
+            return not comment_box.text.strip()
+        except StaleElementReferenceException:
+            return True
+
+    # **🔹 Click Post Button**
+    try:
+        with step_timer.step("submit_comment"):
+            observe_mutations(driver, post)
+            driver.execute_script("arguments[0].click();", post_button)
+            wait_until(driver, submitted, message="comment to appear")
+        print("✅ Comment Posted Successfully!")
+    except Exception:
+        print("⚠️ Failed to post comment.")
+        return "failed"
+    pacing.pause("after_post")
+
+    if ingest:
+        # Posted comments become retrieval examples for the next ones. The comment is live
+        # either way, so an indexing failure must not report it as unposted (and re-comment)
+        try:
+            get_ingestion_pipeline().ingest([comment_text], source="past_comment")
+        except Exception as e:
+            print(f"⚠️ Comment posted but not added to the index: {e}")
+    return "posted"
+
+
+def process_posts(driver, start=0, count=5, before_comment=None, on_result=None, ingest=True, prefetch=COMMENT_PREFETCH,
+                  feed=None, already_commented=None):
+    """Comments on feed posts start .. start + count - 1 of the open feed.
+
+    Pass the same `feed` snapshot to consecutive calls on one page load so indices continue
+    where the previous call stopped; posts not rendered yet are loaded by scrolling.
+    `already_commented(urn)` marks posts to skip (e.g. commented on in an earlier run).
+
+    Runs as a pipeline: the browser thread harvests the next `prefetch` posts from a FeedSnapshot
+    and hands their text to background threads that generate comments, so the LLM works on
+    upcoming posts while the current one is typed and submitted.
+
+    `before_comment()` runs right before each comment is submitted (rate shaping);
+    `on_result(result)` receives one dict per post found, with its status (none once the feed runs out);
+    `ingest` is passed on to post_comment.
+    """
+    feed = FeedSnapshot() if feed is None else feed
+    pending = {}  # post index -> (post content, harvest time, comment future, or skip status)
+    next_index = start
+    generator = ThreadPoolExecutor(max_workers=max(1, prefetch), thread_name_prefix="comment-generator")
+    try:
+        for i in range(start, start + count):
+            # **🔹 Find all posts** (one round trip for everything rendered since the last scroll)
+            try:
+                with step_timer.step("find_posts"):
+                    feed.wait_for(driver, i + 1)
+            except TimeoutException:
+                print("⚠️ No more posts available.")
+                break  # no post i, so no result to report
+            next_index = i + 1
+
+            result = {
+                "post_index": i, "post_urn": None, "post_preview": "", "comment": None, "status": "error", "error": None,
+            }
+            try:
+                # **🔹 Harvest upcoming posts and start generating their comments**
+                for j in range(i, min(len(feed), start + count, i + prefetch + 1)):
+                    if j not in pending:
+                        post_content = feed.posts[j]["text"][:300]  # First 300 characters
+                        urn = feed.posts[j]["urn"]
+                        if not feed.posts[j]["has_comment_button"]:
+                            future = "no_comment_button"
+                        elif urn and already_commented is not None and already_commented(urn):
+                            future = "duplicate"
+                        else:
+                            future = generator.submit(generate_comment, post_content)
+                        pending[j] = (post_content, time.monotonic(), future)
+
+                post = feed.element(driver, i)  # Take the i-th post
+
+                # **🔹 Scroll post into view**
+                with step_timer.step("scroll_into_view"):
+                    driver.execute_script("arguments[0].scrollIntoView();", post)
+                    wait_until(driver, in_viewport(post), message="post in view")
+
+                post_content, harvested_at, comment_future = pending.pop(i)
+                result["post_urn"] = feed.posts[i]["urn"]
+                result["post_preview"] = post_content[:100]
+                print(f"\n📌 Processing Post {i+1}:\n{post_content[:100]}...")  # Show a preview
+                if comment_future == "no_comment_button":
+                    print("⚠️ No comment button found. Skipping...")
+                    result["status"] = "skipped"
+                    continue
+                if comment_future == "duplicate":
+                    print("⚠️ Already commented on this post. Skipping...")
+                    result["status"] = "duplicate"
+                    continue
+
+                # **🔹 Collect AI comment**
+                print("⏳ Waiting for LLM comment...")
+                with step_timer.step("await_comment"):
+                    comment_text = comment_future.result()
+                # Reading pause, minus the time spent since the post was harvested
+                pacing.pause("read", elapsed=time.monotonic() - harvested_at)
+
+                if not comment_text or comment_text.strip() in GENERIC_COMMENTS:
+                    print("⚠️ Skipping post (no meaningful comment generated).")
+                    result["status"] = "skipped"
+                    continue
+
+                print(f"✅ AI Generated Comment: {comment_text}")
+                result["comment"] = comment_text
+
+                if before_comment is not None:
+                    before_comment()
+                result["status"] = post_comment(driver, post, comment_text, ingest=ingest)
+
+                # **🔹 Scroll to Next Post Properly**
+                print("🔽 Scrolling to next post...")
+                ActionChains(driver).move_to_element(post).perform()  # Move to next post
+                driver.execute_script("window.scrollBy(0, 700);")  # Scroll smoothly down
+                pacing.pause("scroll")
+
+            except Exception as e:
+                print(f"❌ Error processing post: {e}")
+                result["error"] = str(e)
+            finally:
+                if on_result is not None:
+                    on_result(result)
+    finally:
+        # Comments for posts we never reached are not needed any more
+        generator.shutdown(wait=False, cancel_futures=True)
+    return next_index
@@ -0,0 +1,121 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+# ✅ Explicit waits: how long a step may take before it counts as failed
+WAIT_TIMEOUT = float(os.getenv("SCRAPER_WAIT_TIMEOUT", 10))
+WAIT_POLL = float(os.getenv("SCRAPER_WAIT_POLL", 0.1))
+
+# ✅ Human-like pacing, independent of how fast the page is: (min, max) seconds per pause
+PACING_PROFILES = {
+    "human": {"read": (5, 10), "before_submit": (1, 2), "after_post": (2, 4), "scroll": (1, 3)},
+    "fast": {"read": (0.5, 1.5), "before_submit": (0.2, 0.5), "after_post": (0.5, 1), "scroll": (0.2, 0.5)},
+    "off": {},
+}
+PACING = os.getenv("SCRAPER_PACING", "human")
+PACING_SCALE = float(os.getenv("SCRAPER_PACING_SCALE", 1.0))
+
+OBSERVER_SCRIPT = """
+const target = arguments[0];
+target.__mutations = 0;
+if (target.__observer) target.__observer.disconnect();
+target.__observer = new MutationObserver(records => { target.__mutations += records.length; });
+target.__observer.observe(target, {childList: true, subtree: true, characterData: true});
+"""
+IN_VIEWPORT_SCRIPT = """
+const rect = arguments[0].getBoundingClientRect();
+return rect.top < window.innerHeight && rect.bottom > 0;
+"""
+
+
+class StepTimer:
+    """Per-step latency samples (seconds) for the browser flow, shared by the threads of a process."""
+
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def summary(self):
+        """{step: {"count", "p50", "p95", "max", "total"}} in seconds."""
+        with self.lock:
+            samples = {name: sorted(values) for name, values in self.samples.items()}
+        return {
+            name: {
+                "count": len(values),
+                "p50": round(values[len(values) // 2], 3),
+                "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+                "max": round(values[-1], 3),
+                "total": round(sum(values), 3),
+            }
+            for name, values in samples.items()
+        }
+
+    def report(self):
+        print("⏱️ Step timings (s):")
+        for name, stats in self.summary().items():
+            print(
+                f"   {name:<16} n={stats['count']:<3} p50={stats['p50']:.2f} p95={stats['p95']:.2f} "
+                f"max={stats['max']:.2f} total={stats['total']:.1f}"
+            )
+
+
+step_timer = StepTimer()
+
+
+class PacingPolicy:
+    """Random human-like pauses between actions, kept apart from the waits for the page itself.
+
+    `profile` maps pause names to (min, max) seconds; unknown names do not pause.
+    """
+
+    def __init__(self, profile=None, scale=PACING_SCALE, timer=step_timer):
+        self.profile = PACING_PROFILES.get(PACING, PACING_PROFILES["human"]) if profile is None else profile
+        self.scale = scale
+        self.timer = timer
+
+    def pause(self, name, elapsed=0.0):
+        """Sleeps for the `name` pause, minus `elapsed` seconds that already passed since it began."""
+        low, high = self.profile.get(name, (0, 0))
+        delay = random.uniform(low, high) * self.scale - elapsed
+        if delay > 0:
+            time.sleep(delay)
+            self.timer.record(f"pause:{name}", delay)
+
+
+pacing = PacingPolicy()
+
+
+def wait_until(driver, condition, timeout=WAIT_TIMEOUT, message=""):
+    """WebDriverWait(driver, timeout).until(condition) with the shared poll interval."""
+    return WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL).until(condition, message)
+
+
+def in_viewport(element):
+    """Condition: `element` is at least partly inside the viewport."""
+    return lambda driver: driver.execute_script(IN_VIEWPORT_SCRIPT, element)
+
+
+def observe_mutations(driver, element):
+    """Starts counting DOM mutations under `element`; poll them with `mutated`."""
+    driver.execute_script(OBSERVER_SCRIPT, element)
+
+
+def mutated(element):
+    """Condition: the subtree under `element` changed since `observe_mutations`."""
+    return lambda driver: driver.execute_script("return arguments[0].__mutations || 0;", element) > 0
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Importing agents needs a key (never used: tests make no Gemini calls), and the shared
+# response cache must not write .gemini_cache.sqlite3 into the working directory.
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ["GEMINI_CACHE_PATH"] = ""
+os.environ.pop("GEMINI_RATE_LIMIT_STATE", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from rag.bm25 import BM25Index
+
+DOCS = [
+    "Hiring our first engineers at Acme taught us about culture.",
+    "Acme open-sourced its feature store #opensource",
+    "Five lessons on product management after ten years in marketing.",
+    "Our data platform cuts report times from hours to minutes.",
+]
+
+
+def test_search_ranks_exact_term_matches_first():
+    index = BM25Index()
+    index.add(DOCS, 0)
+    results = index.search("acme feature store")
+    assert results[0][0] == 1
+    assert {position for position, _ in results} == {0, 1}
+
+
+def test_pending_postings_compact_to_the_same_index():
+    incremental = BM25Index()
+    incremental.add(DOCS[:2], 0)
+    incremental._compact()
+    incremental.add(DOCS[2:], 2)
+    incremental._compact()
+
+    bulk = BM25Index()
+    bulk.add(DOCS, 0)
+    bulk._compact()
+
+    assert incremental.vocab == bulk.vocab
+    assert np.array_equal(incremental.offsets, bulk.offsets)
+    assert np.array_equal(incremental.docs, bulk.docs)
+    assert np.array_equal(incremental.tfs, bulk.tfs)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = BM25Index(k1=1.2, b=0.6)
+    index.add(DOCS[:3], 0)
+    index.save(str(tmp_path))
+    index.add(DOCS[3:], 3)  # pending postings are merged on save
+    index.save(str(tmp_path))
+
+    loaded = BM25Index.load(str(tmp_path))
+    assert len(loaded) == len(DOCS)
+    assert (loaded.k1, loaded.b) == (1.2, 0.6)
+    for query in ("acme", "data platform minutes", "marketing product"):
+        assert loaded.search(query) == index.search(query)
+
+
+def test_limit_skips_positions_not_in_the_vector_index():
+    index = BM25Index()
+    index.add(DOCS, 0)
+    assert [position for position, _ in index.search("acme", limit=1)] == [0]
+
+
+def test_add_rejects_out_of_order_positions():
+    index = BM25Index()
+    index.add(DOCS[:1], 0)
+    with pytest.raises(ValueError):
+        index.add(DOCS[1:], 3)
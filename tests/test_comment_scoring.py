@@ -0,0 +1,37 @@
+import pytest
+
+from llm import pick_best_comment, score_comment
+
+POST = "We cut our hiring pipeline from six weeks to ten days by replacing take-home tests with paid trial days."
+
+
+@pytest.mark.parametrize("comment", ["", "Great post!", "  thanks for SHARING 🙏 ", "100%", "Love it", "So true!!"])
+def test_generic_and_short_comments_are_rejected(comment):
+    assert score_comment(comment, POST) is None
+
+
+def test_comments_that_pick_up_the_post_score_higher():
+    specific = "Paid trial days instead of take-home tests is a smart way to speed up hiring."
+    off_topic = "This reminds me of a lovely weekend trip I took with some old friends."
+    assert score_comment(specific, POST) > score_comment(off_topic, POST)
+    assert score_comment(off_topic, POST) == 1.0  # in the length sweet spot, no shared terms
+
+
+def test_length_preference():
+    assert score_comment("one two three", "") == pytest.approx(3 / 8)
+    assert score_comment(" ".join(["word"] * 20), "") == 1.0
+    assert score_comment(" ".join(["word"] * 60), "") == pytest.approx(0.5)
+    assert score_comment(" ".join(["word"] * 100), "") == 0.0
+
+
+def test_relevance_is_capped():
+    long_post = " ".join(f"term{i}" for i in range(30))
+    comment = " ".join(f"term{i}" for i in range(20))
+    assert score_comment(comment, long_post) == 3.0
+
+
+def test_pick_best_comment():
+    candidates = ["Nice post", "Trial days beat take-home tests for hiring speed, great result.", "Interesting"]
+    assert pick_best_comment(candidates, POST) == candidates[1]
+    assert pick_best_comment(["Great post!", "", "Awesome"], POST) is None
+    assert pick_best_comment([], POST) is None
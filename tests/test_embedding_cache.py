@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_core.embeddings import Embeddings
+
+from rag.embedding_cache import CachedEmbeddings, EmbeddingCache, embedding_key, normalize_text
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that record which texts reached the model."""
+
+    def __init__(self, size=8):
+        self.inner = DeterministicFakeEmbedding(size=size)
+        self.documents = []
+        self.queries = []
+
+    def embed_documents(self, texts):
+        self.documents.extend(texts)
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self.inner.embed_query(text)
+
+
+def test_keys_normalize_text_and_separate_model_and_kind():
+    assert normalize_text("  Hello \n world ") == "Hello world"
+    key = embedding_key("model-a", "document", "Hello  world")
+    assert key == embedding_key("model-a", "document", " Hello world\n")
+    assert key != embedding_key("model-b", "document", "Hello world")
+    assert key != embedding_key("model-a", "query", "Hello world")
+
+
+def test_only_uncached_texts_reach_the_model(tmp_path):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, "fake", cache=EmbeddingCache("fake", cache_dir=str(tmp_path)))
+
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["beta", "gamma", "alpha "])
+
+    assert model.documents == ["alpha", "beta", "gamma"]
+    assert first[0] == first[2] == second[2]
+    assert first[1] == second[0]
+    assert np.allclose(first[1], model.inner.embed_documents(["beta"])[0])
+
+
+def test_queries_and_documents_are_cached_separately(tmp_path):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, "fake", cache=EmbeddingCache("fake", cache_dir=str(tmp_path)))
+    embeddings.embed_documents(["hiring"])
+    embeddings.embed_query("hiring")
+    embeddings.embed_query("hiring")
+    assert model.documents == ["hiring"]
+    assert model.queries == ["hiring"]
+
+
+def test_cache_is_shared_through_the_directory(tmp_path):
+    writer = EmbeddingCache("fake", cache_dir=str(tmp_path))
+    reader = EmbeddingCache("fake", cache_dir=str(tmp_path))
+    assert reader.get_many(["a"]) == {}
+
+    writer.put_many({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+    writer.put_many({"b": [9.0, 9.0], "c": [5.0, 6.0]})  # "b" is already cached and kept
+
+    found = reader.get_many(["a", "b", "c", "d"])
+    assert {key: vector.tolist() for key, vector in found.items()} == {"a": [1, 2], "b": [3, 4], "c": [5, 6]}
+    assert reader.stats()["rows"] == 3
+    assert (reader.stats()["hits"], reader.stats()["misses"]) == (3, 2)
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    cache = EmbeddingCache("fake", cache_dir=str(tmp_path))
+    cache.put_many({"a": [1.0, 2.0]})
+    with pytest.raises(ValueError):
+        cache.put_many({"b": [1.0, 2.0, 3.0]})
@@ -0,0 +1,74 @@
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from agents.token_budget import count_tokens
+from rag.engine import RetrievalEngine, assemble_context, matches_filter
+from rag.retriever import RetrieverService
+
+
+@pytest.mark.parametrize(
+    "filter, expected",
+    [
+        (None, True),
+        ({"source": "linkedin"}, True),
+        ({"source": "blog"}, False),
+        ({"source": ["blog", "linkedin"]}, True),
+        ({"source": ("blog",)}, False),
+        ({"source": "linkedin", "author": "sam"}, True),
+        ({"source": "linkedin", "author": "alex"}, False),
+        ({"missing": "x"}, False),
+        ({"missing": None}, True),
+        (lambda metadata: metadata["author"].startswith("s"), True),
+    ],
+)
+def test_matches_filter(filter, expected):
+    assert matches_filter({"source": "linkedin", "author": "sam"}, filter) is expected
+
+
+def doc(text, content_hash=None):
+    return Document(page_content=text, metadata={"content_hash": content_hash} if content_hash else {})
+
+
+def test_assemble_context_drops_duplicates_and_stops_at_the_budget():
+    docs = [doc("first chunk"), doc(" first chunk "), doc("other text", "h1"), doc("same hash", "h1"), doc("third")]
+    assert assemble_context(docs, max_tokens=1000) == "first chunk\n\nother text\n\nthird"
+
+    budget = count_tokens("first chunk") + count_tokens("\n\n") + count_tokens("other text")
+    assert assemble_context(docs, max_tokens=budget) == "first chunk\n\nother text"
+
+
+def test_assemble_context_cuts_an_oversized_first_chunk():
+    context = assemble_context([doc("word " * 2000), doc("second")], max_tokens=50)
+    assert context.startswith("word")
+    assert 0 < count_tokens(context) <= 50
+    assert assemble_context([doc("   ")], max_tokens=50) == ""
+
+
+def make_retriever(tmp_path, texts, lexical=True):
+    embeddings = DeterministicFakeEmbedding(size=16)
+    retriever = RetrieverService(index_path=str(tmp_path / "index"), embeddings=embeddings, lexical=lexical)
+    retriever.install(FAISS.from_texts(texts, embeddings, metadatas=[{"i": i} for i in range(len(texts))]))
+    return retriever
+
+
+@pytest.mark.parametrize("hybrid", [False, True])
+def test_native_search_skips_positions_missing_from_the_docstore_mapping(tmp_path, hybrid):
+    retriever = make_retriever(tmp_path, [f"chunk {i} about hiring" for i in range(10)])
+    store = retriever.store
+    del store.index_to_docstore_id[9]  # LangChain grows the index before this mapping
+
+    results = RetrievalEngine(retriever, index_type="native").search("hiring", k=20, fetch_k=20, hybrid=hybrid)
+    assert sorted(d.metadata["i"] for d, _ in results) == list(range(9))
+
+
+def test_store_and_lexical_index_are_swapped_together(tmp_path):
+    retriever = make_retriever(tmp_path, ["alpha"])
+    store, lexical = retriever.get_snapshot()
+    retriever.install(make_retriever(tmp_path, ["beta", "gamma"]).store)
+
+    new_store, new_lexical = retriever.get_snapshot()
+    assert (retriever.store, retriever.lexical) == (new_store, new_lexical)
+    assert new_store is not store and new_lexical is not lexical
+    assert [position for position, _ in new_lexical.search("gamma")] == [1]
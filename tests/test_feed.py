@@ -0,0 +1,118 @@
+import functools
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from scraper import feed as feed_module
+from scraper.feed import EXTRACT_SCRIPT, FeedSnapshot
+from scraper.waits import wait_until
+
+
+class FakeElement:
+    def __init__(self, urn):
+        self.urn = urn
+        self.stale = False
+
+    def is_enabled(self):
+        if self.stale:
+            raise StaleElementReferenceException("gone")
+        return True
+
+
+class FakeFeedDriver:
+    """A feed that renders `page_size` more posts per scroll, emulating EXTRACT_SCRIPT's stamping."""
+
+    def __init__(self, urns, page_size=3):
+        self.urns = urns
+        self.page_size = page_size
+        self.nodes = []  # [(element, stamp)] in document order
+        self.extracts = self.scrolls = 0
+        self.scroll()
+        self.scrolls = 0
+
+    def scroll(self):
+        self.scrolls += 1
+        for urn in self.urns[len(self.nodes):len(self.nodes) + self.page_size]:
+            self.nodes.append([FakeElement(urn), None])
+
+    def rerender(self, index):
+        """Replaces a node with a fresh, unstamped one for the same post (LinkedIn re-renders on scroll)."""
+        self.nodes[index][0].stale = True
+        self.nodes[index] = [FakeElement(self.nodes[index][0].urn), None]
+        return self.nodes[index][0]
+
+    def execute_script(self, script, *args):
+        if script != EXTRACT_SCRIPT:
+            self.scroll()
+            return None
+        self.extracts += 1
+        token = args[1]
+        posts = []
+        for node in self.nodes:
+            if node[1] == token:
+                continue
+            node[1] = token
+            element = node[0]
+            posts.append({
+                "urn": element.urn, "author": "", "text": f"text of {element.urn}",
+                "has_comment_button": True, "element": element,
+            })
+        return posts
+
+    def find_element(self, by, value):
+        return next(node[0] for node in self.nodes if f'"{node[0].urn}"' in value)
+
+
+def test_refresh_returns_only_posts_not_extracted_yet():
+    driver = FakeFeedDriver(["urn:1", "urn:2", None, "urn:4"], page_size=3)
+    snapshot = FeedSnapshot()
+
+    assert [p["urn"] for p in snapshot.refresh(driver)] == ["urn:1", "urn:2", None]
+    assert snapshot.refresh(driver) == []
+    driver.rerender(0)  # same post, new node: not a new post
+    driver.scroll()
+    assert [p["urn"] for p in snapshot.refresh(driver)] == ["urn:4"]
+    assert [p["urn"] for p in snapshot.posts] == ["urn:1", "urn:2", None, "urn:4"]
+
+
+def test_separate_snapshots_extract_independently():
+    driver = FakeFeedDriver(["urn:1", "urn:2"])
+    FeedSnapshot().refresh(driver)
+    assert len(FeedSnapshot().refresh(driver)) == 2
+
+
+def test_wait_for_scrolls_until_enough_posts_are_loaded():
+    driver = FakeFeedDriver([f"urn:{i}" for i in range(10)], page_size=3)
+    snapshot = FeedSnapshot()
+
+    snapshot.wait_for(driver, 7)
+    assert len(snapshot) >= 7
+    assert driver.scrolls == 2
+    assert driver.extracts == 3  # one extraction per scroll, not one call per post
+
+    extracts = driver.extracts
+    snapshot.wait_for(driver, 5)  # already known: no round trip
+    assert driver.extracts == extracts
+
+
+def test_wait_for_times_out_at_the_end_of_the_feed(monkeypatch):
+    monkeypatch.setattr(feed_module, "wait_until", functools.partial(wait_until, timeout=0.3))
+    snapshot = FeedSnapshot()
+    with pytest.raises(TimeoutException):
+        snapshot.wait_for(FakeFeedDriver(["urn:1", "urn:2"]), 3)
+    assert len(snapshot) == 2
+
+
+def test_element_looks_up_stale_posts_again_by_urn():
+    driver = FakeFeedDriver(["urn:1", None])
+    snapshot = FeedSnapshot()
+    snapshot.refresh(driver)
+    assert snapshot.element(driver, 0) is driver.nodes[0][0]
+
+    fresh = driver.rerender(0)
+    assert snapshot.element(driver, 0) is fresh
+    assert snapshot.posts[0]["element"] is fresh
+
+    driver.rerender(1)
+    with pytest.raises(StaleElementReferenceException):
+        snapshot.element(driver, 1)  # no URN to find it by
@@ -0,0 +1,39 @@
+import pytest
+
+from agents.generate_comment_agent import MAX_BATCH_INPUT_TOKENS, MAX_BATCH_SIZE, GenerateCommentAgent
+from agents.token_budget import count_tokens
+
+
+def test_plan_batches_respects_the_batch_size():
+    batches = GenerateCommentAgent.plan_batches(["short post"] * (MAX_BATCH_SIZE * 2 + 3))
+    assert [len(batch) for batch in batches] == [MAX_BATCH_SIZE, MAX_BATCH_SIZE, 3]
+    assert [i for batch in batches for i in batch] == list(range(MAX_BATCH_SIZE * 2 + 3))
+
+
+def test_plan_batches_respects_the_token_budget():
+    post = "word " * 1000
+    posts = [post] * 12
+    batches = GenerateCommentAgent.plan_batches(posts)
+    assert len(batches) > 1
+    for batch in batches:
+        assert sum(count_tokens(posts[i]) + 20 for i in batch) <= MAX_BATCH_INPUT_TOKENS
+
+
+def test_plan_batches_gives_an_oversized_post_its_own_batch():
+    posts = ["small", "word " * (MAX_BATCH_INPUT_TOKENS * 2), "small"]
+    assert GenerateCommentAgent.plan_batches(posts) == [[0], [1], [2]]
+
+
+@pytest.mark.parametrize(
+    "reply, expected",
+    [
+        ('[{"id": 0, "comment": "Great"}, {"id": 1, "comment": " Nice "}]', {0: "Great", 1: "Nice"}),
+        ('```json\n[{"id": 1, "comment": "Fenced"}]\n```', {1: "Fenced"}),
+        ('[{"id": 0, "comment": ""}, {"id": 5, "comment": "out of range"}, {"id": "1", "comment": "str id"}]', {}),
+        ('[{"id": 0, "comment": "ok"}, "junk", {"id": 1}]', {0: "ok"}),
+        ('{"id": 0, "comment": "not a list"}', {}),
+        ("Sorry, I cannot help with that.", {}),
+    ],
+)
+def test_parse_batch_reply_keeps_only_valid_entries(reply, expected):
+    assert GenerateCommentAgent.parse_batch_reply(reply, 2) == expected
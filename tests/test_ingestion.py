@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_core.embeddings import Embeddings
+
+from rag.engine import RetrievalEngine
+from rag.ingestion import IngestionPipeline
+from rag.retriever import RetrieverService
+
+
+class FlakyEmbeddings(Embeddings):
+    """Deterministic embeddings whose first `failures` embed_documents calls raise (like a 429)."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.inner = DeterministicFakeEmbedding(size=16)
+
+    def embed_documents(self, texts):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("429 Resource has been exhausted")
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.inner.embed_query(text)
+
+
+def make_pipeline(tmp_path, embeddings, **kwargs):
+    retriever = RetrieverService(index_path=str(tmp_path / "index"), embeddings=embeddings, lexical=False)
+    return IngestionPipeline(retriever=retriever, embeddings=embeddings, **kwargs), retriever
+
+
+def test_failed_embedding_does_not_mark_chunks_as_ingested(tmp_path):
+    pipeline, retriever = make_pipeline(tmp_path, FlakyEmbeddings(failures=1))
+
+    with pytest.raises(RuntimeError):
+        pipeline.ingest(["Start posts with a bold hook question."])
+
+    assert pipeline.ingest(["Start posts with a bold hook question."]) == {"added": 1, "duplicates": 0}
+    assert retriever.get_store().index.ntotal == 1
+
+
+def test_batches_indexed_before_a_failure_stay_deduplicated(tmp_path):
+    embeddings = FlakyEmbeddings()
+    pipeline, retriever = make_pipeline(tmp_path, embeddings, batch_size=1)
+    pipeline.ingest(["first chunk"])
+
+    embeddings.failures = 1
+    with pytest.raises(RuntimeError):
+        pipeline.ingest(["second chunk"])
+
+    assert pipeline.ingest(["first chunk", "second chunk"]) == {"added": 1, "duplicates": 1}
+    assert retriever.get_store().index.ntotal == 2
+    assert pipeline.dirty
+
+
+def test_duplicates_within_one_call_are_indexed_once(tmp_path):
+    pipeline, retriever = make_pipeline(tmp_path, FlakyEmbeddings())
+    assert pipeline.ingest(["same text", "same text"]) == {"added": 1, "duplicates": 1}
+    assert retriever.get_store().index.ntotal == 1
+
+
+@pytest.mark.parametrize("index_type", ["native", "flat"])
+def test_searches_run_safely_while_ingesting(tmp_path, index_type):
+    pipeline, retriever = make_pipeline(tmp_path, FlakyEmbeddings(), batch_size=1)
+    pipeline.ingest(["seed chunk about hiring"])
+    engine = RetrievalEngine(retriever, index_type=index_type)
+    errors, done = [], threading.Event()
+
+    def search():
+        while not done.is_set():
+            try:
+                for doc, _ in engine.search("hiring chunk", k=3, hybrid=False):
+                    assert doc.page_content
+            except Exception as e:  # surfaced below
+                errors.append(e)
+                return
+
+    searchers = [threading.Thread(target=search) for _ in range(4)]
+    for thread in searchers:
+        thread.start()
+    pipeline.ingest([f"chunk {i} about hiring" for i in range(1000)])
+    done.set()
+    for thread in searchers:
+        thread.join(timeout=10)
+
+    assert errors == []
+    assert len(engine.search("hiring chunk", k=1100, fetch_k=1100, mmr=False, hybrid=False)) == 1001
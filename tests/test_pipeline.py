@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from agents.pipeline import plan_pipeline, run_pipeline
+
+
+class RecordingAgent:
+    """Stand-in agent: returns "<name>(args)" after `delay` seconds and records start/finish order."""
+
+    def __init__(self, name, events, delay=0.0, error=None):
+        self.name = name
+        self.events = events
+        self.delay = delay
+        self.error = error
+
+    async def aexecute(self, *args, **kwargs):
+        self.events.append(("start", self.name))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.events.append(("finish", self.name))
+        return f"{self.name}({', '.join(map(str, args))})"
+
+
+def test_plan_collects_dependencies_from_args_kwargs_and_after():
+    steps = {
+        "summary": {"agent": "summarize", "args": ["$text"]},
+        "sentiment": {"agent": "sentiment_analysis", "args": ["$text"]},
+        "validation": {"agent": "summarize_validator", "args": ["$text"], "kwargs": {"summary": "$summary"}},
+        "report": {"agent": "write_post", "args": [["$summary", {"s": "$sentiment"}]], "after": ["validation"]},
+    }
+    assert plan_pipeline(steps, {"text": "post"}) == {
+        "summary": set(),
+        "sentiment": set(),
+        "validation": {"summary"},
+        "report": {"summary", "sentiment", "validation"},
+    }
+
+
+@pytest.mark.parametrize(
+    "steps, inputs, message",
+    [
+        ({"a": {"agent": "x", "args": ["$b"]}, "b": {"agent": "x", "args": ["$a"]}}, {}, "cycle"),
+        ({"a": {"agent": "x", "after": ["a"]}}, {}, "cycle"),
+        ({"a": {"agent": "x", "args": ["$missing"]}}, {}, "unknown names"),
+        ({"text": {"agent": "x"}}, {"text": "post"}, "shadows an input"),
+        ({"a": {"args": ["$text"]}}, {"text": "post"}, "has no agent"),
+    ],
+)
+def test_plan_rejects_invalid_pipelines(steps, inputs, message):
+    with pytest.raises(ValueError, match=message):
+        plan_pipeline(steps, inputs)
+
+
+def test_independent_steps_run_concurrently_and_dependents_wait():
+    events = []
+    agents = {
+        "slow": RecordingAgent("slow", events, delay=0.05),
+        "fast": RecordingAgent("fast", events),
+        "join": RecordingAgent("join", events),
+    }
+    steps = {
+        "a": {"agent": "slow", "args": ["$text"]},
+        "b": {"agent": "fast", "args": ["$text"]},
+        "c": {"agent": "join", "args": ["$a", "$b"]},
+    }
+    results = asyncio.run(run_pipeline(agents.get, steps, {"text": "post"}))
+
+    assert results == {"a": "slow(post)", "b": "fast(post)", "c": "join(slow(post), fast(post))"}
+    assert events.index(("start", "fast")) < events.index(("finish", "slow"))
+    assert events.index(("start", "join")) > events.index(("finish", "slow"))
+
+
+def test_a_failing_step_cancels_the_rest():
+    events = []
+    agents = {
+        "broken": RecordingAgent("broken", events, error=RuntimeError("boom")),
+        "slow": RecordingAgent("slow", events, delay=0.5),
+    }
+    steps = {"a": {"agent": "broken"}, "b": {"agent": "slow"}, "c": {"agent": "slow", "args": ["$a"]}}
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(run_pipeline(agents.get, steps))
+    assert ("finish", "slow") not in events
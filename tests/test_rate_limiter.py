@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from agents.rate_limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE, RateLimiter
+
+MODEL = "gemini-test"
+
+
+class FakeClock:
+    """Wall clock that only moves when the test advances it."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def exhausted_limiter(rpm, clock, **kwargs):
+    """A limiter whose request bucket for MODEL is empty, refilling one request every 60 / rpm clock seconds."""
+    limiter = RateLimiter(limits={"default": (rpm, 10**9)}, clock=clock, **kwargs)
+    limiter.acquire(MODEL)
+    limiter.penalize(MODEL)
+    return limiter
+
+
+async def until(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out waiting for the limiter"
+        await asyncio.sleep(0.01)
+
+
+async def grant_order(limiter, clock, callers, rpm):
+    """Queues one task per (name, priority), in order, then frees one request at a time."""
+    granted = []
+
+    async def run(name, priority):
+        await limiter.aacquire(MODEL, priority=priority)
+        granted.append(name)
+
+    # Tasks start (and take their queue tickets) in creation order
+    tasks = [asyncio.ensure_future(run(name, priority)) for name, priority in callers]
+    await asyncio.sleep(0)
+    assert limiter.stats()["queued"] == {MODEL: len(callers)}
+    for count in range(1, len(callers) + 1):
+        clock.advance(60 / rpm)
+        await until(lambda: len(granted) == count)
+    await asyncio.gather(*tasks)
+    return granted
+
+
+def test_interactive_callers_overtake_queued_batch_callers():
+    clock = FakeClock()
+    limiter = exhausted_limiter(rpm=60, clock=clock)
+    callers = [("batch-1", PRIORITY_BATCH), ("batch-2", PRIORITY_BATCH), ("interactive", PRIORITY_INTERACTIVE)]
+    granted = asyncio.run(grant_order(limiter, clock, callers, rpm=60))
+    assert granted == ["interactive", "batch-1", "batch-2"]
+
+
+def test_callers_of_equal_priority_are_served_fifo():
+    clock = FakeClock()
+    limiter = exhausted_limiter(rpm=60, clock=clock)
+    names = [f"caller-{i}" for i in range(4)]
+    granted = asyncio.run(grant_order(limiter, clock, [(name, PRIORITY_BATCH) for name in names], rpm=60))
+    assert granted == names
+
+
+def test_state_file_shares_the_budget_between_limiters(tmp_path):
+    clock = FakeClock()
+    state_path = str(tmp_path / "rate_limit.json")
+    exhausted_limiter(rpm=60, clock=clock, state_path=state_path)
+    other = RateLimiter(limits={"default": (60, 10**9)}, state_path=state_path, clock=clock)
+    unshared = RateLimiter(limits={"default": (60, 10**9)}, clock=clock)
+
+    async def scenario():
+        await asyncio.wait_for(unshared.aacquire(MODEL), timeout=1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(other.aacquire(MODEL), timeout=0.2)
+        assert other.stats()["queued"] == {}  # the timed-out caller left the queue
+        clock.advance(1)
+        await asyncio.wait_for(other.aacquire(MODEL), timeout=1)
+
+    asyncio.run(scenario())
+
+
+def test_oversized_call_is_capped_at_the_token_budget():
+    limiter = RateLimiter(limits={"default": (60, 1000)}, clock=FakeClock())
+    limiter.acquire(MODEL, tokens=50_000)
+    assert limiter.stats()["granted"] == 1
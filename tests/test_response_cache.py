@@ -0,0 +1,66 @@
+from agents.response_cache import ResponseCache, make_cache_key
+
+
+def test_cache_key_depends_on_backend_model_prompt_and_params():
+    key = make_cache_key("1.5-flash", "prompt", {"temperature": 0.3})
+    assert key == make_cache_key("1.5-flash", "prompt", {"temperature": 0.3})
+    assert key != make_cache_key("1.5-pro", "prompt", {"temperature": 0.3})
+    assert key != make_cache_key("1.5-flash", "prompt", {"temperature": 0.7})
+    assert key != make_cache_key("1.5-flash", "prompt", {"temperature": 0.3}, "http:http://127.0.0.1:8100")
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(path="", max_entries=2, ttl=60)
+    cache.set("a", "reply a")
+    cache.set("b", "reply b")
+    assert cache.get("a") == "reply a"  # "b" is now the least recently used
+    cache.set("c", "reply c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "reply a"
+    assert cache.get("c") == "reply c"
+
+
+def test_evicted_entries_are_served_from_disk(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), max_entries=1, ttl=60)
+    cache.set("a", "reply a")
+    cache.set("b", "reply b")
+
+    assert cache.get("a") == "reply a"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path=path, ttl=60).set("a", "reply a")
+
+    other = ResponseCache(path=path, ttl=60)
+    assert other.get("a") == "reply a"
+    assert other.stats()["disk_entries"] == 1
+
+
+def test_expired_entries_miss_and_are_purged(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), ttl=60)
+    cache.set("fresh", "reply")
+    cache.set("stale", "reply", ttl=-1)
+
+    assert cache.get("stale") is None
+    assert cache.purge_expired() == 1
+    assert cache.get("fresh") == "reply"
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_is_capped_and_pruned_while_writing(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), ttl=60, max_disk_entries=3, prune_interval=2)
+    for i in range(6):
+        cache.set(f"key-{i}", f"reply {i}")
+
+    assert cache.disk_entries() == 3
+    fresh = ResponseCache(path=cache.path, ttl=60)
+    assert [fresh.get(f"key-{i}") for i in range(6)] == [None, None, None, "reply 3", "reply 4", "reply 5"]
+
+
+def test_expired_rows_are_purged_on_open(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path=path, ttl=60).set("stale", "reply", ttl=-1)
+    assert ResponseCache(path=path, ttl=60).disk_entries() == 0
@@ -0,0 +1,81 @@
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+import rag.query_handler as query_handler
+from rag.ingestion import IngestionPipeline
+from rag.retriever import RetrieverService
+from rag.semantic_cache import SemanticCache
+
+QUERY = [1.0, 0.0, 0.0]
+PARAPHRASE = [0.99, 0.1, 0.0]  # cosine ~0.995
+UNRELATED = [0.0, 1.0, 0.0]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_similar_queries_in_the_same_scope_hit():
+    cache = SemanticCache(threshold=0.9)
+    cache.set(QUERY, "how do I hire faster?", "k=4", "answer", kb_version=1)
+
+    answer, similarity = cache.get(PARAPHRASE, "k=4", kb_version=1)
+    assert answer == "answer" and similarity > 0.99
+    assert cache.get(UNRELATED, "k=4", kb_version=1) is None
+    assert cache.get(QUERY, "k=8", kb_version=1) is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_a_new_knowledge_base_version_drops_every_entry():
+    cache = SemanticCache()
+    cache.set(QUERY, "q", "scope", "old answer", kb_version=1)
+    assert cache.get(QUERY, "scope", kb_version=2) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+    cache.set(QUERY, "q", "scope", "new answer", kb_version=2)
+    assert cache.get(QUERY, "scope", kb_version=2)[0] == "new answer"
+    assert cache.get(QUERY, "scope", kb_version=1) is None  # any change invalidates, not just increases
+
+
+def test_expired_entries_are_removed():
+    clock = FakeClock()
+    cache = SemanticCache(ttl=60, clock=clock)
+    cache.set(QUERY, "q", "scope", "answer", kb_version=1)
+    clock.now += 59
+    assert cache.get(QUERY, "scope", kb_version=1) is not None
+    clock.now += 2
+    assert cache.get(QUERY, "scope", kb_version=1) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.index.ntotal == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(max_entries=2)
+    cache.set(QUERY, "first", "scope", "first", kb_version=1)
+    cache.set(UNRELATED, "second", "scope", "second", kb_version=1)
+    cache.get(QUERY, "scope", kb_version=1)  # first is now the most recently used
+    cache.set([0.0, 0.0, 1.0], "third", "scope", "third", kb_version=1)
+
+    assert cache.get(QUERY, "scope", kb_version=1)[0] == "first"
+    assert cache.get(UNRELATED, "scope", kb_version=1) is None
+    assert cache.index.ntotal == 2
+
+
+def test_ingestion_invalidates_cached_answers(tmp_path, monkeypatch):
+    embeddings = DeterministicFakeEmbedding(size=16)
+    retriever = RetrieverService(index_path=str(tmp_path / "index"), embeddings=embeddings, lexical=False)
+    pipeline = IngestionPipeline(retriever=retriever, embeddings=embeddings)
+    monkeypatch.setattr(query_handler, "get_retriever", lambda: retriever)
+    cache = SemanticCache()
+
+    pipeline.ingest(["Paid trial days beat take-home tests."])
+    cache.set(QUERY, "q", "scope", "answer", query_handler.kb_version())
+    assert cache.get(QUERY, "scope", query_handler.kb_version()) is not None
+
+    pipeline.ingest(["Structured interviews reduce bias."])
+    assert cache.get(QUERY, "scope", query_handler.kb_version()) is None
+    assert cache.stats()["invalidations"] == 1
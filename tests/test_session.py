@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("undetected_chromedriver")
+
+from selenium.common.exceptions import TimeoutException  # noqa: E402
+
+from scraper import session  # noqa: E402
+from scraper.waits import PacingPolicy  # noqa: E402
+
+
+class FakeDriver:
+    """Answers every script (scrolling, viewport checks) with True."""
+
+    def execute_script(self, script, *args):
+        return True
+
+
+class StubFeed:
+    """FeedSnapshot stand-in over a fixed list of posts that has nothing more to load."""
+
+    def __init__(self, posts):
+        self.posts = posts
+
+    def __len__(self):
+        return len(self.posts)
+
+    def wait_for(self, driver, count):
+        if count > len(self.posts):
+            raise TimeoutException("no more posts")
+
+    def element(self, driver, index):
+        return object()
+
+
+def post(urn, has_comment_button=True):
+    return {"urn": urn, "author": "", "text": f"Post {urn} about hiring", "has_comment_button": has_comment_button}
+
+
+@pytest.fixture(autouse=True)
+def no_pauses(monkeypatch):
+    monkeypatch.setattr(session, "pacing", PacingPolicy({}))
+
+
+def test_process_posts_reports_only_posts_it_reached():
+    feed = StubFeed([post("urn:1", has_comment_button=False), post("urn:2")])
+    results = []
+
+    next_index = session.process_posts(
+        FakeDriver(), 0, 5, on_result=results.append, feed=feed, already_commented=lambda urn: urn == "urn:2",
+    )
+
+    assert next_index == 2
+    assert [(r["post_index"], r["post_urn"], r["status"]) for r in results] == [
+        (0, "urn:1", "skipped"), (1, "urn:2", "duplicate"),
+    ]
+    assert all(r["error"] is None for r in results)
+
+
+def test_process_posts_continues_where_the_previous_call_stopped():
+    feed = StubFeed([post(f"urn:{i}", has_comment_button=False) for i in range(3)])
+    results = []
+
+    assert session.process_posts(FakeDriver(), 0, 2, on_result=results.append, feed=feed) == 2
+    assert session.process_posts(FakeDriver(), 2, 2, on_result=results.append, feed=feed) == 3
+    assert [r["post_index"] for r in results] == [0, 1, 2]
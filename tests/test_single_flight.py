@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.single_flight import SingleFlight
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def test_async_leader_cancellation_does_not_fail_followers():
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "reply"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.ado("key", upstream))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.ado("key", upstream))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "reply"
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_async_follower_cancellation_does_not_cancel_the_leader():
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "reply"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.ado("key", upstream))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.ado("key", upstream))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(scenario()) == "reply"
+
+
+def test_async_errors_are_shared_with_followers():
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        raise ValueError("quota")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.ado("key", upstream) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(calls) == 1
+    assert flight.stats()["deduplicated"] == 2
+
+
+def test_sync_follower_retries_after_an_interrupted_leader():
+    flight = SingleFlight()
+    leader_started = threading.Event()
+    calls = []
+
+    def interrupted():
+        calls.append("leader")
+        leader_started.set()
+        time.sleep(0.05)
+        raise Interrupted()
+
+    def upstream():
+        calls.append("follower")
+        return "reply"
+
+    def lead():
+        with pytest.raises(Interrupted):
+            flight.do("key", interrupted)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    leader_started.wait(timeout=5)
+    assert flight.do("key", upstream) == "reply"
+    leader.join(timeout=5)
+    assert calls == ["leader", "follower"]
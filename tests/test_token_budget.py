@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from agents import token_budget
+from agents.refiner_agent import RefinerAgent
+from agents.sanitize_data_tool import SanitizeDataTool
+from agents.summarize_tool import SummarizeTool
+from agents.token_budget import TRUNCATION_MARKER, count_tokens, split_into_chunks, truncate_to_budget
+
+
+@pytest.fixture(params=["fallback", "default"])
+def tokenizer(request, monkeypatch):
+    """Runs a test with the 4 characters/token fallback and with whatever tokenizer this process has."""
+    if request.param == "fallback":
+        monkeypatch.setattr(token_budget, "get_tokenizer", lambda: None)
+    token_budget._counts.clear()  # counts are only valid for one tokenizer
+    yield request.param
+    token_budget._counts.clear()
+
+
+class StubbedLLM:
+    """Records the prompts an agent sends instead of calling Gemini."""
+
+    def __init__(self, agent):
+        self.prompts = []
+        agent.verbose = False
+        agent.call_gemini = self.reply
+        agent.acall_gemini = self.areply
+
+    def reply(self, prompt, model="1.5-flash", **params):
+        self.prompts.append(prompt)
+        return "condensed"
+
+    async def areply(self, prompt, model="1.5-flash", **params):
+        return self.reply(prompt, model, **params)
+
+
+@pytest.mark.parametrize("budget", [1, 2, 100, 1000, 4000])
+def test_split_keeps_every_chunk_within_the_budget(tokenizer, budget):
+    text = "x" * 20000
+    chunks = split_into_chunks(text, budget)
+    assert all(count_tokens(chunk) <= budget for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_split_packs_paragraphs_up_to_the_budget(tokenizer):
+    paragraphs = [f"Paragraph {i} about hiring, culture and growth." for i in range(200)]
+    chunks = split_into_chunks("\n\n".join(paragraphs), 100)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert "\n\n".join(chunks).split("\n\n") == paragraphs
+
+
+@pytest.mark.parametrize("budget", [1, 3, 4, 5, 10, 50, 500])
+def test_truncate_fits_the_budget(tokenizer, budget):
+    text = "head " + "middle " * 2000 + "tail"
+    truncated = truncate_to_budget(text, budget)
+    assert len(truncated) < len(text)
+    assert count_tokens(truncated) <= budget
+
+
+def test_truncate_keeps_head_and_tail(tokenizer):
+    truncated = truncate_to_budget("head " + "middle " * 2000 + "tail", 50)
+    assert truncated.startswith("head") and truncated.endswith("tail")
+    assert TRUNCATION_MARKER in truncated
+
+
+def test_truncate_leaves_text_within_budget_alone(tokenizer):
+    assert truncate_to_budget("short text", 100) == "short text"
+
+
+def test_sanitizer_chunks_oversized_data_once(tokenizer):
+    agent = SanitizeDataTool()
+    llm = StubbedLLM(agent)
+    result = asyncio.run(asyncio.wait_for(agent.aexecute("x" * 20000), timeout=10))
+
+    chunks = split_into_chunks("x" * 20000, agent.max_input_tokens)
+    assert len(llm.prompts) == len(chunks) > 1
+    assert result == "\n\n".join(["condensed"] * len(chunks))
+
+    llm.prompts.clear()
+    agent.execute("x" * 20000)
+    assert len(llm.prompts) == len(chunks)
+
+
+def test_truncate_compaction_records_usage(tokenizer):
+    agent = RefinerAgent()
+    StubbedLLM(agent)
+    before = agent.token_usage.stats().get(agent.name, {}).get("compacted_inputs", 0)
+
+    compacted = agent.compact_input("word " * 20000)
+    assert count_tokens(compacted) <= agent.max_input_tokens
+    assert agent.token_usage.stats()[agent.name]["compacted_inputs"] == before + 1
+    assert agent.compact_input("short draft") == "short draft"
+
+
+def test_map_reduce_condenses_each_chunk(tokenizer):
+    agent = SummarizeTool()
+    llm = StubbedLLM(agent)
+    text = "\n\n".join(["A long paragraph about engineering leadership. " * 40] * 60)
+
+    compacted = asyncio.run(agent.acompact_input(text))
+    assert len(llm.prompts) == len(split_into_chunks(text, agent.max_input_tokens)) > 1
+    assert compacted == "\n\n".join(["condensed"] * len(llm.prompts))